@@ -0,0 +1,235 @@
+"""Admission control for new calls based on host load and measured per-call cost.
+
+Before a call process is launched, ``AdmissionController.admit`` checks that the
+host can take it:
+
+* ``cpu``: host CPU use plus the new call's expected cores stays under
+  ``ADMISSION_CPU_MAX`` percent;
+* ``memory``: available memory minus the new call's expected RSS stays above
+  ``ADMISSION_MEM_RESERVE_MB``;
+* ``concurrency``: fewer calls are live than the effective limit.
+
+The per-call cost is the average measured by ``call_metrics`` once a few calls
+have finished (``ADMISSION_CALL_CORES`` / ``ADMISSION_CALL_MB`` until then). The
+effective limit is the smaller of a cost-based estimate (cores available under
+the CPU ceiling / cores per call) and an AIMD limit that adapts to what the
+host actually sustains: it is cut by a third whenever the host is over a
+threshold, and raised by one while the limit is what holds calls back and the
+host has headroom.
+
+Refusals are counted per reason and the recent ones kept for ``stats()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import psutil  # type: ignore
+except Exception:  # optional: /proc is read directly without it
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+CPU_MAX = float(os.getenv("ADMISSION_CPU_MAX", "85"))
+MEM_RESERVE_MB = float(os.getenv("ADMISSION_MEM_RESERVE_MB", "512"))
+MAX_CALLS = int(os.getenv("ADMISSION_MAX_CALLS", "8"))
+MIN_CALLS = int(os.getenv("ADMISSION_MIN_CALLS", "1"))
+DEFAULT_CALL_CORES = float(os.getenv("ADMISSION_CALL_CORES", "0.5"))
+DEFAULT_CALL_MB = float(os.getenv("ADMISSION_CALL_MB", "300"))
+# Finished calls needed before the measured cost replaces the defaults
+MIN_MEASURED_CALLS = 3
+RETRY_AFTER = float(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+_SAMPLE_INTERVAL = 1.0
+_ADJUST_INTERVAL = 5.0
+_DECREASE = 2 / 3
+
+
+def _read_proc_cpu() -> Optional[Tuple[int, int]]:
+    """(busy, total) jiffies from /proc/stat."""
+    try:
+        with open("/proc/stat", "rb") as fh:
+            fields = [int(x) for x in fh.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    total = sum(fields[:8])  # guest time is already included in user/nice
+    return total - idle, total
+
+
+def _read_available_mb() -> Optional[float]:
+    if psutil is not None:
+        return psutil.virtual_memory().available / 2**20
+    try:
+        with open("/proc/meminfo", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class HostLoad:
+    """Host CPU use over the last ``_SAMPLE_INTERVAL`` seconds and available memory.
+
+    A background thread takes a reading every interval and keeps the latest one, so
+    the CPU figure always covers a fixed one-second window however rarely (or often)
+    admission checks run. ``sample`` starts the thread on first use.
+    """
+
+    def __init__(self) -> None:
+        self.cpus = os.cpu_count() or 1
+        self.cpu_percent: Optional[float] = None
+        self.available_mb: Optional[float] = None
+        self.sampled_at: Optional[float] = None
+        self._prev_cpu: Optional[Tuple[int, int]] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def sample(self) -> None:
+        if self._sampler is None:
+            self.start()
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._sampler is not None:
+                return
+            self._read()  # sets the CPU baseline and a first memory reading
+            self._sampler = threading.Thread(target=self._run, name="host-load-sampler", daemon=True)
+            self._sampler.start()
+
+    def _read(self) -> None:
+        if psutil is not None:
+            cpu = psutil.cpu_percent(None)
+            if self.sampled_at is not None:
+                self.cpu_percent = cpu
+        else:
+            cur = _read_proc_cpu()
+            if cur is not None and self._prev_cpu is not None and cur[1] > self._prev_cpu[1]:
+                self.cpu_percent = 100.0 * (cur[0] - self._prev_cpu[0]) / (cur[1] - self._prev_cpu[1])
+            self._prev_cpu = cur
+        self.available_mb = _read_available_mb()
+        self.sampled_at = time.time()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(_SAMPLE_INTERVAL)
+            try:
+                self._read()
+            except Exception:
+                # Keeps the last reading; admission carries on with it
+                logger.exception("Host load sampling failed")
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        cpu_max: float = CPU_MAX,
+        mem_reserve_mb: float = MEM_RESERVE_MB,
+        max_calls: int = MAX_CALLS,
+        min_calls: int = MIN_CALLS,
+    ) -> None:
+        self.cpu_max = cpu_max
+        self.mem_reserve_mb = mem_reserve_mb
+        self.max_calls = max(1, max_calls)
+        self.min_calls = max(1, min(min_calls, self.max_calls))
+        self.limit = float(self.max_calls)
+        self.host = HostLoad()
+        self.call_cores = DEFAULT_CALL_CORES
+        self.call_mb = DEFAULT_CALL_MB
+        self.cost_measured = False
+        self.admitted = 0
+        self.refused: Dict[str, int] = {"cpu": 0, "memory": 0, "concurrency": 0}
+        self.recent: deque = deque(maxlen=20)
+        self._adjusted = 0.0
+        self._limit_binding = False
+        self._lock = threading.Lock()
+
+    def set_call_cost(self, totals: Optional[Dict[str, Any]]) -> None:
+        """Use the measured per-call cost (``call_metrics.describe_totals``) once enough calls finished."""
+        if not totals or totals.get("calls", 0) < MIN_MEASURED_CALLS:
+            return
+        with self._lock:
+            self.call_cores = max(0.01, float(totals.get("avg_cores_per_call") or self.call_cores))
+            self.call_mb = float(totals.get("avg_rss_mb") or self.call_mb)
+            self.cost_measured = True
+
+    def effective_limit(self) -> int:
+        by_cost = int(self.host.cpus * self.cpu_max / 100 / self.call_cores)
+        return max(self.min_calls, min(int(self.limit), by_cost))
+
+    def _overloaded(self) -> Optional[str]:
+        if self.host.cpu_percent is not None and self.host.cpu_percent >= self.cpu_max:
+            return "cpu"
+        if self.host.available_mb is not None and self.host.available_mb < self.mem_reserve_mb:
+            return "memory"
+        return None
+
+    def _adjust(self, now: float) -> None:
+        """AIMD step: cut the limit while the host is over a threshold, grow it while it is the bottleneck."""
+        if now - self._adjusted < _ADJUST_INTERVAL:
+            return
+        self._adjusted = now
+        if self._overloaded() is not None:
+            self.limit = max(float(self.min_calls), self.limit * _DECREASE)
+        elif self._limit_binding and (self.host.cpu_percent or 0.0) < self.cpu_max * 0.8:
+            self.limit = min(float(self.max_calls), self.limit + 1)
+        self._limit_binding = False
+
+    def host_reason(self) -> Optional[str]:
+        """"cpu" or "memory" when the host is over a threshold right now, else None."""
+        with self._lock:
+            now = time.time()
+            self.host.sample()
+            self._adjust(now)
+            return self._overloaded()
+
+    def admit(self, active: int, launching: bool = True) -> Optional[str]:
+        """Whether one more call may start with ``active`` calls live: None, or the reason it may not.
+
+        ``launching=False`` for a process that already runs (a pre-staged call): its memory is in use.
+        """
+        with self._lock:
+            now = time.time()
+            self.host.sample()
+            self._adjust(now)
+            reason, detail = None, ""
+            cpu = self.host.cpu_percent
+            mem = self.host.available_mb
+            if cpu is not None and cpu + 100 * self.call_cores / self.host.cpus > self.cpu_max:
+                reason, detail = "cpu", f"host {cpu:.0f}% + {self.call_cores:.2f} cores per call > {self.cpu_max:.0f}%"
+            elif mem is not None and mem - (self.call_mb if launching else 0) < self.mem_reserve_mb:
+                reason, detail = "memory", f"{mem:.0f} MB available, {self.call_mb:.0f} MB per call, {self.mem_reserve_mb:.0f} MB reserved"
+            elif active >= self.effective_limit():
+                reason, detail = "concurrency", f"{active} live calls, limit {self.effective_limit()}"
+                self._limit_binding = True
+            if reason is None:
+                self.admitted += 1
+                return None
+            self.refused[reason] += 1
+            self.recent.append({"at": round(now, 1), "reason": reason, "detail": detail})
+            return reason
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.effective_limit(),
+                "aimd_limit": round(self.limit, 2),
+                "max_calls": self.max_calls,
+                "host": {
+                    "cpus": self.host.cpus,
+                    "cpu_percent": None if self.host.cpu_percent is None else round(self.host.cpu_percent, 1),
+                    "available_mb": None if self.host.available_mb is None else round(self.host.available_mb),
+                },
+                "thresholds": {"cpu_max": self.cpu_max, "mem_reserve_mb": self.mem_reserve_mb},
+                "call_cost": {"cores": round(self.call_cores, 3), "mb": round(self.call_mb, 1), "measured": self.cost_measured},
+                "admitted": self.admitted,
+                "refused": dict(self.refused),
+                "recent_refusals": list(self.recent),
+            }
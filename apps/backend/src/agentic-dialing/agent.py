@@ -1,16 +1,18 @@
-import csv
+import asyncio
 import importlib
 import json
 import logging
 import os
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from dotenv import load_dotenv
 
-from livekit import agents
+from livekit import agents, rtc
 from livekit.agents import AgentSession, Agent, RoomInputOptions
 from livekit.plugins import noise_cancellation, google
 
@@ -20,9 +22,28 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from backend.prompts import ENHANCED_DEMANDIFY_CALLER_INSTRUCTIONS, SESSION_INSTRUCTION
+from agent_dispatch import DISPATCH_AGENT_NAME
+from dial_state import new_worker_id
+from lead_columns import open_columns
+from leads import read_csv_leads
+from lead_queue import LeadWorkQueue, LeaseRenewer, csv_source, csv_version, lead_key
+from lead_search import LeadSearchIndex
+from prompt_budget import compose as compose_prompt, lead_context, split_static_and_delta
+from transcripts import TranscriptWriter, attach as attach_transcripts, transcript_url
 
 load_dotenv()
 
+# Opt-in (set to 1): send persona + script once as static agent instructions and only the
+# lead as the per-call delta, instead of inlining lead values into the script each call
+PROMPT_STATIC_SESSION = os.getenv("PROMPT_STATIC_SESSION", "0") == "1"
+# Capture call transcripts (journal under .transcripts/ plus backend ingest)
+TRANSCRIPTS_ENABLED = os.getenv("TRANSCRIPTS", "1") != "0"
+# Realtime model behind the agent: "google" (Gemini Live) or "stub" (scripted, offline; see realtime_stub)
+AGENT_REALTIME_MODEL = os.getenv("AGENT_REALTIME_MODEL", "google").strip().lower()
+# How `agent.py worker` runs dispatched calls: "process" (one interpreter per call) or "thread"
+# (many calls share one interpreter, each on its own thread and event loop; far less memory per call)
+AGENT_JOB_EXECUTOR = os.getenv("AGENT_JOB_EXECUTOR", "process").strip().lower()
+
 CAMPAIGN_MODULE_PREFIX = "backend.campaigns_prompts"
 CAMPAIGNS_DIR = BASE_DIR / "campaigns_prompts"
 CAMPAIGNS_STORE = BASE_DIR / "campaigns.json"
@@ -182,14 +203,35 @@ def _load_campaign_prompts(module_name: str | None = None,
     session_text = SESSION_INSTRUCTION
 
     try:
-        mod = importlib.import_module(module_name)
+        mod = _import_prompt_module(module_name)
         agent_text = getattr(mod, agent_attr, agent_text)
         session_text = getattr(mod, session_attr, session_text)
     except Exception:
         # Fallback to defaults silently
         pass
 
-    return agent_text, session_text
+    # Expand shared {{block:name}} sections (prompt_blocks/)
+    return compose_prompt(agent_text), compose_prompt(session_text)
+
+
+_PROMPT_MTIMES: Dict[str, float] = {}
+# Calls running as threads of one worker share the module cache; one import/reload at a time
+_PROMPT_IMPORT_LOCK = threading.Lock()
+
+
+def _import_prompt_module(module_name: str):
+    """Import a prompt module, reloading it if its file changed (long-lived workers outlive edits)."""
+    with _PROMPT_IMPORT_LOCK:
+        mod = importlib.import_module(module_name)
+        try:
+            mtime = os.path.getmtime(mod.__file__)
+        except (OSError, TypeError):
+            return mod
+        seen = _PROMPT_MTIMES.get(module_name)
+        if seen is not None and seen != mtime:
+            mod = importlib.reload(mod)
+        _PROMPT_MTIMES[module_name] = mtime
+        return mod
 
 
 def _select_campaign_from_console() -> tuple[str, str, str] | None:
@@ -219,26 +261,16 @@ def _select_campaign_from_console() -> tuple[str, str, str] | None:
         return None
 
 
-def _read_leads(leads_csv: str) -> List[Dict[str, str]]:
-    """Read all leads from the CSV as a list of dicts. Returns empty list on error."""
-    leads: List[Dict[str, str]] = []
-    try:
-        with open(leads_csv, mode="r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Normalize keys to expected set and ensure presence
-                leads.append({
-                    "prospect_name": row.get("prospect_name", "").strip(),
-                    "resource_name": row.get("resource_name", "").strip(),
-                    "job_title": row.get("job_title", "").strip(),
-                    "company_name": row.get("company_name", "").strip(),
-                    "email": row.get("email", "").strip(),
-                    "phone": row.get("phone", "").strip(),
-                    "timezone": row.get("timezone", "").strip(),
-                })
-    except Exception:
-        pass
-    return leads
+def _read_leads(leads_csv: str) -> Sequence[Dict[str, str]]:
+    """Read all leads from the CSV as a list of dicts. Returns empty list on error.
+
+    Uses the memory-mapped columnar copy of the CSV (shared with the web app) when it can.
+    """
+    if os.getenv("LEAD_COLUMNS", "1") != "0":
+        cols = open_columns(leads_csv)
+        if cols is not None:
+            return cols
+    return read_csv_leads(leads_csv)
 
 
 def _select_prospect_from_console(leads: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
@@ -268,23 +300,68 @@ def _select_prospect_from_console(leads: List[Dict[str, str]]) -> Optional[Dict[
         return None
 
 
+def _realtime_model():
+    if AGENT_REALTIME_MODEL == "stub":
+        from realtime_stub import StubRealtimeModel
+
+        return StubRealtimeModel.from_env()
+    if AGENT_REALTIME_MODEL != "google":
+        LOGGER.warning("Unknown AGENT_REALTIME_MODEL %r; using google", AGENT_REALTIME_MODEL)
+    return google.beta.realtime.RealtimeModel(
+        voice="Leda",
+        temperature=0.2,
+    )
+
+
 class Assistant(Agent):
-    def __init__(self, instructions_text: str) -> None:
+    def __init__(self, instructions_text: str, llm=None) -> None:
         super().__init__(
             instructions=instructions_text,
-            llm=google.beta.realtime.RealtimeModel(
-                voice="Leda",
-                temperature=0.2,
-            ),
+            llm=llm or _realtime_model(),
             tools=[],
         )
 
 
-async def entrypoint(ctx: agents.JobContext):
-    session = AgentSession(
-        
-    )
+def _job_executor_type() -> agents.JobExecutorType:
+    if AGENT_JOB_EXECUTOR == "thread":
+        return agents.JobExecutorType.THREAD
+    if AGENT_JOB_EXECUTOR != "process":
+        LOGGER.warning("Unknown AGENT_JOB_EXECUTOR %r; using process", AGENT_JOB_EXECUTOR)
+    return agents.JobExecutorType.PROCESS
+
+
+def _job_payload(ctx: agents.JobContext) -> Dict[str, object]:
+    """Lead/campaign metadata attached by an explicit dispatch (empty for console/env runs)."""
+    raw = getattr(getattr(ctx, "job", None), "metadata", "") or ""
+    if not raw:
+        return {}
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError:
+        LOGGER.warning("Ignoring malformed job metadata")
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+async def _wait_for_answer(ctx: agents.JobContext, identity: str) -> None:
+    """Wait until the dialled prospect picks up (a SIP participant joins the room while still ringing)."""
+    participant = await ctx.wait_for_participant(identity=identity)
+    if participant.attributes.get("sip.callStatus", "active") == "active":
+        return
+    answered = asyncio.Event()
+
+    def on_attributes(changed: Dict[str, str], p: rtc.Participant) -> None:
+        if p.identity == identity and p.attributes.get("sip.callStatus") == "active":
+            answered.set()
+
+    ctx.room.on("participant_attributes_changed", on_attributes)
+    try:
+        await answered.wait()
+    finally:
+        ctx.room.off("participant_attributes_changed", on_attributes)
 
+
+def _lead_from_env_or_console() -> Optional[Dict[str, str]]:
     # Load leads from CSV and determine which prospect to use
     leads_csv = os.getenv("LEADS_CSV_PATH", str(BASE_DIR / "leads.csv"))
     all_leads = _read_leads(leads_csv)
@@ -308,15 +385,97 @@ async def entrypoint(ctx: agents.JobContext):
     # Fallback to first row if still None
     if lead is None and all_leads:
         lead = all_leads[0]
+    return lead
+
+
+def prewarm(proc: agents.JobProcess) -> None:
+    """Runs once per idle job process of the persistent worker, before any call is assigned."""
+    for module_name, _, _ in get_campaigns().values():
+        try:
+            _import_prompt_module(module_name)
+        except Exception:
+            LOGGER.debug("Could not preload prompt module %s", module_name, exc_info=True)
+
+
+# Lead and prompts prepared by a parked auto-next call before its handoff
+_PRESTAGED: Optional[Dict[str, object]] = None
+
+
+def _prestage_call() -> None:
+    """Resolve the lead (LEAD_INDEX) and render the campaign prompts ahead of a parked call."""
+    global _PRESTAGED
+    try:
+        i = int(os.getenv("LEAD_INDEX") or 0) - 1
+    except ValueError:
+        return
+    leads = _read_leads(os.getenv("LEADS_CSV_PATH", str(BASE_DIR / "leads.csv")))
+    if not 0 <= i < len(leads):
+        return
+    _PRESTAGED = {"lead": leads[i], "prompts": _load_campaign_prompts()}
+
+
+def _wait_for_assignment(handoff: Path) -> Dict[str, object]:
+    """Block a parked agent until the web app writes its assignment (or the app goes away)."""
+    parent = os.getppid()
+    while True:
+        try:
+            payload = json.loads(handoff.read_text(encoding="utf-8"))
+            handoff.unlink()
+            return payload if isinstance(payload, dict) else {}
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError):
+            LOGGER.warning("Unreadable room assignment in %s", handoff)
+            return {}
+        if os.getppid() != parent:
+            sys.exit(0)
+        time.sleep(0.1)
+
+
+def _capture_transcript(ctx: agents.JobContext, session: AgentSession, lead: Optional[Dict[str, str]]) -> None:
+    """Stream this call's transcript to the journal/backend; flushed when the job shuts down."""
+    job_id = getattr(getattr(ctx, "job", None), "id", None)
+    call_id = job_id or f"{getattr(ctx.room, 'name', '') or 'console'}-{os.getpid()}-{int(time.time())}"
+    writer = TranscriptWriter(str(call_id), lead=lead, url=transcript_url())
+    attach_transcripts(session, writer, interim=os.getenv("TRANSCRIPT_INTERIM") == "1")
+
+    async def _flush() -> None:
+        await asyncio.to_thread(writer.close)
+        LOGGER.info("Transcript %s", writer.describe())
+
+    ctx.add_shutdown_callback(_flush)
+
+
+async def entrypoint(ctx: agents.JobContext):
+    # Everything per call (lead, prompts, session, model) stays local to this coroutine: with
+    # AGENT_JOB_EXECUTOR=thread many calls run this concurrently in one process
+    session = AgentSession(
+        
+    )
+
+    # Dispatched jobs carry the lead and campaign; console/env runs read the CSV
+    payload = _job_payload(ctx)
+    if payload:
+        lead = payload.get("lead") or None
+    elif _PRESTAGED is not None:
+        lead = _PRESTAGED["lead"]
+    else:
+        lead = _lead_from_env_or_console()
 
     # Campaign selection:
+    # - Dispatched jobs use the campaign from their metadata
     # - In child single-call runs, DO NOT prompt; rely on environment set by parent
     # - In parent interactive run, allow console campaign selection
-    if os.getenv("RUN_SINGLE_CALL") == "1":
+    campaign = payload.get("campaign") if payload else None
+    if isinstance(campaign, dict) and campaign.get("module"):
+        selection = (campaign["module"], campaign.get("agent") or DEFAULT_AGENT_ATTR, campaign.get("session") or DEFAULT_SESSION_ATTR)
+    elif payload or os.getenv("RUN_SINGLE_CALL") == "1":
         selection = CAMPAIGN_OVERRIDE  # use env/defaults
     else:
         selection = CAMPAIGN_OVERRIDE or _select_campaign_from_console()
-    if selection:
+    if _PRESTAGED is not None and not payload:
+        agent_instructions_text, session_instructions_text = _PRESTAGED["prompts"]
+    elif selection:
         mod_name, agent_attr, session_attr = selection
         agent_instructions_text, session_instructions_text = _load_campaign_prompts(
             module_name=mod_name,
@@ -327,6 +486,20 @@ async def entrypoint(ctx: agents.JobContext):
         # Use environment variables or defaults
         agent_instructions_text, session_instructions_text = _load_campaign_prompts()
 
+    per_call_instructions = None
+    if PROMPT_STATIC_SESSION:
+        agent_instructions_text, per_call_instructions = split_static_and_delta(
+            agent_instructions_text, session_instructions_text, lead
+        )
+
+    if TRANSCRIPTS_ENABLED:
+        _capture_transcript(ctx, session, lead)
+
+    # Dialled calls: talk to the prospect the web app dialled into the room, and close the
+    # room (hanging up) when they leave
+    prospect = payload.get("prospect_identity") if payload else None
+    linked = {"participant_identity": prospect, "delete_room_on_close": True} if prospect else {}
+
     await session.start(
         room=ctx.room,
         agent=Assistant(agent_instructions_text),
@@ -336,14 +509,19 @@ async def entrypoint(ctx: agents.JobContext):
             # - For telephony applications, use `BVCTelephony` for best results
             video_enabled=False,
             noise_cancellation=noise_cancellation.BVCTelephony(),
+            **linked,
         ),
     )
 
     await ctx.connect()
+    if prospect:
+        await _wait_for_answer(ctx, prospect)
 
     # Prepare session instructions with lead details (campaign-specific)
     instructions = session_instructions_text
-    if lead:
+    if per_call_instructions is not None:
+        instructions = per_call_instructions
+    elif lead:
         # Replace bracket placeholders in the script when present
         def repl(text, placeholder, value):
             return text.replace(placeholder, value) if value else text
@@ -355,16 +533,7 @@ async def entrypoint(ctx: agents.JobContext):
         instructions = repl(instructions, "[____@abc.com]", lead.get("email", "email@domain.com"))
 
         # Also provide a structured preface the LLM can reference
-        instructions = (
-            f"Lead Context:\n"
-            f"- Prospect Name: {lead.get('prospect_name','')}\n"
-            f"- Job Title: {lead.get('job_title','')}\n"
-            f"- Company: {lead.get('company_name','')}\n"
-            f"- Email: {lead.get('email','')}\n"
-            f"- Phone: {lead.get('phone','')}\n"
-            f"- Timezone: {lead.get('timezone','')}\n"
-            f"- Caller (Resource Name): {lead.get('resource_name','')}\n\n"
-        ) + instructions
+        instructions = lead_context(lead) + "\n" + instructions
 
     await session.generate_reply(
         instructions=instructions,
@@ -372,6 +541,38 @@ async def entrypoint(ctx: agents.JobContext):
 
 
 if __name__ == "__main__":
+    # Persistent worker: registers once under AGENT_DISPATCH_NAME and serves explicitly
+    # dispatched calls back to back from prewarmed job processes (`agent.py worker [--flags]`),
+    # or, with AGENT_JOB_EXECUTOR=thread, as concurrent sessions inside this one process
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        sys.argv = [sys.argv[0], "start", *sys.argv[2:]]
+        agents.cli.run_app(
+            agents.WorkerOptions(
+                entrypoint_fnc=entrypoint,
+                prewarm_fnc=prewarm,
+                agent_name=DISPATCH_AGENT_NAME,
+                job_executor_type=_job_executor_type(),
+            )
+        )
+        sys.exit(0)
+
+    # Parked agent: everything is imported and prompts are loaded; wait for the web app's
+    # handoff, then either connect to the assigned room (like `agent.py connect --room <room>`)
+    # or, for a pre-staged auto-next call, run the already-resolved lead as a console call
+    if len(sys.argv) > 2 and sys.argv[1] == "park":
+        prewarm(None)
+        _prestage_call()
+        assignment = _wait_for_assignment(Path(sys.argv[2]))
+        os.environ.update({str(k): str(v) for k, v in (assignment.get("env") or {}).items()})
+        if assignment.get("mode") == "console":
+            sys.argv = [sys.argv[0], "console"]
+        elif assignment.get("room"):
+            sys.argv = [sys.argv[0], "connect", "--room", str(assignment["room"])]
+        else:
+            sys.exit(1)
+        agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+        sys.exit(0)
+
     # If invoked as a child single-call run, execute one session and exit
     if os.getenv("RUN_SINGLE_CALL") == "1":
         agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
@@ -395,6 +596,18 @@ if __name__ == "__main__":
         print("No leads found. Please check leads.csv or LEADS_CSV_PATH.")
         sys.exit(1)
 
+    search_index = LeadSearchIndex(leads_list)
+    search_index.build()
+
+    # Shared work queue: other console dialers and the web app drain the same list,
+    # so every call claims its lead first and nobody dials it twice
+    queue = LeadWorkQueue(os.getenv("LEAD_QUEUE_DB"))
+    queue_owner = new_worker_id()
+    queue_source = csv_source(leads_csv_path)
+    queue.ensure_source(queue_source, len(leads_list), csv_version(leads_csv_path),
+                        lambda: [lead_key(lead) for lead in leads_list])
+    LeaseRenewer(queue, queue_owner).start()
+
     pointer = 0  # default next index for Enter-to-next behavior
     page_size = 8
     current_page = 0
@@ -429,7 +642,7 @@ if __name__ == "__main__":
             marker = _s("← next", GREEN) if idx_global == pointer else ""
             print(f"  {_s(f'[{idx_display:02d}]', CYAN)} {_s(name, BOLD)} {_s('—', GRAY)} {comp} {marker}")
         print(_s("╚══════════════════════════════════════════════════════════════════════════════════════════════════════════╝", CYAN))
-        print(_s("Enter = NEXT • Number = select on this page • N = next page • P = prev page • 'q' = quit", DIM))
+        print(_s("Enter = NEXT • Number = select on this page • N = next page • P = prev page • /text = search • 'q' = quit", DIM))
         choice = input(_s("Your choice: ", GREEN)).strip().lower()
 
         if choice == "q":
@@ -446,8 +659,35 @@ if __name__ == "__main__":
                 current_page -= 1
             continue
 
-        if choice == "":
-            call_index = pointer
+        if choice.startswith("/"):
+            hits = search_index.search(choice[1:], limit=page_size)
+            if not hits:
+                print(_s("No matching prospects.", YELLOW))
+                continue
+            print(_s(f"Search results for '{choice[1:].strip()}':", CYAN))
+            for n, idx_global in enumerate(hits, start=1):
+                ld = leads_list[idx_global]
+                print(f"  {_s(f'[{n:02d}]', CYAN)} {_s(ld.get('prospect_name', ''), BOLD)} {_s('—', GRAY)} "
+                      f"{ld.get('company_name', '')} {_s(ld.get('phone', ''), DIM)}")
+            pick = input(_s("Enter number to call (or press Enter to go back): ", GREEN)).strip()
+            if not pick:
+                continue
+            try:
+                num = int(pick)
+            except ValueError:
+                print(_s("Invalid input. Try again.", YELLOW))
+                continue
+            if not 1 <= num <= len(hits):
+                print(_s("Invalid number. Try again.", YELLOW))
+                continue
+            call_index = hits[num - 1]
+        elif choice == "":
+            claimed = queue.claim(queue_source, queue_owner, 1, after=pointer)
+            if not claimed:
+                print(_s("Every lead has been dialled or is claimed by another dialer.", YELLOW))
+                continue
+            call_index = claimed[0] - 1
+            pointer = call_index
         else:
             try:
                 num = int(choice)
@@ -461,6 +701,11 @@ if __name__ == "__main__":
                 print(_s("Invalid input. Try again.", YELLOW))
                 continue
 
+        if not queue.claim_index(queue_source, call_index + 1, queue_owner):
+            print(_s(f"Lead #{call_index + 1} is being dialled by another dialer.", YELLOW))
+            continue
+        queue.start(queue_source, call_index + 1, queue_owner)
+
         # Prepare env and run child single-call process
         child_env = os.environ.copy()
         child_env.update(campaign_env)
@@ -473,6 +718,7 @@ if __name__ == "__main__":
             subprocess.run([sys.executable, "-m", AGENT_MODULE, "console"], env=child_env, check=False)
         except KeyboardInterrupt:
             print(_s("\nCall interrupted. Returning to menu...\n", YELLOW))
+        queue.finish(queue_source, call_index + 1, queue_owner, "done")
 
         # Advance pointer when using Enter (next) or when the called index equals pointer
         if call_index == pointer:
@@ -0,0 +1,261 @@
+"""Explicit dispatch of calls to a long-lived LiveKit agent worker.
+
+With ``AGENT_DISPATCH_MODE=worker`` the web app no longer launches
+``agent.py console`` per call. A persistent worker (``python agent.py worker``)
+registers once under ``AGENT_DISPATCH_NAME`` and keeps prewarmed job processes;
+each call becomes a room plus an agent dispatch whose metadata carries the lead
+and campaign, which ``entrypoint`` reads from ``ctx.job.metadata``, and the
+prospect is dialled into that room over the SIP outbound trunk
+(``LIVEKIT_SIP_OUTBOUND_TRUNK_ID``). The call ends when the prospect or the agent
+leaves. With ``AGENT_JOB_EXECUTOR=thread`` the worker runs those calls as
+concurrent sessions in its own process instead of one process per call.
+
+Talks to the LiveKit server API over Twirp/JSON with the same hand-rolled JWTs
+the web app already issues for browser calls.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+import httpx
+import jwt  # PyJWT
+
+LIVEKIT_URL = os.getenv("LIVEKIT_URL", "")
+LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY", "")
+LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET", "")
+DISPATCH_AGENT_NAME = os.getenv("AGENT_DISPATCH_NAME", "agentic-dialer")
+SIP_OUTBOUND_TRUNK_ID = os.getenv("LIVEKIT_SIP_OUTBOUND_TRUNK_ID", "")
+# End a call whose prospect never shows up in the room (dial-out failed before ringing)
+DIAL_ANSWER_TIMEOUT = float(os.getenv("AGENT_DIAL_ANSWER_TIMEOUT", "60"))
+# Close call rooms shortly after everyone (agent included) has left
+ROOM_EMPTY_TIMEOUT = int(os.getenv("AGENT_ROOM_EMPTY_TIMEOUT", "10"))
+_ROOM_CHECK_INTERVAL = 2.0
+# ParticipantInfo.Kind, as enum names or numbers depending on the server's JSON encoding
+_AGENT_KINDS = ("AGENT", 4)
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchError(RuntimeError):
+    """Raised when LiveKit rejects or cannot be reached for a dispatch request."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _api_base() -> str:
+    url = LIVEKIT_URL.rstrip("/")
+    if url.startswith("wss://"):
+        return "https://" + url[len("wss://"):]
+    if url.startswith("ws://"):
+        return "http://" + url[len("ws://"):]
+    return url
+
+
+def _admin_token(room: Optional[str] = None, sip: bool = False) -> str:
+    now = int(time.time())
+    grant: Dict[str, Any] = {"roomCreate": True, "roomList": True, "roomAdmin": True}
+    if room:
+        grant["room"] = room
+    payload = {"iss": LIVEKIT_API_KEY, "sub": LIVEKIT_API_KEY, "nbf": now - 10, "exp": now + 60, "video": grant}
+    if sip:
+        payload["sip"] = {"call": True}
+    return jwt.encode(payload, LIVEKIT_API_SECRET, algorithm="HS256")
+
+
+def _twirp(service: str, method: str, body: Dict[str, Any], room: Optional[str] = None,
+           sip: bool = False) -> Dict[str, Any]:
+    if not (LIVEKIT_URL and LIVEKIT_API_KEY and LIVEKIT_API_SECRET):
+        raise DispatchError("LiveKit credentials not configured")
+    try:
+        resp = httpx.post(
+            f"{_api_base()}/twirp/livekit.{service}/{method}",
+            json=body,
+            headers={"Authorization": f"Bearer {_admin_token(room, sip)}"},
+            timeout=10,
+        )
+    except httpx.HTTPError as exc:
+        raise DispatchError(f"LiveKit {method} failed: {exc}") from exc
+    if resp.status_code >= 400:
+        raise DispatchError(f"LiveKit {method} failed ({resp.status_code}): {resp.text[:200]}", resp.status_code)
+    return resp.json() if resp.content else {}
+
+
+def new_room_name(lead_index: int) -> str:
+    return f"call-{lead_index}-{uuid.uuid4().hex[:8]}"
+
+
+def build_job_metadata(
+    lead: Optional[Dict[str, str]],
+    lead_index: int,
+    campaign_key: Optional[str] = None,
+    campaign: Optional[tuple] = None,
+    source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Metadata ``entrypoint`` understands: the lead itself plus the campaign prompt location."""
+    meta: Dict[str, Any] = {"lead": dict(lead) if lead else {}, "lead_index": lead_index, "source": source}
+    if campaign:
+        module, agent_attr, session_attr = campaign
+        meta["campaign"] = {"key": campaign_key, "module": module, "agent": agent_attr, "session": session_attr}
+    return meta
+
+
+def dial_prospect(room: str, number: str, identity: str, name: str = "") -> Dict[str, Any]:
+    """Dial ``number`` over the SIP outbound trunk as participant ``identity`` of ``room``.
+
+    Returns once the call is placed; the participant is in the room while it rings and
+    leaves if nobody answers.
+    """
+    if not SIP_OUTBOUND_TRUNK_ID:
+        raise DispatchError("LIVEKIT_SIP_OUTBOUND_TRUNK_ID not configured")
+    return _twirp(
+        "SIP",
+        "CreateSIPParticipant",
+        {
+            "sip_trunk_id": SIP_OUTBOUND_TRUNK_ID,
+            "sip_call_to": number,
+            "room_name": room,
+            "participant_identity": identity,
+            "participant_name": name or identity,
+            "wait_until_answered": False,
+        },
+        room,
+        sip=True,
+    )
+
+
+def dispatch_agent(room: str, metadata: Dict[str, Any], agent_name: str = DISPATCH_AGENT_NAME) -> Dict[str, Any]:
+    """Create ``room`` and ask the named agent worker to join it with ``metadata``."""
+    _twirp("RoomService", "CreateRoom", {"name": room, "empty_timeout": ROOM_EMPTY_TIMEOUT}, room)
+    return _twirp(
+        "AgentDispatchService",
+        "CreateDispatch",
+        {"agent_name": agent_name, "room": room, "metadata": json.dumps(metadata, ensure_ascii=False)},
+        room,
+    )
+
+
+def dispatch_call(room: str, metadata: Dict[str, Any], number: str,
+                  agent_name: str = DISPATCH_AGENT_NAME) -> "DispatchedCall":
+    """Dispatch the agent into ``room`` and dial the prospect at ``number`` into it.
+
+    The agent greets once the prospect (``metadata["prospect_identity"]``) has answered.
+    Blocking (LiveKit API round trips): call it off the event loop. On failure the room
+    is deleted again and ``DispatchError`` raised.
+    """
+    lead_index = metadata.get("lead_index") or 0
+    identity = f"prospect-{lead_index}-{uuid.uuid4().hex[:6]}"
+    dispatch_agent(room, {**metadata, "prospect_identity": identity}, agent_name)
+    try:
+        dial_prospect(room, number, identity, (metadata.get("lead") or {}).get("prospect_name", ""))
+    except DispatchError:
+        try:
+            delete_room(room)
+        except DispatchError:
+            pass  # empty_timeout closes it
+        raise
+    return DispatchedCall(room, identity)
+
+
+def room_exists(room: str) -> bool:
+    rooms = _twirp("RoomService", "ListRooms", {"names": [room]}).get("rooms") or []
+    return any(r.get("name") == room for r in rooms)
+
+
+def is_agent_participant(participant: Dict[str, Any]) -> bool:
+    return participant.get("kind") in _AGENT_KINDS or str(participant.get("identity") or "").startswith("agent-")
+
+
+def room_participants(room: str) -> Optional[list]:
+    """Participants currently in ``room``; None when the room no longer exists."""
+    try:
+        return _twirp("RoomService", "ListParticipants", {"room": room}, room).get("participants") or []
+    except DispatchError as exc:
+        if exc.status == 404:
+            return None
+        raise
+
+
+def delete_room(room: str) -> None:
+    _twirp("RoomService", "DeleteRoom", {"room": room}, room)
+
+
+class DispatchedCall:
+    """Popen-like handle for a dispatched call, so the call supervisor can treat both modes alike.
+
+    A monitor thread watches the room: the call ends when the prospect or the agent
+    leaves after joining (the room is then deleted, hanging up the other side), when
+    the prospect never joins within ``DIAL_ANSWER_TIMEOUT``, or when the room is gone.
+    ``poll`` and ``terminate`` never wait on the LiveKit API.
+    """
+
+    pid: Optional[int] = None
+
+    def __init__(self, room: str, prospect_identity: Optional[str] = None) -> None:
+        self.room = room
+        self.prospect_identity = prospect_identity
+        self.returncode: Optional[int] = None
+        self._stop = threading.Event()
+        threading.Thread(target=self._monitor, name=f"call-room-{room}", daemon=True).start()
+
+    def _roles(self, participants: list) -> Set[str]:
+        roles = set()
+        for p in participants:
+            if self.prospect_identity and p.get("identity") == self.prospect_identity:
+                roles.add("prospect")
+            elif is_agent_participant(p):
+                roles.add("agent")
+        return roles
+
+    def _hang_up(self, returncode: int) -> None:
+        try:
+            delete_room(self.room)
+        except DispatchError as exc:
+            if exc.status != 404:
+                logger.warning("Could not delete call room %s: %s", self.room, exc)
+        self.returncode = returncode
+
+    def _monitor(self) -> None:
+        started = time.monotonic()
+        seen: Set[str] = set()
+        while self.returncode is None:
+            if self._stop.wait(_ROOM_CHECK_INTERVAL):
+                self._hang_up(-15)
+                return
+            try:
+                participants = room_participants(self.room)
+            except DispatchError:
+                # Transient API failure: keep treating the call as live until the next check
+                continue
+            if participants is None:
+                self.returncode = 0
+                return
+            roles = self._roles(participants)
+            left = seen - roles
+            seen |= roles
+            if left:
+                logger.info("Call room %s: %s left; ending the call", self.room, " and ".join(sorted(left)))
+                self._hang_up(0)
+            elif self.prospect_identity and "prospect" not in seen and time.monotonic() - started > DIAL_ANSWER_TIMEOUT:
+                logger.info("Call room %s: prospect never joined; ending the call", self.room)
+                self._hang_up(0)
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def terminate(self) -> None:
+        self._stop.set()
+
+    def send_signal(self, sig: int) -> None:
+        self.terminate()
+
+    def kill(self) -> None:
+        self.terminate()
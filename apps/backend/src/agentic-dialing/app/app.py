@@ -28,32 +28,42 @@ def _slugify(name: str) -> str:
 
 
 def _load_campaigns_store() -> List[Dict[str, str]]:
+    """Campaigns from the Node backend (coalesced across concurrent requests); callers get their own copies."""
+    return [dict(it) for it in BACKEND_FLIGHTS.do("campaigns", _fetch_campaigns_store)]
+
+
+def _fetch_campaigns_store() -> List[Dict[str, str]]:
     """Fetch campaigns from Node backend (Prisma) and mirror to local cache."""
     try:
-        base = os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
-        import httpx
-        with httpx.Client(timeout=10) as client:
-            r = client.get(f"{base}/campaigns")
-            if r.status_code == 200:
-                payload = r.json() or {}
-                rows = payload.get("items") or []
-                items: List[Dict[str, str]] = []
-                for it in rows:
-                    name = (it.get("name") or "").strip()
-                    module = (it.get("module") or "").strip()
-                    if not (name and module):
-                        continue
-                    agent_text = it.get("agent_text") or ""
-                    session_text = it.get("session_text") or ""
-                    try:
-                        _generate_prompt_module(module, agent_text, session_text)
-                    except Exception:
-                        pass
-                    items.append({"name": name, "module": module})
-                _save_campaigns_store(items)
-                return items
+        r = backend_request("GET", "/campaigns", timeout=10)
+        if r.status_code == 200:
+            payload = r.json() or {}
+            rows = payload.get("items") or []
+            items: List[Dict[str, str]] = []
+            for it in rows:
+                name = (it.get("name") or "").strip()
+                module = (it.get("module") or "").strip()
+                if not (name and module):
+                    continue
+                agent_text = it.get("agent_text") or ""
+                session_text = it.get("session_text") or ""
+                try:
+                    _generate_prompt_module(module, agent_text, session_text)
+                except Exception:
+                    pass
+                items.append({"name": name, "module": module})
+            # Mirror only: this runs inside the coalesced fetch, which must stay cacheable
+            _write_campaigns_cache(items)
+            return items
+    except BackendUnavailable as exc:
+        logger.warning("Campaigns backend unavailable (%s); using local cache", exc)
     except Exception:
         logger.exception("Failed to load campaigns from Node backend; falling back to local cache")
+    return _read_campaigns_cache()
+
+
+def _read_campaigns_cache() -> List[Dict[str, str]]:
+    """Campaigns last mirrored from the Node backend (``campaigns.json``)."""
     try:
         if CAMPAIGNS_STORE.exists():
             return json.loads(CAMPAIGNS_STORE.read_text(encoding="utf-8"))
@@ -63,6 +73,12 @@ def _load_campaigns_store() -> List[Dict[str, str]]:
 
 
 def _save_campaigns_store(items: List[Dict[str, str]]) -> None:
+    """Persist a campaign change: drop the coalesced result, then update the local mirror."""
+    BACKEND_FLIGHTS.forget("campaigns")
+    _write_campaigns_cache(items)
+
+
+def _write_campaigns_cache(items: List[Dict[str, str]]) -> None:
     try:
         CAMPAIGNS_STORE.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
     except Exception:
@@ -137,6 +153,7 @@ def _sync_from_supabase_if_available() -> List[Dict[str, str]]:
     """Fetch campaigns from Supabase and mirror to local cache."""
     return _load_campaigns_store()
 
+import asyncio
 import os
 import sys
 import csv
@@ -144,29 +161,86 @@ import math
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from fastapi import FastAPI, Request, Form, BackgroundTasks, HTTPException, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # Use project root as base
 BASE_DIR = Path(__file__).resolve().parents[1]
 AGENT_MODULE = "backend.agent"
-LEADS_CSV = os.getenv("LEADS_CSV_PATH", str(BASE_DIR / "leads.csv"))
+_DEFAULT_LEADS_CSV = os.getenv("LEADS_CSV_PATH", str(BASE_DIR / "leads.csv"))
 CSV_DIR = Path(os.getenv("LEADS_CSV_DIR", str(BASE_DIR))).resolve()
 CSV_DIR.mkdir(parents=True, exist_ok=True)
 _SELECTED_FILE_STORE = BASE_DIR / ".leads_csv"
 CAMPAIGNS_DIR = BASE_DIR / "campaigns_prompts"
 CAMPAIGNS_DIR.mkdir(parents=True, exist_ok=True)
 CAMPAIGNS_STORE = BASE_DIR / "campaigns.json"
-SELECTED_CSV_REMOTE_KEY: Optional[str] = None
 
 # Import campaign mapping and display helper from backend
 from backend.agent import CAMPAIGNS, _campaign_display_name
-app = FastAPI(title="AI Calling Agent - Web UI")
+from agent_dispatch import (
+    DispatchError,
+    DispatchedCall,
+    build_job_metadata,
+    delete_room,
+    dispatch_agent,
+    dispatch_call,
+    is_agent_participant,
+    new_room_name,
+    room_participants,
+)
+from dial_state import DialState, create_backend, new_worker_id
+from lead_queue import DEFAULT_LEASE_TTL as LEAD_LEASE_DEFAULT_TTL, LeadWorkQueue, LeaseRenewer, csv_source, csv_version, lead_key
+from fast_json import CompressionMiddleware, FastJSONResponse
+from room_pool import HANDOFF_DIR, PoolFull, RoomAgentPool, RoomBusy
+from call_prestage import StagedCall
+from csv_sync import fetch_csv, fetch_csv_async, write_csv_atomic
+from suppression import RECENT, Suppression, normalize_number
+from rate_limit import DialRateLimiter
+from admission import RETRY_AFTER as ADMISSION_RETRY_AFTER, AdmissionController
+from call_metrics import CALL_METRICS_INTERVAL, CallUsage, add_to_totals, describe_totals
+from backend_client import (
+    BackendUnavailable,
+    SingleFlight,
+    arequest as backend_arequest,
+    base_url as backend_base_url,
+    breaker as backend_breaker,
+    breaker_states,
+    request as backend_request,
+)
+
+# Shared in-flight/just-fetched results for backend resources (campaigns, csv/list)
+BACKEND_FLIGHTS = SingleFlight()
+from lead_columns import open_columns, remove_columns
+from leads import Lead, read_csv_leads
+from prompt_budget import analyse as analyse_prompts, delete_block, list_blocks, load_campaign_texts, save_block
+from lead_search import DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT, get_search_index, search_leads
+from lead_sets import (
+    MODES as LEAD_SET_MODES,
+    LeadSetSequence,
+    find_lead_set,
+    load_lead_sets,
+    open_lead_set,
+    parse_members,
+    save_lead_sets,
+)
+from lead_store import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursor,
+    LeadStore,
+    decode_cursor,
+    encode_cursor,
+    get_lead_store,
+    parse_filters,
+    validate_sort,
+)
+app = FastAPI(title="AI Calling Agent - Web UI", default_response_class=FastJSONResponse)
 
 # Configure CORS for frontend deployment
 app.add_middleware(
@@ -184,6 +258,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/brotli for larger bodies (lead pages, CSV previews, campaign lists)
+app.add_middleware(CompressionMiddleware)
+
 # Mount static and templates
 STATIC_DIR = Path(__file__).resolve().parent / "static"
 TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
@@ -208,23 +285,81 @@ SIP_WS_URL = os.getenv("SIP_WS_URL", "").strip()  # optional explicit WSS, else
 # We'll sign tokens using PyJWT to avoid extra deps
 import time
 import jwt  # PyJWT
-import httpx
 
-# Cache for vendor script to avoid repeated external fetches
-_LK_JS_CACHE: dict[str, bytes] = {}
+# Disk-backed cache for vendor scripts (prewarmed at startup; no CDN fetches on request)
+from vendor_assets import (
+    asset_response as vendor_asset_response,
+    ensure_warming as ensure_vendor_warming,
+    get_asset as get_vendor_asset,
+)
 
-# Global state for managing a single running console call
-from threading import Lock, Thread
+from threading import Lock, RLock, Thread
+import uuid
 import signal
 
+# -----------------------------
+# Shared dial state
+# -----------------------------
+# Selected CSV / lead set / campaign, the auto-next flag and the running call live
+# in a store shared by every uvicorn worker (SQLite next to the app by default).
+# Only one call runs at a time: the "call" lease names the worker that owns the
+# child process, and the "watcher" lease elects the worker that starts the next
+# call when auto-next is on.
+DIAL_STATE_URL = os.getenv("DIAL_STATE_URL") or f"sqlite:///{BASE_DIR / '.dial_state.sqlite3'}"
+STATE = DialState(create_backend(DIAL_STATE_URL))
+WORKER_ID = new_worker_id()
+LEASE_TTL = float(os.getenv("DIAL_STATE_LEASE_TTL", "10"))
+# process: launch `agent.py console` per call; worker: dispatch to a persistent `agent.py worker`
+AGENT_DISPATCH_MODE = os.getenv("AGENT_DISPATCH_MODE", "process").strip().lower()
+CALL_LEASE = "call"
+WATCHER_LEASE = "watcher"
+# A call whose owner stopped renewing its lease stays "interrupted" (slot taken) until its agent is gone
+CALL_ORPHAN_GRACE = float(os.getenv("CALL_ORPHAN_GRACE", "10"))  # SIGTERM, then SIGKILL after this
+CALL_ORPHAN_MAX_PARK = float(os.getenv("CALL_ORPHAN_MAX_PARK", "600"))  # give up on agents we cannot reach
+_HOST = WORKER_ID.split(":", 1)[0]
+
 _proc_lock = Lock()
-CURRENT_PROC: Optional[subprocess.Popen] = None
-CURRENT_STATUS: str = "idle"  # idle | running | stopping
-CURRENT_LEAD_INDEX: Optional[int] = None  # 1-based
-SELECTED_CAMPAIGN: Optional[str] = None
-AUTO_NEXT: bool = False
+CURRENT_PROC: Optional[subprocess.Popen] = None  # this worker's child, while it owns the call lease
+_LAUNCHING: bool = False  # the call slot is reserved while spawn_call starts its agent
 _WATCHER_STARTED: bool = False
 
+# Lead work queue: which leads are claimed/being dialled/done, shared by every dialer
+# (web workers here, other nodes, console dialers) so one list is drained exactly once.
+LEAD_QUEUE = LeadWorkQueue(os.getenv("LEAD_QUEUE_DB"))
+LEAD_QUEUE_BATCH = max(1, int(os.getenv("LEAD_QUEUE_BATCH", "5")))
+LEAD_LEASE_TTL = float(os.getenv("LEAD_QUEUE_LEASE_TTL", str(LEAD_LEASE_DEFAULT_TTL)))
+_queue_lock = Lock()
+_CLAIMED: List[int] = []  # leads this worker claimed ahead for auto-next, from _CLAIMED_SOURCE
+_CLAIMED_SOURCE: Optional[str] = None
+
+# Do-not-call lists and the shared recent-dial window, checked before every dial
+SUPPRESSION_ENABLED = os.getenv("SUPPRESSION", "1") != "0"
+SUPPRESSION = Suppression(LEAD_QUEUE.path)
+
+# Calls-per-second buckets (global / country prefix / campaign) applied before spawn_call; kept in the
+# dial-state backend so the limits hold across all web workers
+DIAL_LIMITER = DialRateLimiter.from_env(STATE.backend)
+# Manual starts wait this long for a dial slot before being refused with 429
+DIAL_RATE_MAX_WAIT = float(os.getenv("DIAL_RATE_MAX_WAIT", "30"))
+
+# Sample CPU / RSS / fds of each console call's process tree (see call_metrics)
+CALL_METRICS_ENABLED = os.getenv("CALL_METRICS", "1") != "0"
+
+# Hold new calls back while the host is CPU- or memory-saturated (see admission)
+ADMISSION_ENABLED = os.getenv("ADMISSION", "1") != "0"
+ADMISSION = AdmissionController()
+
+# Serve lead lists from memory-mapped columnar files (.<name>.leadcols) built once per CSV
+LEAD_COLUMNS = os.getenv("LEAD_COLUMNS", "1") != "0"
+
+# Pipelined auto-next: during a call, the owning worker parks the next lead's agent process
+# (imports done, lead resolved, prompts rendered) and releases it when the call ends
+AUTO_NEXT_PRESTAGE = os.getenv("AUTO_NEXT_PRESTAGE", "1") != "0" and AGENT_DISPATCH_MODE != "worker"
+# Let the live call finish its own start-up before competing with it for CPU
+PRESTAGE_DELAY = float(os.getenv("AUTO_NEXT_PRESTAGE_DELAY", "3"))
+_stage_lock = RLock()
+_STAGED: Optional[StagedCall] = None
+
 # -----------------------------
 # CSV management helpers
 # -----------------------------
@@ -251,55 +386,62 @@ def _csv_local_path(name: str) -> Path:
 
 
 def _supabase_csv_list() -> Optional[List[Dict[str, Any]]]:
+    """Remote CSV listing, coalesced across concurrent requests."""
+    items = BACKEND_FLIGHTS.do("csv/list", _fetch_supabase_csv_list)
+    return None if items is None else [dict(it) for it in items]
+
+
+def _fetch_supabase_csv_list() -> Optional[List[Dict[str, Any]]]:
     try:
-        base = os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
-        import httpx
-        with httpx.Client(timeout=10) as client:
-            r = client.get(f"{base}/csv/list")
-            if r.status_code == 200:
-                payload = r.json() or {}
-                files = payload.get("files") or []
-                # Normalize to fields the UI expects
-                return [{
-                    "name": f.get("name"),
-                    "size": f.get("size"),
-                    "uploaded_at": int(f.get("mtime") or 0)
-                } for f in files]
+        r = backend_request("GET", "/csv/list", timeout=10)
+        if r.status_code == 200:
+            payload = r.json() or {}
+            files = payload.get("files") or []
+            # Normalize to fields the UI expects
+            return [{
+                "name": f.get("name"),
+                "size": f.get("size"),
+                "uploaded_at": int(f.get("mtime") or 0)
+            } for f in files]
+    except BackendUnavailable as exc:
+        logger.warning("CSV list backend unavailable (%s); listing local files", exc)
     except Exception:
         logger.exception("Failed to list prospect CSVs from Node backend")
     return None
 
 
+def _remote_csv_url(sanitized: str) -> str:
+    return f"{backend_base_url()}/csv/download/{sanitized}"
+
+
 def _download_csv_from_supabase(name: str, force: bool = False) -> Optional[Path]:
-    """Fetch CSV via Node backend download endpoint and cache locally."""
+    """Fetch CSV via Node backend download endpoint and cache locally.
+
+    ``force`` revalidates a cached copy (conditional request); unchanged files are not rewritten.
+    """
     sanitized = _safe_csv_name(name)
-    local_path = _csv_local_path(sanitized)
-    if local_path.exists() and not force:
-        return local_path
-    try:
-        base = os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
-        import httpx
-        with httpx.Client(timeout=20) as client:
-            r = client.get(f"{base}/csv/download/{sanitized}")
-            if r.status_code == 200 and r.content:
-                local_path.write_bytes(r.content)
-                return local_path
-    except Exception:
-        logger.exception("Failed to download prospect CSV '%s' from Node backend", sanitized)
-    return local_path if local_path.exists() else None
+    return fetch_csv(_remote_csv_url(sanitized), _csv_local_path(sanitized), force=force, breaker=backend_breaker("csv/download"))
+
+
+async def _download_csv_from_supabase_async(name: str, force: bool = False) -> Optional[Path]:
+    """Streaming, non-blocking ``_download_csv_from_supabase`` for request handlers."""
+    sanitized = _safe_csv_name(name)
+    return await fetch_csv_async(
+        _remote_csv_url(sanitized), _csv_local_path(sanitized), force=force, breaker=backend_breaker("csv/download")
+    )
 
 
 def _upload_csv_to_supabase(name: str, content: bytes) -> Optional[str]:
     """Upload CSV to Node backend storage (Prisma metadata), return saved name."""
     sanitized = _safe_csv_name(name)
     try:
-        base = os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
-        import httpx
         files = {"file": (sanitized, content, "text/csv")}
-        with httpx.Client(timeout=20) as client:
-            r = client.post(f"{base}/csv/upload", files=files)
-            if r.status_code in (200, 201):
-                return sanitized
+        r = backend_request("POST", "/csv/upload", timeout=20, files=files)
+        if r.status_code in (200, 201):
+            BACKEND_FLIGHTS.forget("csv/list")
+            return sanitized
+    except BackendUnavailable as exc:
+        logger.warning("CSV upload backend unavailable (%s); kept '%s' locally", exc, sanitized)
     except Exception:
         logger.exception("Failed to upload CSV '%s' to Node backend", sanitized)
     return None
@@ -309,21 +451,21 @@ def _delete_supabase_csv(name: str) -> Optional[str]:
     """Delete CSV via Node backend; returns error string on failure or None on success."""
     sanitized = _safe_csv_name(name)
     try:
-        base = os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
-        import httpx
-        with httpx.Client(timeout=10) as client:
-            r = client.delete(f"{base}/csv/{sanitized}")
-            if r.status_code in (200, 204):
-                return None
-            return f"Delete failed: {r.status_code}"
+        r = backend_request("DELETE", f"/csv/{sanitized}", timeout=10)
+        if r.status_code in (200, 204):
+            BACKEND_FLIGHTS.forget("csv/list")
+            return None
+        return f"Delete failed: {r.status_code}"
+    except BackendUnavailable as exc:
+        return str(exc)
     except Exception as exc:
         logger.exception("Failed to delete prospect CSV '%s' via Node backend", sanitized)
         return str(exc)
 
 
-def _persist_selected_csv(path: Path, remote_key: Optional[str]) -> None:
+def _persist_selected_csv(path: Path, remote_key: Optional[str], lead_set: Optional[str] = None) -> None:
     try:
-        data = {"local": str(path.resolve()), "remote": remote_key or ""}
+        data = {"local": str(path.resolve()), "remote": remote_key or "", "lead_set": lead_set or ""}
         _SELECTED_FILE_STORE.write_text(json.dumps(data), encoding="utf-8")
     except Exception:
         pass
@@ -350,68 +492,244 @@ def _load_persisted_selected_csv() -> tuple[Optional[Path], Optional[str]]:
     return None, None
 
 
-def read_leads(csv_path: str) -> List[Dict[str, str]]:
-    """Read leads with as many useful fields as available."""
-    leads: List[Dict[str, str]] = []
+def _load_persisted_lead_set() -> Optional[str]:
     try:
-        if SELECTED_CSV_REMOTE_KEY:
-            _download_csv_from_supabase(SELECTED_CSV_REMOTE_KEY, force=False)
+        payload = json.loads(_SELECTED_FILE_STORE.read_text(encoding="utf-8"))
+        if isinstance(payload, dict) and payload.get("lead_set"):
+            name = str(payload["lead_set"])
+            return name if find_lead_set(name) else None
     except Exception:
         pass
+    return None
+
+
+def _load_leads(csv_path: str) -> Sequence[Lead]:
+    """Columnar, memory-mapped leads when available; parsed ``Lead`` records otherwise."""
+    if LEAD_COLUMNS:
+        cols = open_columns(csv_path)
+        if cols is not None:
+            return cols
+    return read_csv_leads(csv_path)
+
+
+def _build_lead_columns(path: Path) -> None:
+    """Convert an imported CSV to its columnar file off the request path."""
+    if LEAD_COLUMNS:
+        Thread(target=open_columns, args=(path,), name="lead-columns-build", daemon=True).start()
+
+
+def _ensure_selected_csv_cached() -> None:
     try:
-        with open(csv_path, "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                leads.append({
-                    "prospect_name": (row.get("prospect_name") or "").strip(),
-                    "company_name": (row.get("company_name") or "").strip(),
-                    "job_title": (row.get("job_title") or "").strip(),
-                    "phone": (row.get("phone") or "").strip(),
-                    "email": (row.get("email") or "").strip(),
-                    "timezone": (row.get("timezone") or "").strip(),
-                })
-    except FileNotFoundError:
+        remote_key = STATE.selected_csv_remote_key
+        if remote_key:
+            _download_csv_from_supabase(remote_key, force=False)
+    except Exception:
         pass
-    return leads
+
+
+def _active_lead_store() -> LeadStore:
+    """Indexed store for the active CSV (rebuilt only when the file changes)."""
+    _ensure_selected_csv_cached()
+    return get_lead_store(STATE.leads_csv, _load_leads)
+
+
+def _warm_active_indexes() -> None:
+    """Build the lead store and search index for the active CSV off the request path."""
+    def _run() -> None:
+        try:
+            get_search_index(_active_lead_store(), background=False)
+        except Exception:
+            logger.exception("Failed to build lead indexes for %s", STATE.leads_csv)
+    Thread(target=_run, name="lead-index-warm", daemon=True).start()
+
+
+def _lead_set_member_path(name: str) -> Path:
+    local = _download_csv_from_supabase(name, force=False)
+    return local if local is not None else _csv_local_path(name)
+
+
+def _active_lead_set() -> Optional[LeadSetSequence]:
+    """Lazy sequence for the active lead set, or None when a single CSV is active."""
+    name = STATE.active_lead_set
+    if not name:
+        return None
+    definition = find_lead_set(name)
+    if not definition:
+        return None
+    return open_lead_set(definition, _lead_set_member_path)
+
+
+def _active_leads() -> Sequence[Dict[str, str]]:
+    seq = _active_lead_set()
+    return seq if seq is not None else _active_lead_store().leads
+
+
+def _resolve_dial_target(idx1: int) -> tuple[str, int]:
+    """Map a 1-based global lead index to (csv path, 1-based row in that file) for the agent child."""
+    seq = _active_lead_set()
+    if seq is not None:
+        path, local = seq.locate(idx1 - 1)
+        return path, local + 1
+    return STATE.leads_csv, idx1
 
 
 def get_lead_by_index_1based(idx1: int) -> Optional[Dict[str, str]]:
     try:
-        leads = read_leads(LEADS_CSV)
-        if 1 <= idx1 <= len(leads):
-            return leads[idx1 - 1]
+        seq = _active_lead_set()
+        if seq is not None:
+            return seq[idx1 - 1] if 1 <= idx1 <= len(seq) else None
+        return _active_lead_store().get(idx1 - 1)
     except Exception:
         pass
     return None
 
 
 # Initialize selected CSV from persisted file if available
+# (seeded once; later workers and restarts keep what is already in the shared state)
 _persisted_path, _persisted_remote = _load_persisted_selected_csv()
 if _persisted_path:
-    LEADS_CSV = str(_persisted_path)
-    SELECTED_CSV_REMOTE_KEY = _persisted_remote
+    STATE.seed("leads_csv", str(_persisted_path))
+    STATE.seed("selected_csv_remote_key", _persisted_remote)
+else:
+    STATE.seed("leads_csv", _DEFAULT_LEADS_CSV)
+STATE.seed("active_lead_set", _load_persisted_lead_set())
+
+
+def _active_queue_source() -> tuple[str, int]:
+    """Queue key and lead count of the active list (a lead set by name, or a CSV by path)."""
+    seq = _active_lead_set()
+    if seq is not None:
+        return f"set:{seq.name}", len(seq)
+    return csv_source(STATE.leads_csv or ""), len(_active_lead_store())
+
+
+def _ensure_queue_source(source: str, total: int) -> None:
+    """Register the active list with the lead queue; a rewritten list is reconciled, not restarted."""
+    seq = _active_lead_set()
+    if seq is not None:
+        version, leads = seq.version(), seq
+    else:
+        version, leads = csv_version(STATE.leads_csv or ""), _active_lead_store().leads
+    LEAD_QUEUE.ensure_source(source, total, version, lambda: [lead_key(lead) for lead in leads])
+
+
+def _release_queued_leads() -> None:
+    """Hand leads this worker claimed ahead (and any pre-staged call) back to the queue."""
+    global _CLAIMED_SOURCE
+    _discard_staged_call("lead list changed")
+    with _queue_lock:
+        if _CLAIMED_SOURCE is not None and _CLAIMED:
+            LEAD_QUEUE.release(WORKER_ID, _CLAIMED_SOURCE, list(_CLAIMED))
+        _CLAIMED.clear()
+        _CLAIMED_SOURCE = None
+
+
+def _next_queued_lead(after: int) -> Optional[int]:
+    """Next lead for auto-next: from this worker's claimed batch, else a fresh batch after ``after``.
+
+    Suppressed leads are skipped: do-not-call ones for good, recently dialled ones until their window ends.
+    """
+    global _CLAIMED_SOURCE
+    source, total = _active_queue_source()
+    if source != _CLAIMED_SOURCE:
+        _release_queued_leads()
+    with _queue_lock:
+        while True:
+            if not _CLAIMED:
+                _ensure_queue_source(source, total)
+                _CLAIMED.extend(LEAD_QUEUE.claim(source, WORKER_ID, LEAD_QUEUE_BATCH, LEAD_LEASE_TTL, after=after))
+                _CLAIMED_SOURCE = source
+            if not _CLAIMED:
+                return None
+            nxt = next((i for i in _CLAIMED if i > after), _CLAIMED[0])
+            _CLAIMED.remove(nxt)
+            reason = _suppression_reason(nxt)
+            if reason is None:
+                return nxt
+            _set_aside_suppressed(source, nxt, reason)
+            logger.info("Skipping lead %s of %s: %s", nxt, source, reason)
+            after = nxt
+
+
+def _suppression_reason(lead_index_1based: int) -> Optional[str]:
+    """Why a lead must not be dialled now ("dnc" or "recent"), or None."""
+    if not SUPPRESSION_ENABLED:
+        return None
+    lead = get_lead_by_index_1based(lead_index_1based)
+    return SUPPRESSION.check(lead.get("phone")) if lead else None
+
+
+def _set_aside_suppressed(source: str, lead_index_1based: int, reason: str) -> None:
+    """Hand back a claimed lead that may not be dialled: do-not-call is final, a recent dial only defers it."""
+    if reason != RECENT:
+        LEAD_QUEUE.finish(source, lead_index_1based, WORKER_ID, "suppressed")
+        return
+    lead = get_lead_by_index_1based(lead_index_1based)
+    until = SUPPRESSION.recent_until(lead.get("phone") if lead else None)
+    LEAD_QUEUE.defer(source, lead_index_1based, WORKER_ID, until or time.time() + SUPPRESSION.recent.window)
+
+
+def _admission_reason(active: int, launching: bool = True) -> Optional[str]:
+    """Why the host cannot take another call ("cpu", "memory" or "concurrency"), or None."""
+    if not ADMISSION_ENABLED:
+        return None
+    ADMISSION.set_call_cost(describe_totals(STATE.call_usage_totals))
+    return ADMISSION.admit(active, launching)
+
+
+def _live_calls() -> int:
+    """Calls running on this host: the console call and the browser room agents."""
+    return (1 if CURRENT_PROC is not None or _LAUNCHING else 0) + ROOM_POOL.busy()
+
+
+def _campaign_spec(campaign_key: Optional[str]) -> Optional[tuple[str, str, str]]:
+    """(prompt module, agent attr, session attr) for a built-in or dynamic campaign key."""
+    if not campaign_key:
+        return None
+    cmap = dict(CAMPAIGNS)
+    try:
+        cmap.update(_list_dynamic_campaigns())
+    except Exception:
+        pass
+    if campaign_key not in cmap:
+        return None
+    mod, agent_attr, session_attr = cmap[campaign_key]
+    return _normalize_prompt_module(mod), agent_attr, session_attr
+
 
+def _campaign_env(spec: tuple[str, str, str]) -> Dict[str, str]:
+    return {"CAMPAIGN_PROMPT_MODULE": spec[0], "CAMPAIGN_AGENT_NAME": spec[1], "CAMPAIGN_SESSION_NAME": spec[2]}
 
-def spawn_call(lead_index_1based: int, campaign_key: Optional[str]) -> None:
+
+def _call_creationflags() -> int:
+    if sys.platform == "win32":
+        # Create new process group to allow signal/termination management
+        return getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+    return 0
+
+
+def spawn_call(lead_index_1based: int, campaign_key: Optional[str], staged: Optional[StagedCall] = None) -> bool:
+    """Start a console call for a lead. Returns False if another call is running or the lead is taken.
+
+    With ``staged`` (a parked process already prepared for this lead) the call is started by
+    releasing it instead of launching a new process. Blocking (process launch or LiveKit API
+    calls in worker mode): request handlers run it in the threadpool.
+    """
     env = os.environ.copy()
     env["RUN_SINGLE_CALL"] = "1"
-    env["LEAD_INDEX"] = str(lead_index_1based)
+    # Point the child at the file holding this lead (a lead set spans several CSVs)
+    try:
+        csv_path, file_index_1based = _resolve_dial_target(lead_index_1based)
+        source, total = _active_queue_source()
+    except IndexError:
+        return False
+    env["LEADS_CSV_PATH"] = str(csv_path)
+    env["LEAD_INDEX"] = str(file_index_1based)
 
     # Apply campaign env if provided
-    def _all_campaigns_map() -> Dict[str, tuple[str, str, str]]:
-        m = dict(CAMPAIGNS)
-        try:
-            m.update(_list_dynamic_campaigns())
-        except Exception:
-            pass
-        return m
-
-    cmap = _all_campaigns_map()
-    if campaign_key and campaign_key in cmap:
-        mod, agent_attr, session_attr = cmap[campaign_key]
-        env["CAMPAIGN_PROMPT_MODULE"] = _normalize_prompt_module(mod)
-        env["CAMPAIGN_AGENT_NAME"] = agent_attr
-        env["CAMPAIGN_SESSION_NAME"] = session_attr
+    campaign_spec = _campaign_spec(campaign_key)
+    if campaign_spec:
+        env.update(_campaign_env(campaign_spec))
 
     # Ensure child can import our local 'backend' package
     try:
@@ -419,112 +737,643 @@ def spawn_call(lead_index_1based: int, campaign_key: Optional[str]) -> None:
     except Exception:
         pass
 
+    lead = get_lead_by_index_1based(lead_index_1based)
+    phone = lead.get("phone") if lead else None
+    reason = SUPPRESSION.check(phone) if SUPPRESSION_ENABLED and phone else None
+    if reason is not None:
+        _ensure_queue_source(source, total)
+        if LEAD_QUEUE.claim_index(source, lead_index_1based, WORKER_ID, LEAD_LEASE_TTL):
+            _set_aside_suppressed(source, lead_index_1based, reason)
+        logger.info("Not dialling lead %s of %s: %s", lead_index_1based, source, reason)
+        return False
+
+    job_metadata = None
+    if AGENT_DISPATCH_MODE == "worker":
+        # The warm worker gets the lead itself instead of re-reading the CSV; the prospect is dialled into its room
+        dial_to = normalize_number(phone)
+        if dial_to is None:
+            logger.warning("Not dialling lead %s of %s: no valid phone number", lead_index_1based, source)
+            return False
+        dial_to = f"+{dial_to}"
+        job_metadata = build_job_metadata(lead, lead_index_1based, campaign_key, campaign_spec, source)
+
     # Launch console subcommand to get audio I/O and track process
-    global CURRENT_PROC, CURRENT_STATUS, CURRENT_LEAD_INDEX
+    global CURRENT_PROC, _LAUNCHING
     with _proc_lock:
-        # If a process is already running, do not start another
-        if CURRENT_PROC and CURRENT_PROC.poll() is None:
-            return
-        creationflags = 0
-        if sys.platform == "win32":
-            # Create new process group to allow signal/termination management
-            creationflags = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
-        CURRENT_PROC = subprocess.Popen(
-            [sys.executable, str(BASE_DIR / "agent.py"), "console"], env=env, cwd=str(BASE_DIR), creationflags=creationflags
-        )
-        CURRENT_STATUS = "running"
-        CURRENT_LEAD_INDEX = lead_index_1based
+        if CURRENT_PROC is not None and CURRENT_PROC.poll() is not None:
+            _finish_call_locked(CURRENT_PROC)
+        # If a call is already running (here or on another worker), do not start another
+        if CURRENT_PROC is not None or _LAUNCHING or not STATE.backend.acquire_lease(CALL_LEASE, WORKER_ID, LEASE_TTL):
+            return False
+        # Claim the lead in the shared queue so no other dialer calls it concurrently or again
+        _ensure_queue_source(source, total)
+        if not (
+            LEAD_QUEUE.claim_index(source, lead_index_1based, WORKER_ID, LEAD_LEASE_TTL)
+            and LEAD_QUEUE.start(source, lead_index_1based, WORKER_ID, LEAD_LEASE_TTL)
+        ):
+            logger.info("Lead %s of %s is being dialled by another worker", lead_index_1based, source)
+            STATE.backend.release_lease(CALL_LEASE, WORKER_ID)
+            return False
+        # Slot and lead stay reserved while the agent starts without the lock (worker mode makes
+        # three LiveKit round trips); stop requests and other starts are not held up meanwhile
+        _LAUNCHING = True
 
+    try:
+        if job_metadata is not None:
+            proc = dispatch_call(new_room_name(lead_index_1based), job_metadata, dial_to)
+        elif staged is not None:
+            proc = staged.launch()
+        else:
+            proc = subprocess.Popen(
+                [sys.executable, str(BASE_DIR / "agent.py"), "console"],
+                env=env,
+                cwd=str(BASE_DIR),
+                creationflags=_call_creationflags(),
+            )
+    except Exception:
+        with _proc_lock:
+            _LAUNCHING = False
+            LEAD_QUEUE.finish(source, lead_index_1based, WORKER_ID, "pending")
+            STATE.backend.release_lease(CALL_LEASE, WORKER_ID)
+        raise
 
-def spawn_agent_connect_room(room_name: str, campaign_key: Optional[str]) -> None:
-    """Spawn agent to connect to a specific room so the browser can converse with it."""
+    with _proc_lock:
+        _LAUNCHING = False
+        CURRENT_PROC = proc
+        if phone:
+            SUPPRESSION.record_dial(phone)
+        STATE.current_call = {
+            "owner": WORKER_ID,
+            "pid": proc.pid,
+            "room": getattr(proc, "room", None),
+            "lead_index": lead_index_1based,
+            "source": source,
+            "status": "running",
+            "started": time.time(),
+            "campaign": campaign_key,
+            "prestaged": staged is not None,
+            "phone": phone,
+        }
+    Thread(target=_supervise_call, args=(proc,), name="call-supervisor", daemon=True).start()
+    return True
+
+
+# -----------------------------
+# Browser room agents
+# -----------------------------
+
+def _room_agent_env(campaign_key: Optional[str], lead_index_1based: Optional[int]) -> Dict[str, str]:
+    """Per-room agent environment: campaign prompts and the lead to talk to."""
+    env = {"RUN_SINGLE_CALL": "1"}
+    spec = _campaign_spec(campaign_key)
+    if spec:
+        env.update(_campaign_env(spec))
+    if lead_index_1based:
+        try:
+            csv_path, file_index_1based = _resolve_dial_target(lead_index_1based)
+            env["LEADS_CSV_PATH"] = str(csv_path)
+            env["LEAD_INDEX"] = str(file_index_1based)
+        except IndexError:
+            pass
+    return env
+
+
+def _agent_child_env(extra: Dict[str, str]) -> Dict[str, str]:
     env = os.environ.copy()
-    env["RUN_SINGLE_CALL"] = "1"
-    if campaign_key and campaign_key in CAMPAIGNS:
-        mod, agent_attr, session_attr = CAMPAIGNS[campaign_key]
-        env["CAMPAIGN_PROMPT_MODULE"] = _normalize_prompt_module(mod)
-        env["CAMPAIGN_AGENT_NAME"] = agent_attr
-        env["CAMPAIGN_SESSION_NAME"] = session_attr
+    env.update(extra)
     # Ensure child can import our local 'backend' package
+    env["PYTHONPATH"] = f"{BASE_DIR}{os.pathsep}{env.get('PYTHONPATH','')}"
+    return env
+
+
+def _spawn_room_agent(room_name: str, campaign_key: Optional[str], lead_index_1based: Optional[int]):
+    if AGENT_DISPATCH_MODE == "worker":
+        lead = get_lead_by_index_1based(lead_index_1based) if lead_index_1based else None
+        # The browser user is the caller here: no dial-out
+        dispatch_agent(
+            room_name, build_job_metadata(lead, lead_index_1based or 0, campaign_key, _campaign_spec(campaign_key))
+        )
+        return DispatchedCall(room_name)
+    # Use LiveKit CLI subcommand 'connect' with a room name; the Agents CLI will join that room
+    env = _agent_child_env(_room_agent_env(campaign_key, lead_index_1based))
+    return subprocess.Popen(
+        [sys.executable, str(BASE_DIR / "agent.py"), "connect", "--room", room_name], env=env, cwd=str(BASE_DIR)
+    )
+
+
+def _park_room_agent(handoff: Path):
+    """Start an agent that loads everything up front and waits for its room in ``handoff``."""
+    env = _agent_child_env({"RUN_SINGLE_CALL": "1"})
+    return subprocess.Popen([sys.executable, str(BASE_DIR / "agent.py"), "park", str(handoff)], env=env, cwd=str(BASE_DIR))
+
+
+def _room_occupied(room_name: str) -> Optional[bool]:
+    """Whether someone besides the agent is still in a browser room (None when LiveKit cannot tell).
+
+    Drives idle reclamation, so a long browser call keeps its agent without any heartbeat.
+    """
     try:
-        env["PYTHONPATH"] = f"{BASE_DIR}{os.pathsep}{env.get('PYTHONPATH','')}"
+        participants = room_participants(room_name)
+    except DispatchError:
+        return None
+    return any(not is_agent_participant(p) for p in participants or [])
+
+
+# The persistent dispatch worker keeps its own warm processes, so only park agents in process mode
+# ROOM_AGENT_POOL_SIZE is shared by every web worker using the same dial-state backend
+ROOM_POOL = RoomAgentPool(
+    _spawn_room_agent,
+    cap=int(os.getenv("ROOM_AGENT_POOL_SIZE", "4")),
+    idle_timeout=float(os.getenv("ROOM_AGENT_IDLE_TIMEOUT", "300")),
+    warm=int(os.getenv("ROOM_AGENT_WARM", "1")) if AGENT_DISPATCH_MODE != "worker" else 0,
+    park=_park_room_agent,
+    assignment=_room_agent_env,
+    backend=STATE.backend,
+    owner=WORKER_ID,
+    admit=lambda busy: _admission_reason(busy + (1 if CURRENT_PROC is not None or _LAUNCHING else 0)),
+    occupied=_room_occupied,
+)
+
+
+def spawn_agent_connect_room(room_name: str, campaign_key: Optional[str], lead_index_1based: Optional[int] = None) -> str:
+    """Make sure an agent is connected to ``room_name`` so the browser can converse with it.
+
+    Returns how the room was served (existing | warm | spawned); raises PoolFull / RoomBusy.
+    """
+    how, _ = ROOM_POOL.acquire(room_name, campaign_key, lead_index_1based)
+    return how
+
+
+# -----------------------------
+# Pre-staged auto-next call
+# -----------------------------
+
+def _stage_next_call(after: int) -> None:
+    """Claim the lead after ``after`` and park its agent process until the current call ends."""
+    global _STAGED
+    with _stage_lock:
+        if _STAGED is not None:
+            return
+        source, _ = _active_queue_source()
+        campaign = STATE.selected_campaign
+        nxt = _next_queued_lead(after)
+        if nxt is None:
+            return
+        try:
+            csv_path, file_index_1based = _resolve_dial_target(nxt)
+        except IndexError:
+            LEAD_QUEUE.release(WORKER_ID, source, [nxt])
+            return
+        # The parked process resolves this lead and renders its prompts before waiting
+        extra = {"RUN_SINGLE_CALL": "1", "LEADS_CSV_PATH": str(csv_path), "LEAD_INDEX": str(file_index_1based)}
+        spec = _campaign_spec(campaign)
+        if spec:
+            extra.update(_campaign_env(spec))
+        HANDOFF_DIR.mkdir(parents=True, exist_ok=True)
+        handoff = HANDOFF_DIR / f"next-{uuid.uuid4().hex}.json"
+        try:
+            handle = subprocess.Popen(
+                [sys.executable, str(BASE_DIR / "agent.py"), "park", str(handoff)],
+                env=_agent_child_env(extra),
+                cwd=str(BASE_DIR),
+                creationflags=_call_creationflags(),
+            )
+        except Exception:
+            LEAD_QUEUE.release(WORKER_ID, source, [nxt])
+            raise
+        _STAGED = StagedCall(handle, handoff, nxt, source, campaign)
+        STATE.staged_next = {"owner": WORKER_ID, **_STAGED.describe()}
+        logger.info("Pre-staged lead %s of %s for auto-next (pid %s)", nxt, source, handle.pid)
+
+
+def _take_staged_call(campaign: Optional[str], after: int) -> Optional[StagedCall]:
+    """Hand over the pre-staged call if it is still the one auto-next should start after lead ``after``."""
+    global _STAGED
+    with _stage_lock:
+        staged, _STAGED = _STAGED, None
+        if staged is None:
+            return None
+        _clear_shared_staged()
+    if staged.lead_index > after and staged.matches(_active_queue_source()[0], campaign):
+        return staged
+    _drop_staged(staged, "no longer matches the queue")
+    return None
+
+
+def _discard_staged_call(reason: str) -> None:
+    global _STAGED
+    with _stage_lock:
+        staged, _STAGED = _STAGED, None
+        if staged is None:
+            return
+        _clear_shared_staged()
+    _drop_staged(staged, reason)
+
+
+def _withdraw_staged_call(reason: str) -> None:
+    """Discard the pre-staged call wherever it is parked: here now, on another worker at its next check."""
+    _discard_staged_call(reason)
+    staged = STATE.staged_next
+    if staged:
+        STATE.backend.compare_and_set("staged_next", staged, None)
+
+
+def _drop_staged(staged: StagedCall, reason: str) -> None:
+    staged.discard()
+    LEAD_QUEUE.release(WORKER_ID, staged.source, [staged.lead_index])
+    logger.info("Discarded pre-staged call for lead %s: %s", staged.lead_index, reason)
+
+
+def _clear_shared_staged() -> None:
+    staged = STATE.staged_next
+    if staged and staged.get("owner") == WORKER_ID:
+        STATE.backend.compare_and_set("staged_next", staged, None)
+
+
+def _promote_staged_call() -> None:
+    """Start the next call from our pre-staged process as soon as an auto-next is queued.
+
+    Starting queued calls is the watcher's job, so this takes the watcher lease first (the
+    worker that staged the call normally holds it already, see ``_supervise_call``).
+    """
+    if _STAGED is None:
+        return
+    with _stage_lock:
+        withdrawn = _STAGED is not None and (STATE.staged_next or {}).get("owner") != WORKER_ID
+    if withdrawn:
+        _discard_staged_call("withdrawn")
+        return
+    pending = STATE.pending_next
+    if pending and _pending_due(pending) and STATE.backend.lease_holder(CALL_LEASE) is None:
+        if not STATE.backend.acquire_lease(WATCHER_LEASE, WORKER_ID, LEASE_TTL):
+            return
+        if STATE.backend.compare_and_set("pending_next", pending, None):
+            _start_next_queued(int(pending["after"]), pending.get("campaign"))
+
+
+def _current_call() -> Dict[str, Any]:
+    """Shared record of the current (or last) call; ``status`` is idle | running | stopping."""
+    return STATE.current_call or {}
+
+
+def _call_running(call: Dict[str, Any]) -> bool:
+    return call.get("status") in ("running", "stopping") and STATE.backend.lease_holder(CALL_LEASE) is not None
+
+
+def _signal_proc(proc: subprocess.Popen) -> None:
+    try:
+        if sys.platform == "win32":
+            # Best-effort terminate on Windows
+            proc.terminate()
+        else:
+            proc.send_signal(signal.SIGINT)
     except Exception:
-        pass
-    # Use LiveKit CLI subcommand 'connect' with a room name; the Agents CLI will join that room
-    subprocess.Popen([sys.executable, str(BASE_DIR / "agent.py"), "connect", "--room", room_name], env=env, cwd=str(BASE_DIR))
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+def _finish_call_locked(proc: subprocess.Popen) -> None:
+    """Release the call slot after our child exited (caller holds ``_proc_lock``)."""
+    global CURRENT_PROC
+    if CURRENT_PROC is not proc:
+        return
+    CURRENT_PROC = None
+    call = _current_call()
+    lead_idx = call.get("lead_index")
+    STATE.current_call = {"status": "idle", "lead_index": lead_idx, "campaign": call.get("campaign")}
+    if call.get("source") and lead_idx is not None:
+        LEAD_QUEUE.finish(call["source"], lead_idx, WORKER_ID, "done")
+    if call.get("phone"):
+        # The recent-dial window runs from when the call ended
+        SUPPRESSION.record_dial(call["phone"])
+    # Calls ended on request do not roll over; /api/end_call queues the next one itself
+    if STATE.auto_next and not call.get("stop_requested") and lead_idx is not None:
+        STATE.pending_next = {"after": lead_idx, "campaign": STATE.selected_campaign, "queued": time.time()}
+    STATE.backend.release_lease(CALL_LEASE, WORKER_ID)
+
+
+def _publish_call_usage(usage: CallUsage, call: Dict[str, Any], live: bool) -> None:
+    summary = usage.summary()
+    STATE.call_usage = {**summary, "live": live, "lead_index": call.get("lead_index"), "campaign": call.get("campaign")}
+    if live:
+        return
+    for _ in range(5):
+        totals = STATE.call_usage_totals
+        if STATE.backend.compare_and_set("call_usage_totals", totals, add_to_totals(totals, summary)):
+            return
+
+
+def _supervise_call(proc: subprocess.Popen) -> None:
+    """Keep the call lease alive while our child runs and relay stop requests from other workers.
+
+    With auto-next on, also pre-stage the next call while this one is live. Also samples the
+    child's resource usage (worker-mode calls run in the agent worker and have no pid here).
+    """
+    signaled = False
+    renew_at = 0.0
+    stage_at = time.time() + PRESTAGE_DELAY
+    usage = None
+    if CALL_METRICS_ENABLED and proc.pid is not None:
+        usage = CallUsage(proc.pid, exclude_prior=bool(_current_call().get("prestaged")))
+    publish_at = 0.0
+    call: Dict[str, Any] = {}
+    while proc.poll() is None:
+        try:
+            now = time.time()
+            if now >= renew_at:
+                STATE.backend.acquire_lease(CALL_LEASE, WORKER_ID, LEASE_TTL)
+                renew_at = now + LEASE_TTL / 3
+            call = _current_call()
+            if usage is not None:
+                usage.sample(now)
+                if now >= publish_at:
+                    publish_at = now + max(CALL_METRICS_INTERVAL, 5.0)
+                    _publish_call_usage(usage, call, live=True)
+            if not signaled and call.get("stop_requested"):
+                _signal_proc(proc)
+                signaled = True
+            if AUTO_NEXT_PRESTAGE and now >= stage_at and not signaled:
+                stage_at = now + 5
+                if (
+                    _STAGED is None
+                    and STATE.auto_next
+                    and call.get("lead_index") is not None
+                    and not (ADMISSION_ENABLED and ADMISSION.host_reason())
+                    # Only the watcher starts queued calls, so the worker that stages one becomes it
+                    and STATE.backend.acquire_lease(WATCHER_LEASE, WORKER_ID, LEASE_TTL)
+                ):
+                    _stage_next_call(int(call["lead_index"]))
+        except Exception:
+            logger.exception("Call supervisor iteration failed")
+        time.sleep(0.5)
+    if usage is not None:
+        try:
+            _publish_call_usage(usage, call, live=False)
+        except Exception:
+            logger.exception("Failed to record call resource usage")
+    with _proc_lock:
+        _finish_call_locked(proc)
+    try:
+        _promote_staged_call()
+    except Exception:
+        logger.exception("Failed to start the pre-staged call")
 
 
 def _end_current_call() -> bool:
-    """Attempt to gracefully stop the current console call. Returns True if a process was signaled/terminated."""
-    global CURRENT_PROC, CURRENT_STATUS
+    """Attempt to gracefully stop the current console call, whichever worker owns it.
+
+    Returns True if a running call was signaled (directly, or via the shared state for
+    the owning worker to act on).
+    """
     with _proc_lock:
-        proc = CURRENT_PROC
-        if not proc or proc.poll() is not None:
-            CURRENT_PROC = None
-            CURRENT_STATUS = "idle"
+        for _ in range(3):
+            call = _current_call()
+            if not _call_running(call):
+                return False
+            if STATE.backend.compare_and_set(
+                "current_call", call, {**call, "status": "stopping", "stop_requested": True}
+            ):
+                break
+        else:
             return False
-        CURRENT_STATUS = "stopping"
-        try:
-            if sys.platform == "win32":
-                # Best-effort terminate on Windows
-                proc.terminate()
-            else:
-                proc.send_signal(signal.SIGINT)
-        except Exception:
-            try:
-                proc.kill()
-            except Exception:
-                pass
+        proc = CURRENT_PROC
+        if proc is not None and proc.poll() is None and call.get("owner") == WORKER_ID:
+            _signal_proc(proc)
         return True
 
 
 def _cleanup_if_exited() -> None:
-    """Reset globals if the process has exited."""
-    global CURRENT_PROC, CURRENT_STATUS
+    """Release the call slot if this worker's child has exited."""
     with _proc_lock:
-        if CURRENT_PROC and CURRENT_PROC.poll() is not None:
-            CURRENT_PROC = None
-            CURRENT_STATUS = "idle"
+        if CURRENT_PROC is not None and CURRENT_PROC.poll() is not None:
+            _finish_call_locked(CURRENT_PROC)
+
+
+def _agent_pid_alive(pid: int) -> bool:
+    """True while ``pid`` is a live agent process on this host (a reused pid does not count)."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as fh:
+            return b"agent.py" in fh.read()
+    except FileNotFoundError:
+        return False
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        return False  # no signal-0 probe on Windows; the terminate below is best-effort
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _stop_orphan(call: Dict[str, Any]) -> bool:
+    """Stop the agent of a call whose owner died; True once it is known to be gone.
+
+    Worker-mode calls are ended by deleting their room. A console agent can only be
+    signalled from its own host; elsewhere this waits for that host's workers to
+    report it gone (``_stop_local_orphan``).
+    """
+    pid = call.get("pid")
+    if pid is None:
+        if not call.get("room"):
+            return True
+        try:
+            delete_room(call["room"])
+            return True
+        except DispatchError:
+            logger.warning("Could not delete room %s of an interrupted call", call["room"], exc_info=True)
+            return False
+    if str(call.get("owner") or "").split(":", 1)[0] != _HOST:
+        return bool(call.get("orphan_gone"))
+    if not _agent_pid_alive(pid):
+        return True
+    overdue = time.time() - float(call.get("interrupted") or 0) >= CALL_ORPHAN_GRACE
+    try:
+        os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM) if overdue else signal.SIGTERM)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        logger.exception("Could not signal orphaned agent %s", pid)
+    return sys.platform == "win32"
+
+
+def _stop_local_orphan() -> None:
+    """Stop an interrupted call's agent if it runs on this host (the reaping watcher may be elsewhere)."""
+    call = STATE.current_call
+    if not call or call.get("status") != "interrupted" or call.get("orphan_gone") or call.get("pid") is None:
+        return
+    if str(call.get("owner") or "").split(":", 1)[0] == _HOST and _stop_orphan(call):
+        STATE.backend.compare_and_set("current_call", call, {**call, "orphan_gone": True})
+
+
+def _reap_stale_call() -> None:
+    """Recover the call slot when its owner stopped renewing the lease (worker crashed or was killed).
+
+    The owner's agent may still be talking to the prospect, so the call is parked as
+    ``interrupted``, with the call lease held here, until that agent is stopped; only
+    then is the slot marked idle for the next call.
+    """
+    call = STATE.current_call
+    if not call or call.get("status") == "idle":
+        return
+    if call.get("status") == "interrupted":
+        if not STATE.backend.acquire_lease(CALL_LEASE, WORKER_ID, LEASE_TTL):
+            return
+        parked_for = time.time() - float(call.get("interrupted") or 0)
+        gone = _stop_orphan(call)
+        if not gone and parked_for < CALL_ORPHAN_MAX_PARK:
+            return
+        if not gone:
+            logger.warning("Agent of interrupted call on lead %s is unreachable; freeing the slot anyway",
+                           call.get("lead_index"))
+        idle = {"status": "idle", "lead_index": call.get("lead_index"), "campaign": call.get("campaign")}
+        if STATE.backend.compare_and_set("current_call", call, idle):
+            logger.info("Interrupted call on lead %s cleaned up", call.get("lead_index"))
+        STATE.backend.release_lease(CALL_LEASE, WORKER_ID)
+        return
+    if STATE.backend.lease_holder(CALL_LEASE) is not None:
+        return
+    if not STATE.backend.acquire_lease(CALL_LEASE, WORKER_ID, LEASE_TTL):
+        return
+    if not STATE.backend.compare_and_set("current_call", call, {**call, "status": "interrupted", "interrupted": time.time()}):
+        STATE.backend.release_lease(CALL_LEASE, WORKER_ID)
+        return
+    logger.warning(
+        "Call on lead %s (worker %s) lost its lease; stopping its agent before the slot is reused",
+        call.get("lead_index"), call.get("owner"),
+    )
+    _reap_stale_call()
+
+
+def _start_next_queued(after: int, campaign: Optional[str]) -> None:
+    staged = _take_staged_call(campaign, after)
+    reason = _suppression_reason(staged.lead_index) if staged is not None else None
+    if reason is not None:
+        # Dialled from another list (or opted out) since it was staged
+        staged.discard()
+        _set_aside_suppressed(staged.source, staged.lead_index, reason)
+        logger.info("Discarded pre-staged call for lead %s: %s", staged.lead_index, reason)
+        staged = None
+    taken: List[Any] = []
+    if staged is not None:
+        if _dial_throttled(after, campaign, staged.lead_index, staged=staged, taken=taken):
+            return
+        started = False
+        try:
+            started = spawn_call(staged.lead_index, campaign, staged=staged)
+        finally:
+            if not started:
+                DIAL_LIMITER.cancel(taken)
+                _drop_staged(staged, "call slot was taken")
+        return
+    nxt = _next_queued_lead(after)
+    if nxt is None:
+        logger.info("Lead queue is drained; auto-next has nothing left to dial")
+        return
+    if _dial_throttled(after, campaign, nxt, taken=taken):
+        return
+    if not spawn_call(nxt, campaign):
+        DIAL_LIMITER.cancel(taken)
+        LEAD_QUEUE.release(WORKER_ID, _CLAIMED_SOURCE, [nxt])
+
+
+def _dial_throttled(after: int, campaign: Optional[str], lead_index: int, staged: Optional[StagedCall] = None,
+                    taken: Optional[List[Any]] = None) -> bool:
+    """Admit an auto-next lead and take its dial token; when the host is saturated or the
+    dial rate is exceeded, put the lead back and re-queue.
+
+    The re-queued ``pending_next`` carries ``not_before`` so the watcher retries it then,
+    without any thread waiting in between. The buckets a token was taken from are added to
+    ``taken``, for the caller to give back if the call does not start.
+    """
+    global _STAGED
+    held = _admission_reason(_live_calls(), launching=staged is None)
+    if held is not None:
+        wait, why = ADMISSION_RETRY_AFTER, f"Admission control ({held})"
+    else:
+        if not DIAL_LIMITER.enabled:
+            return False
+        lead = get_lead_by_index_1based(lead_index)
+        (wait, buckets), why = DIAL_LIMITER.try_acquire(lead.get("phone") if lead else None, campaign), "Dial rate limit"
+        if wait <= 0:
+            if taken is not None:
+                taken.extend(buckets)
+            return False
+    if staged is not None:
+        with _stage_lock:
+            if _STAGED is None:
+                _STAGED = staged
+                STATE.staged_next = {"owner": WORKER_ID, **staged.describe()}
+                staged = None
+        if staged is not None:
+            _drop_staged(staged, "another call was staged meanwhile")
+    else:
+        with _queue_lock:
+            _CLAIMED.insert(0, lead_index)
+    STATE.pending_next = {"after": after, "campaign": campaign, "queued": time.time(), "not_before": time.time() + wait}
+    logger.info("%s: lead %s waits %.1fs", why, lead_index, wait)
+    return True
+
+
+def _pending_due(pending: Dict[str, Any]) -> bool:
+    return float(pending.get("not_before") or 0) <= time.time()
+
+
+def _staged_elsewhere(pending: Dict[str, Any]) -> bool:
+    """True while another worker holds a pre-staged call and should get to start it itself."""
+    staged = STATE.staged_next
+    if not staged or staged.get("owner") == WORKER_ID:
+        return False
+    return time.time() - float(pending.get("queued") or 0) < LEASE_TTL
 
 
 def _watcher_loop():
-    """Background loop to auto-start next call when a call ends and AUTO_NEXT is enabled."""
-    last_running = False
+    """Background loop to auto-start the next call; only the worker holding the watcher lease acts."""
     while True:
         try:
-            with _proc_lock:
-                running = CURRENT_PROC is not None and CURRENT_PROC.poll() is None
-                lead_idx = CURRENT_LEAD_INDEX
-                campaign = SELECTED_CAMPAIGN
-            # Transition: running -> not running
-            if last_running and not running:
-                # Ensure cleanup
-                _cleanup_if_exited()
-                if AUTO_NEXT and lead_idx is not None:
-                    # Start next automatically
-                    try:
-                        spawn_call(lead_idx + 1, campaign)
-                    except Exception:
-                        pass
-            last_running = running
+            _cleanup_if_exited()
+            _stop_local_orphan()
+            _promote_staged_call()
+            if STATE.backend.acquire_lease(WATCHER_LEASE, WORKER_ID, LEASE_TTL):
+                _reap_stale_call()
+                pending = STATE.pending_next
+                if (
+                    pending
+                    and _pending_due(pending)
+                    and STATE.backend.lease_holder(CALL_LEASE) is None
+                    and not _staged_elsewhere(pending)
+                ):
+                    # Consume the request exactly once, even if leadership just changed hands
+                    if STATE.backend.compare_and_set("pending_next", pending, None):
+                        _start_next_queued(int(pending["after"]), pending.get("campaign"))
         except Exception:
-            pass
+            logger.exception("Dial watcher iteration failed")
         time.sleep(1)
 
 
-@app.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request, page: int = 1, campaign: Optional[str] = None):
-    leads = read_leads(LEADS_CSV)
+def _dashboard_page(page: int) -> tuple[Sequence[Dict[str, str]], int, int, int]:
+    """(rows, page, total_pages, start) for the dashboard; loads or reads the list, so run in the threadpool."""
+    leads = _active_leads()
     total = len(leads)
     total_pages = max(1, math.ceil(total / PAGE_SIZE))
     page = max(1, min(page, total_pages))
     start = (page - 1) * PAGE_SIZE
-    end = min(start + PAGE_SIZE, total)
+    return leads[start:min(start + PAGE_SIZE, total)], page, total_pages, start
+
+
+@app.get("/", response_class=HTMLResponse)
+async def dashboard(request: Request, page: int = 1, campaign: Optional[str] = None):
+    rows, page, total_pages, start = await run_in_threadpool(_dashboard_page, page)
 
     # Merge built-in and dynamic campaigns for dropdown
     all_campaigns = dict(CAMPAIGNS)
     try:
-        all_campaigns.update(_list_dynamic_campaigns())
+        all_campaigns.update(await run_in_threadpool(_list_dynamic_campaigns))
     except Exception:
         pass
     campaign_options = []
@@ -540,15 +1389,44 @@ async def dashboard(request: Request, page: int = 1, campaign: Optional[str] = N
             "request": request,
             "campaign": campaign,
             "campaign_options": campaign_options,
-            "leads": leads[start:end],
+            "leads": rows,
             "page": page,
             "total_pages": total_pages,
             "start_index": start,  # zero-based for row numbering
-            "active_csv": os.path.basename(LEADS_CSV) if LEADS_CSV else "",
+            "active_csv": STATE.active_lead_set or (os.path.basename(STATE.leads_csv) if STATE.leads_csv else ""),
         },
     )
 
 
+async def _start_from_form(lead_index_1based: int, campaign: Optional[str]) -> bool:
+    """Background start for the form routes: admission and dial rate as in /api/start_call."""
+    held = _admission_reason(ROOM_POOL.busy())
+    if held is not None:
+        logger.warning("Admission held lead %s: %s", lead_index_1based, held)
+        return False
+    lead = get_lead_by_index_1based(lead_index_1based)
+    try:
+        _, taken = await DIAL_LIMITER.acquire(lead.get("phone") if lead else None, campaign, DIAL_RATE_MAX_WAIT)
+    except TimeoutError:
+        logger.warning("Dial rate limit: lead %s was not started", lead_index_1based)
+        return False
+    return await run_in_threadpool(_start_manual_call, lead_index_1based, campaign, taken)
+
+
+def _start_manual_call(lead_index_1based: int, campaign: Optional[str], taken: List[Any]) -> bool:
+    """Start a lead picked by the user. Blocking; shared by /call, /next and /api/start_call.
+
+    Only a call that actually started replaces what auto-next had parked for the old
+    sequence; if none started the dial token ``taken`` is refunded.
+    """
+    if not spawn_call(lead_index_1based, campaign):
+        # No call went out (slot busy, lead suppressed, no number): the dial slot is not used
+        DIAL_LIMITER.cancel(taken)
+        return False
+    _withdraw_staged_call("manual start")
+    return True
+
+
 @app.post("/call")
 async def call_lead(
     background_tasks: BackgroundTasks,
@@ -558,7 +1436,7 @@ async def call_lead(
 ):
     # Convert zero-based to one-based for backend
     lead_index_1based = lead_global_index + 1
-    background_tasks.add_task(spawn_call, lead_index_1based, campaign)
+    background_tasks.add_task(_start_from_form, lead_index_1based, campaign)
 
     # Redirect back to the current page
     url = f"/?page={page}"
@@ -573,9 +1451,11 @@ async def call_lead(
 
 @app.get("/api/csv/list")
 async def api_csv_list():
-    supabase_items = _supabase_csv_list()
+    supabase_items = await run_in_threadpool(_supabase_csv_list)
     files: List[Dict[str, Any]] = []
-    active_remote = _safe_csv_name(SELECTED_CSV_REMOTE_KEY or "") if SELECTED_CSV_REMOTE_KEY else None
+    remote_key = STATE.selected_csv_remote_key
+    leads_csv = STATE.leads_csv
+    active_remote = _safe_csv_name(remote_key or "") if remote_key else None
 
     if supabase_items is not None:
         for item in supabase_items:
@@ -597,9 +1477,9 @@ async def api_csv_list():
             active = False
             if active_remote:
                 active = active_remote == name
-            elif LEADS_CSV:
+            elif leads_csv:
                 try:
-                    active = local_path.exists() and str(local_path) == str(Path(LEADS_CSV).resolve())
+                    active = local_path.exists() and str(local_path) == str(Path(leads_csv).resolve())
                 except Exception:
                     active = False
             files.append({
@@ -608,7 +1488,7 @@ async def api_csv_list():
                 "mtime": mtime,
                 "active": active,
             })
-        return JSONResponse({"ok": True, "files": files})
+        return FastJSONResponse({"ok": True, "files": files})
 
     # Fallback to local filesystem listing if Supabase unavailable
     try:
@@ -619,13 +1499,13 @@ async def api_csv_list():
                     "name": p.name,
                     "size": stat.st_size,
                     "mtime": int(stat.st_mtime),
-                    "active": str(p.resolve()) == str(Path(LEADS_CSV).resolve()) if LEADS_CSV else False,
+                    "active": str(p.resolve()) == str(Path(leads_csv).resolve()) if leads_csv else False,
                 })
             except FileNotFoundError:
                 pass
     except Exception:
         pass
-    return JSONResponse({"ok": True, "files": files})
+    return FastJSONResponse({"ok": True, "files": files})
 
 
 @app.post("/api/csv/upload")
@@ -641,8 +1521,15 @@ async def api_csv_upload(file: UploadFile = File(...)):
             raise HTTPException(status_code=413, detail="File too large (max 10MB)")
         # Upload to Supabase storage first (best effort)
         remote_name = _upload_csv_to_supabase(name, content)
-        dest.write_bytes(content)
-        return JSONResponse({"ok": True, "name": name, "remote": remote_name or ""})
+        write_csv_atomic(dest, content)
+        leads_csv = STATE.leads_csv
+        if leads_csv and Path(leads_csv).resolve() == dest.resolve():
+            # Re-uploaded the active list: rebuild its store and search index now
+            _warm_active_indexes()
+            _discard_staged_call("active CSV replaced")
+        else:
+            _build_lead_columns(dest)
+        return FastJSONResponse({"ok": True, "name": name, "remote": remote_name or ""})
     except HTTPException:
         raise
     except Exception:
@@ -651,34 +1538,42 @@ async def api_csv_upload(file: UploadFile = File(...)):
 
 @app.post("/api/csv/select")
 async def api_csv_select(name: str = Form(...)):
-    global LEADS_CSV, SELECTED_CSV_REMOTE_KEY
     name = _safe_csv_name(name)
-    local = _download_csv_from_supabase(name, force=True)
+    STATE.active_lead_set = None
+    _release_queued_leads()
+    local = await _download_csv_from_supabase_async(name, force=True)
     if local and local.exists():
-        LEADS_CSV = str(local)
-        SELECTED_CSV_REMOTE_KEY = name
-        _persist_selected_csv(local, SELECTED_CSV_REMOTE_KEY)
-        return JSONResponse({"ok": True, "active": name})
+        STATE.leads_csv = str(local)
+        STATE.selected_csv_remote_key = name
+        _persist_selected_csv(local, name)
+        _warm_active_indexes()
+        return FastJSONResponse({"ok": True, "active": name})
 
     target = _csv_local_path(name)
     if not target.exists() or target.suffix.lower() != ".csv":
         raise HTTPException(status_code=404, detail="CSV not found")
-    LEADS_CSV = str(target)
-    SELECTED_CSV_REMOTE_KEY = None
+    STATE.leads_csv = str(target)
+    STATE.selected_csv_remote_key = None
     _persist_selected_csv(target, None)
-    return JSONResponse({"ok": True, "active": name})
+    _warm_active_indexes()
+    return FastJSONResponse({"ok": True, "active": name})
 
 
 @app.delete("/api/csv/{name}")
 async def api_csv_delete(name: str):
-    global SELECTED_CSV_REMOTE_KEY, LEADS_CSV
     name = _safe_csv_name(name)
+    remote_key = STATE.selected_csv_remote_key
+    leads_csv = STATE.leads_csv
+    active_set_name = STATE.active_lead_set
     # Prevent deleting active CSV in-use
-    if SELECTED_CSV_REMOTE_KEY and SELECTED_CSV_REMOTE_KEY == name:
+    active_set = find_lead_set(active_set_name) if active_set_name else None
+    if active_set and any(_safe_csv_name(str(m.get("file") or "")) == name for m in active_set.get("members") or []):
+        raise HTTPException(status_code=400, detail="Cannot delete a CSV used by the active lead set.")
+    if remote_key and remote_key == name:
         raise HTTPException(status_code=400, detail="Cannot delete the active CSV. Select another file first.")
-    if LEADS_CSV:
+    if leads_csv:
         try:
-            if Path(LEADS_CSV).resolve() == _csv_local_path(name):
+            if Path(leads_csv).resolve() == _csv_local_path(name):
                 raise HTTPException(status_code=400, detail="Cannot delete the active CSV. Select another file first.")
         except HTTPException:
             raise
@@ -688,21 +1583,22 @@ async def api_csv_delete(name: str):
     supabase_error = _delete_supabase_csv(name)
     if supabase_error is None:
         local = _csv_local_path(name)
+        remove_columns(local)
         if local.exists():
             try:
                 local.unlink()
             except Exception:
                 pass
-        if SELECTED_CSV_REMOTE_KEY == name:
-            SELECTED_CSV_REMOTE_KEY = None
-        return JSONResponse({"ok": True, "supabase_error": None})
+        STATE.backend.compare_and_set("selected_csv_remote_key", name, None)
+        return FastJSONResponse({"ok": True, "supabase_error": None})
 
     target = _csv_local_path(name)
     if not target.exists() or target.suffix.lower() != ".csv":
         raise HTTPException(status_code=404, detail="CSV not found")
     try:
+        remove_columns(target)
         target.unlink()
-        return JSONResponse({"ok": True, "supabase_error": supabase_error})
+        return FastJSONResponse({"ok": True, "supabase_error": supabase_error})
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to delete file")
 
@@ -710,7 +1606,7 @@ async def api_csv_delete(name: str):
 @app.get("/api/csv/preview")
 async def api_csv_preview(name: str, limit: int = 10):
     name = _safe_csv_name(name)
-    target = _download_csv_from_supabase(name, force=False)
+    target = await _download_csv_from_supabase_async(name, force=False)
     if not target or not target.exists():
         target = _csv_local_path(name)
         if not target.exists():
@@ -725,7 +1621,7 @@ async def api_csv_preview(name: str, limit: int = 10):
                 if i >= max(1, limit):
                     break
                 rows.append({k: (row.get(k) or "") for k in headers})
-        return JSONResponse({"ok": True, "headers": headers, "rows": rows})
+        return FastJSONResponse({"ok": True, "headers": headers, "rows": rows})
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to read CSV")
 
@@ -733,7 +1629,7 @@ async def api_csv_preview(name: str, limit: int = 10):
 @app.get("/api/csv/download/{name}")
 async def api_csv_download(name: str):
     name = _safe_csv_name(name)
-    target = _download_csv_from_supabase(name, force=False)
+    target = await _download_csv_from_supabase_async(name, force=False)
     if not target or not target.exists():
         target = _csv_local_path(name)
         if not target.exists():
@@ -741,6 +1637,80 @@ async def api_csv_download(name: str):
     return FileResponse(str(target), media_type="text/csv", filename=name)
 
 
+# -----------------------------
+# Lead Sets (multi-CSV) API
+# -----------------------------
+
+@app.get("/api/leadsets")
+async def api_leadsets_list():
+    active = STATE.active_lead_set
+    items = []
+    for it in load_lead_sets():
+        items.append({**it, "active": it.get("name") == active})
+    return FastJSONResponse({"ok": True, "lead_sets": items})
+
+
+@app.post("/api/leadsets")
+async def api_leadsets_save(name: str = Form(...), members: str = Form(...), mode: str = Form("ordered")):
+    """Create or replace a lead set. ``members``: 'a.csv:3,b.csv:1' or JSON [{"file","weight"}]."""
+    name = (name or "").strip()
+    mode = (mode or "ordered").strip().lower()
+    if not name:
+        raise HTTPException(status_code=400, detail="Name required")
+    if mode not in LEAD_SET_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(LEAD_SET_MODES)}")
+    try:
+        parsed = parse_members(members)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid members")
+    parsed = [{"file": _safe_csv_name(m["file"]), "weight": max(1, int(m["weight"]))} for m in parsed if m.get("file")]
+    if not parsed:
+        raise HTTPException(status_code=400, detail="At least one member CSV required")
+    missing = [m["file"] for m in parsed if not _lead_set_member_path(m["file"]).exists()]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"CSV not found: {', '.join(missing)}")
+    items = [it for it in load_lead_sets() if it.get("name") != name]
+    items.append({"name": name, "mode": mode, "members": parsed})
+    save_lead_sets(items)
+    if STATE.active_lead_set == name:
+        _discard_staged_call("active lead set changed")
+    return FastJSONResponse({"ok": True, "name": name, "mode": mode, "members": parsed})
+
+
+@app.post("/api/leadsets/select")
+async def api_leadsets_select(name: str = Form(...)):
+    definition = find_lead_set((name or "").strip())
+    if not definition:
+        raise HTTPException(status_code=404, detail="Lead set not found")
+    seq = open_lead_set(definition, _lead_set_member_path)
+    try:
+        # Scans member files for record offsets (no rows are kept in memory)
+        members = seq.member_counts()
+    except OSError:
+        raise HTTPException(status_code=404, detail="A member CSV is missing")
+    STATE.active_lead_set = seq.name
+    _release_queued_leads()
+    _persist_selected_csv(Path(STATE.leads_csv), STATE.selected_csv_remote_key, seq.name)
+    return FastJSONResponse({
+        "ok": True,
+        "active": seq.name,
+        "total_leads": len(seq),
+        "members": [{"file": f, "rows": n} for f, n in members],
+    })
+
+
+@app.delete("/api/leadsets/{name}")
+async def api_leadsets_delete(name: str):
+    if name == STATE.active_lead_set:
+        raise HTTPException(status_code=400, detail="Cannot delete the active lead set. Select another source first.")
+    items = load_lead_sets()
+    remaining = [it for it in items if it.get("name") != name]
+    if len(remaining) == len(items):
+        raise HTTPException(status_code=404, detail="Lead set not found")
+    save_lead_sets(remaining)
+    return FastJSONResponse({"ok": True})
+
+
 # -----------------------------
 # Campaigns Management API
 # -----------------------------
@@ -748,7 +1718,7 @@ async def api_csv_download(name: str):
 @app.get("/api/campaigns/legacy/list")
 async def api_campaigns_list():
     # If Supabase configured, sync down first
-    items = _sync_from_supabase_if_available()
+    items = await run_in_threadpool(_sync_from_supabase_if_available)
     # add built-ins (read-only)
     builtin = []
     for k in CAMPAIGNS.keys():
@@ -758,7 +1728,7 @@ async def api_campaigns_list():
             "builtin": True,
             "key": k,
         })
-    return JSONResponse({"ok": True, "builtin": builtin, "custom": items})
+    return FastJSONResponse({"ok": True, "builtin": builtin, "custom": items})
 
 
 @app.post("/api/campaigns/legacy/create")
@@ -766,7 +1736,7 @@ async def api_campaigns_create(name: str = Form(...), agent_text: str = Form("")
     name = (name or "").strip()
     if not name:
         raise HTTPException(status_code=400, detail="Name required")
-    items = _load_campaigns_store()
+    items = await run_in_threadpool(_load_campaigns_store)
     # If a module was provided, prefer it; else derive from name
     provided = (module or "").strip()
     slug = _slugify(provided if provided else name)
@@ -796,13 +1766,13 @@ async def api_campaigns_create(name: str = Form(...), agent_text: str = Form("")
     # always update local store as mirror
     items.append({"name": name, "module": slug})
     _save_campaigns_store(items)
-    return JSONResponse({"ok": True, "name": name, "module": slug, "supabase_error": supabase_error})
+    return FastJSONResponse({"ok": True, "name": name, "module": slug, "supabase_error": supabase_error})
 
 
 @app.delete("/api/campaigns/legacy/{module}")
 async def api_campaigns_delete(module: str):
     module = (module or "").strip()
-    items = _load_campaigns_store()
+    items = await run_in_threadpool(_load_campaigns_store)
     found = None
     for it in items:
         if it.get("module") == module:
@@ -827,7 +1797,7 @@ async def api_campaigns_delete(module: str):
     # save store
     items = [it for it in items if it.get("module") != module]
     _save_campaigns_store(items)
-    return JSONResponse({"ok": True, "supabase_error": supabase_error})
+    return FastJSONResponse({"ok": True, "supabase_error": supabase_error})
 
 
 # Additional Campaigns endpoints: get, update, upload prompts, seed supabase
@@ -864,13 +1834,13 @@ def _read_prompts_for_module(module: str) -> tuple[str, str]:
 @app.get("/api/campaigns/get")
 async def api_campaigns_get(module: str):
     module = (module or "").strip()
-    items = _load_campaigns_store()
+    items = await run_in_threadpool(_load_campaigns_store)
     name = next((it.get("name") for it in items if it.get("module") == module), "")
     atext, stext = _read_prompts_for_module(module)
     if not name:
         # If not found locally but module file exists, use module as name
         name = module
-    return JSONResponse({"ok": True, "name": name, "module": module, "agent_text": atext, "session_text": stext})
+    return FastJSONResponse({"ok": True, "name": name, "module": module, "agent_text": atext, "session_text": stext})
 
 
 @app.post("/api/campaigns/update")
@@ -880,7 +1850,7 @@ async def api_campaigns_update(module: str = Form(...), name: str = Form(""), ag
     # Update local prompt file
     _generate_prompt_module(module, agent_text or "", session_text or "")
     # Update local store name
-    items = _load_campaigns_store()
+    items = await run_in_threadpool(_load_campaigns_store)
     found = False
     for it in items:
         if it.get("module") == module:
@@ -904,7 +1874,7 @@ async def api_campaigns_update(module: str = Form(...), name: str = Form(""), ag
         except Exception as e:
             supabase_error = str(e)
             logger.exception("Failed to upsert campaign '%s' in Supabase", module)
-    return JSONResponse({"ok": True, "supabase_error": supabase_error})
+    return FastJSONResponse({"ok": True, "supabase_error": supabase_error})
 
 
 @app.post("/api/campaigns/upload_prompts")
@@ -916,7 +1886,7 @@ async def api_campaigns_upload_prompts(which: str = Form(...), file: UploadFile
         content = (await file.read()).decode("utf-8", errors="ignore")
     except Exception:
         raise HTTPException(status_code=400, detail="Failed to read file")
-    return JSONResponse({"ok": True, "which": which, "text": content})
+    return FastJSONResponse({"ok": True, "which": which, "text": content})
 
 
 @app.post("/api/campaigns/seed_supabase")
@@ -924,7 +1894,7 @@ async def api_campaigns_seed_supabase():
     client = _supabase_client()
     if not client:
         raise HTTPException(status_code=400, detail="Supabase not configured")
-    items = _load_campaigns_store()
+    items = await run_in_threadpool(_load_campaigns_store)
     upserted = 0
     errors: List[str] = []
     for it in items:
@@ -943,7 +1913,50 @@ async def api_campaigns_seed_supabase():
             errors.append(f"{module}: {e}")
             logger.exception("Failed to upsert campaign '%s' during Supabase seeding", module)
             continue
-    return JSONResponse({"ok": True, "count": upserted, "errors": errors})
+    return FastJSONResponse({"ok": True, "count": upserted, "errors": errors})
+
+
+def _prompt_budget_inputs() -> tuple[Dict[str, Any], Any]:
+    """Prompt texts of every campaign plus a sample lead (fetches campaigns; run off the event loop)."""
+    campaigns = {}
+    for key in list(CAMPAIGNS) + list(_list_dynamic_campaigns()):
+        spec = _campaign_spec(key)
+        if spec:
+            campaigns[key] = spec
+    return load_campaign_texts(campaigns), get_lead_by_index_1based(1)
+
+
+@app.get("/api/prompts/budget")
+async def api_prompts_budget(include_text: bool = False):
+    """Token count per campaign prompt and sections duplicated across campaigns."""
+    texts, lead = await run_in_threadpool(_prompt_budget_inputs)
+    report = await run_in_threadpool(analyse_prompts, texts, lead)
+    if not include_text:
+        for section in report["shared_sections"]:
+            section.pop("text", None)
+    return FastJSONResponse({"ok": True, **report})
+
+
+@app.get("/api/prompts/blocks")
+async def api_prompt_blocks():
+    """Shared prompt blocks, referenced from campaign texts as {{block:name}}."""
+    return FastJSONResponse({"ok": True, "blocks": [{"name": k, "text": v} for k, v in list_blocks().items()]})
+
+
+@app.post("/api/prompts/blocks")
+async def api_prompt_block_save(name: str = Form(...), text: str = Form(...)):
+    try:
+        save_block(name.strip(), text)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse({"ok": True, "name": name.strip()})
+
+
+@app.delete("/api/prompts/blocks/{name}")
+async def api_prompt_block_delete(name: str):
+    if not delete_block(name):
+        raise HTTPException(status_code=404, detail="Block not found")
+    return FastJSONResponse({"ok": True})
 
 
 @app.get("/api/campaigns/module_file")
@@ -956,7 +1969,7 @@ async def api_campaigns_module_file(module: str):
         text = p.read_text(encoding="utf-8")
     except Exception:
         raise HTTPException(status_code=500, detail="Failed to read module file")
-    return JSONResponse({"ok": True, "module": module, "path": str(p), "content": text})
+    return FastJSONResponse({"ok": True, "module": module, "path": str(p), "content": text})
 
 @app.get("/sip/call", response_class=HTMLResponse)
 async def sip_call(request: Request, number: Optional[str] = None):
@@ -988,30 +2001,55 @@ async def sip_call(request: Request, number: Optional[str] = None):
 
 @app.post("/api/select_campaign")
 async def api_select_campaign(campaign: Optional[str] = Form(None)):
-    global SELECTED_CAMPAIGN
     # validate against built-in + dynamic
     valid = set(CAMPAIGNS.keys())
     try:
-        valid.update(_list_dynamic_campaigns().keys())
+        valid.update((await run_in_threadpool(_list_dynamic_campaigns)).keys())
     except Exception:
         pass
     if campaign and campaign not in valid:
         raise HTTPException(status_code=400, detail="Unknown campaign")
-    SELECTED_CAMPAIGN = campaign
+    STATE.selected_campaign = campaign
+    if _STAGED is not None and (_STAGED.campaign or None) != (campaign or None):
+        _discard_staged_call("campaign changed")
     label = _campaign_display_name(campaign) if campaign else None
-    return JSONResponse({"ok": True, "campaign": campaign, "campaign_label": label})
+    return FastJSONResponse({"ok": True, "campaign": campaign, "campaign_label": label})
 
 
 @app.post("/api/start_call")
 async def api_start_call(lead_global_index: int = Form(...), campaign: Optional[str] = Form(None)):
     # Prefer explicit campaign from form; otherwise use last selected
-    effective_campaign = campaign if campaign is not None else SELECTED_CAMPAIGN
+    effective_campaign = campaign if campaign is not None else STATE.selected_campaign
     idx1 = lead_global_index + 1
-    spawn_call(idx1, effective_campaign)
-    return JSONResponse({
-        "ok": True,
-        "status": CURRENT_STATUS,
-        "lead_index": CURRENT_LEAD_INDEX,
+    reason = _suppression_reason(idx1)
+    if reason is not None:
+        return FastJSONResponse({"ok": False, "suppressed": reason, "lead_index": idx1}, status_code=409)
+    # A running console call makes spawn_call decline anyway; only room agents compete here
+    held = _admission_reason(ROOM_POOL.busy())
+    if held is not None:
+        retry = max(1, int(ADMISSION_RETRY_AFTER))
+        return FastJSONResponse(
+            {"ok": False, "held": held, "retry_after": retry, "lead_index": idx1},
+            status_code=503,
+            headers={"Retry-After": str(retry)},
+        )
+    lead = get_lead_by_index_1based(idx1)
+    try:
+        # Queues on the event loop (no thread held) until the dial rate allows it
+        _, taken = await DIAL_LIMITER.acquire(lead.get("phone") if lead else None, effective_campaign, DIAL_RATE_MAX_WAIT)
+    except TimeoutError as exc:
+        retry = max(1, int(exc.args[0] + 0.999)) if exc.args else 1
+        return FastJSONResponse(
+            {"ok": False, "throttled": True, "retry_after": retry, "lead_index": idx1},
+            status_code=429,
+            headers={"Retry-After": str(retry)},
+        )
+    started = await run_in_threadpool(_start_manual_call, idx1, effective_campaign, taken)
+    call = _current_call()
+    return FastJSONResponse({
+        "ok": started,
+        "status": call.get("status") or "idle",
+        "lead_index": call.get("lead_index"),
         "campaign": effective_campaign,
         "campaign_label": _campaign_display_name(effective_campaign) if effective_campaign else None,
     })
@@ -1020,73 +2058,215 @@ async def api_start_call(lead_global_index: int = Form(...), campaign: Optional[
 @app.post("/api/end_call")
 async def api_end_call(auto_next: bool = Form(True)):
     """End current call; optionally start the next call automatically."""
-    global CURRENT_LEAD_INDEX
-    prev = CURRENT_LEAD_INDEX
+    prev = _current_call().get("lead_index")
     had_proc = _end_current_call()
     # Wait briefly for process to exit
-    time.sleep(0.4)
+    await asyncio.sleep(0.4)
     _cleanup_if_exited()
     started_next = False
+    selected_campaign = STATE.selected_campaign
     if auto_next and prev is not None:
-        # Start next automatically
-        try:
-            spawn_call(prev + 1, SELECTED_CAMPAIGN)
-        except Exception:
-            pass
+        # Queue the next lead; the elected watcher starts it once the call slot is free
+        STATE.pending_next = {"after": prev, "campaign": selected_campaign, "queued": time.time()}
         started_next = True
-    return JSONResponse({
+        await run_in_threadpool(_promote_staged_call)
+    else:
+        await run_in_threadpool(_withdraw_staged_call, "call ended without auto-next")
+    call = _current_call()
+    return FastJSONResponse({
         "ok": True,
         "had_proc": had_proc,
-        "status": CURRENT_STATUS,
-        "lead_index": CURRENT_LEAD_INDEX,
+        "status": call.get("status") or "idle",
+        "lead_index": call.get("lead_index"),
         "auto_next_started": started_next,
-        "campaign": SELECTED_CAMPAIGN,
-        "campaign_label": _campaign_display_name(SELECTED_CAMPAIGN) if SELECTED_CAMPAIGN else None,
+        "campaign": selected_campaign,
+        "campaign_label": _campaign_display_name(selected_campaign) if selected_campaign else None,
     })
 
 
 @app.get("/api/status")
 async def api_status():
     _cleanup_if_exited()
-    running = CURRENT_PROC is not None and CURRENT_PROC.poll() is None
-    lead_details = get_lead_by_index_1based(CURRENT_LEAD_INDEX) if CURRENT_LEAD_INDEX else None
-    return JSONResponse({
-        "status": CURRENT_STATUS,
-        "running": running,
-        "lead_index": CURRENT_LEAD_INDEX,
-        "campaign": SELECTED_CAMPAIGN,
-        "campaign_label": _campaign_display_name(SELECTED_CAMPAIGN) if SELECTED_CAMPAIGN else None,
-        "auto_next": AUTO_NEXT,
+    call = _current_call()
+    lead_index = call.get("lead_index")
+    selected_campaign = STATE.selected_campaign
+    lead_details = get_lead_by_index_1based(lead_index) if lead_index else None
+    return FastJSONResponse({
+        "status": call.get("status") or "idle",
+        "running": _call_running(call),
+        "lead_index": lead_index,
+        "campaign": selected_campaign,
+        "campaign_label": _campaign_display_name(selected_campaign) if selected_campaign else None,
+        "auto_next": bool(STATE.auto_next),
         "lead": lead_details or {},
+        "room_agents": ROOM_POOL.snapshot(),
+        "staged_next": STATE.staged_next,
+        "call_usage": STATE.call_usage,
+        "call_usage_totals": describe_totals(STATE.call_usage_totals),
+        "admission": ADMISSION.stats() if ADMISSION_ENABLED else None,
+    })
+
+
+@app.get("/api/metrics")
+async def api_metrics():
+    """Operational metrics: backend breakers, suppression, dial rate, per-call resource usage and admission."""
+    return FastJSONResponse({
+        "backend": {
+            "base_url": backend_base_url(),
+            "breakers": breaker_states(),
+            "coalescing": BACKEND_FLIGHTS.stats(),
+        },
+        "suppression": SUPPRESSION.stats() if SUPPRESSION_ENABLED else None,
+        "dial_rate": DIAL_LIMITER.stats(),
+        "call_usage": describe_totals(STATE.call_usage_totals),
+        "admission": ADMISSION.stats() if ADMISSION_ENABLED else None,
+    })
+
+
+@app.get("/api/suppression/check")
+async def api_suppression_check(phone: str):
+    """Whether ``phone`` would be dialled now: reason "dnc", "recent" or null."""
+    return FastJSONResponse({"phone": phone, "suppressed": SUPPRESSION.check(phone)})
+
+
+@app.post("/api/suppression/opt_out")
+async def api_suppression_opt_out(phone: str = Form(...)):
+    """Add a number to the do-not-call list (effective immediately)."""
+    number = await run_in_threadpool(SUPPRESSION.add_opt_out, phone)
+    if number is None:
+        raise HTTPException(status_code=400, detail="Not a phone number")
+    return FastJSONResponse({"ok": True, "number": number})
+
+
+@app.post("/api/suppression/reload")
+async def api_suppression_reload():
+    """Rebuild the DNC index from the list files (in the background)."""
+    SUPPRESSION.rebuild_async()
+    return FastJSONResponse({"ok": True, "building": True})
+
+
+def _lead_set_page(lead_set: LeadSetSequence, page: int, cursor: Optional[str], page_size: int):
+    """Page a lazy lead set by global index (rows are read from member files on demand)."""
+    total = len(lead_set)
+    total_pages = max(1, math.ceil(total / page_size))
+    fingerprint = f"set:{lead_set.name}"
+    offset = None
+    if cursor:
+        try:
+            _, last = decode_cursor(cursor, fingerprint)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        start = last + 1
+    else:
+        page = max(1, min(page, total_pages))
+        start = offset = (page - 1) * page_size
+    end = min(start + page_size, total)
+    next_cursor = encode_cursor("", end - 1, fingerprint) if end < total else None
+    return FastJSONResponse({
+        "ok": True,
+        "leads": lead_set[start:end],
+        "indices": list(range(start, end)),
+        "page": page if offset is not None else None,
+        "total_pages": total_pages,
+        "start_index": offset,
+        "total_leads": total,
+        "total_matching": total,
+        "limit": page_size,
+        "next_cursor": next_cursor,
+        "lead_set": lead_set.name,
     })
 
 
 @app.get("/api/leads")
-async def api_leads(page: int = 1):
+async def api_leads(
+    page: int = 1,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    sort: Optional[str] = None,
+    company_name: Optional[str] = None,
+    job_title: Optional[str] = None,
+    timezone: Optional[str] = None,
+):
+    """Leads page for the active CSV.
+
+    Cursor pagination: pass ``next_cursor`` from the previous response as ``cursor``.
+    ``page`` is still accepted for offset-style navigation. Filters are exact
+    (case-insensitive) matches; ``sort`` is a field name, prefixed with '-' for descending.
+    """
+    try:
+        sort_field, descending = validate_sort(sort)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    filters = parse_filters({"company_name": company_name, "job_title": job_title, "timezone": timezone})
+    page_size = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    # Loading the CSV, querying and reading lead-set rows all block: keep them off the event loop
+    return await run_in_threadpool(_leads_page, filters, sort_field, descending, page, cursor, page_size)
+
+
+def _leads_page(filters: Dict[str, str], sort_field: Optional[str], descending: bool, page: int,
+                cursor: Optional[str], page_size: int) -> FastJSONResponse:
+    lead_set = _active_lead_set()
+    if lead_set is not None:
+        if filters or sort_field:
+            raise HTTPException(status_code=400, detail="Filtering and sorting are not supported on lead sets")
+        return _lead_set_page(lead_set, page, cursor, page_size)
     try:
-        leads = read_leads(LEADS_CSV)
+        store = _active_lead_store()
     except Exception:
-        leads = []
-    total = len(leads)
-    total_pages = max(1, math.ceil(total / PAGE_SIZE))
-    page = max(1, min(page, total_pages))
-    start = (page - 1) * PAGE_SIZE
-    end = min(start + PAGE_SIZE, total)
-    return JSONResponse({
-        "leads": leads[start:end],
-        "page": page,
+        store = LeadStore("", [], (0, 0))
+    offset = None if cursor else (max(1, page) - 1) * page_size
+    try:
+        rows, next_cursor, total = store.page(
+            filters, sort_field, descending, cursor=cursor, limit=page_size, offset=offset or 0
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    total_pages = max(1, math.ceil(total / page_size))
+    if offset is not None and page > total_pages:
+        # Past the last page: clamp and fetch that one (query results are cached)
+        page = total_pages
+        offset = (page - 1) * page_size
+        rows, next_cursor, _ = store.page(filters, sort_field, descending, limit=page_size, offset=offset)
+    elif offset is not None:
+        page = max(1, page)
+    return FastJSONResponse({
+        "ok": True,
+        "leads": [lead for _, lead in rows],
+        "indices": [i for i, _ in rows],  # zero-based rows in the CSV (use for start_call)
+        "page": page if offset is not None else None,
         "total_pages": total_pages,
-        "start_index": start,
-        "total_leads": total,
+        "start_index": offset,
+        "total_leads": len(store),
+        "total_matching": total,
+        "limit": page_size,
+        "next_cursor": next_cursor,
     })
 
 
+@app.get("/api/leads/search")
+async def api_leads_search(q: str = "", limit: int = SEARCH_DEFAULT_LIMIT):
+    """Typeahead search over prospect name, company, email and phone of the active CSV."""
+    result = await run_in_threadpool(_search_active_leads, q, limit)
+    return FastJSONResponse({"ok": True, "q": q, **result})
+
+
+def _search_active_leads(q: str, limit: int) -> Dict[str, Any]:
+    """Blocking part of /api/leads/search: may load the CSV and build its search index."""
+    if _active_lead_set() is not None:
+        raise HTTPException(status_code=400, detail="Search is not supported on lead sets")
+    try:
+        store = _active_lead_store()
+    except Exception:
+        store = LeadStore("", [], (0, 0))
+    return search_leads(store, q, limit)
+
+
 @app.get("/api/campaigns")
 async def api_campaigns():
     # Build combined campaign map (built-in + dynamic) and return key/label pairs
     all_campaigns = dict(CAMPAIGNS)
     try:
-        all_campaigns.update(_list_dynamic_campaigns())
+        all_campaigns.update(await run_in_threadpool(_list_dynamic_campaigns))
     except Exception:
         pass
     items = []
@@ -1096,17 +2276,13 @@ async def api_campaigns():
             # keep default entry visible too, but can be filtered on client if desired
             pass
         items.append({"key": k, "label": clean})
-    return JSONResponse({"campaigns": items})
+    return FastJSONResponse({"campaigns": items})
 
 
 # -----------------------------
 # Campaigns (Prisma via Node backend)
 # -----------------------------
 
-def _backend_base() -> str:
-    return os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
-
-
 @app.get("/api/campaigns/list")
 async def api_campaigns_list():
     # builtin from static CAMPAIGNS
@@ -1115,29 +2291,22 @@ async def api_campaigns_list():
         # k is label already (e.g., "Default (prompts)")
         mod, _, _ = v
         builtin_items.append({"name": _campaign_display_name(k), "module": mod})
-    # custom from Node backend
-    custom_items: list[dict] = []
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(f"{_backend_base()}/campaigns")
-            if r.status_code == 200:
-                for it in (r.json().get("items") or []):
-                    custom_items.append({
-                        "name": it.get("name"),
-                        "module": it.get("module"),
-                    })
-    except Exception:
-        pass
-    return JSONResponse({"builtin": builtin_items, "custom": custom_items})
+    # custom from Node backend (shared fetch; the mirrored list when it is unavailable)
+    custom_items = [
+        {"name": it.get("name"), "module": it.get("module")}
+        for it in await run_in_threadpool(_load_campaigns_store)
+    ]
+    return FastJSONResponse({"builtin": builtin_items, "custom": custom_items})
 
 
 @app.get("/api/campaigns/get")
 async def api_campaigns_get(module: str):
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(f"{_backend_base()}/campaigns/{module}")
-            if r.status_code == 200:
-                return JSONResponse(r.json())
+        r = await backend_arequest("GET", f"/campaigns/{module}", timeout=10)
+        if r.status_code == 200:
+            return FastJSONResponse(r.json())
+    except BackendUnavailable:
+        raise HTTPException(status_code=503, detail="Campaign backend unavailable")
     except Exception:
         pass
     raise HTTPException(status_code=404, detail="Not found")
@@ -1148,15 +2317,17 @@ async def api_campaigns_create(name: str = Form(...), module: str = Form(...), a
     payload = {"name": name, "module": module, "agent_text": agent_text, "session_text": session_text}
     try:
         # Save to Node backend
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.post(f"{_backend_base()}/campaigns", json=payload)
-            if r.status_code in (200, 201):
-                # Generate/refresh local module for runtime
-                try:
-                    _generate_prompt_module(module, agent_text, session_text)
-                except Exception:
-                    pass
-                return JSONResponse(r.json())
+        r = await backend_arequest("POST", "/campaigns", timeout=15, json=payload)
+        if r.status_code in (200, 201):
+            BACKEND_FLIGHTS.forget("campaigns")
+            # Generate/refresh local module for runtime
+            try:
+                _generate_prompt_module(module, agent_text, session_text)
+            except Exception:
+                pass
+            return FastJSONResponse(r.json())
+    except BackendUnavailable:
+        raise HTTPException(status_code=503, detail="Campaign backend unavailable")
     except Exception:
         pass
     raise HTTPException(status_code=400, detail="Create failed")
@@ -1166,14 +2337,16 @@ async def api_campaigns_create(name: str = Form(...), module: str = Form(...), a
 async def api_campaigns_update(module: str = Form(...), name: str = Form(""), agent_text: str = Form(""), session_text: str = Form("")):
     payload = {"name": name or module, "agent_text": agent_text, "session_text": session_text}
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.put(f"{_backend_base()}/campaigns/{module}", json=payload)
-            if r.status_code == 200:
-                try:
-                    _generate_prompt_module(module, agent_text, session_text)
-                except Exception:
-                    pass
-                return JSONResponse(r.json())
+        r = await backend_arequest("PUT", f"/campaigns/{module}", timeout=15, json=payload)
+        if r.status_code == 200:
+            BACKEND_FLIGHTS.forget("campaigns")
+            try:
+                _generate_prompt_module(module, agent_text, session_text)
+            except Exception:
+                pass
+            return FastJSONResponse(r.json())
+    except BackendUnavailable:
+        raise HTTPException(status_code=503, detail="Campaign backend unavailable")
     except Exception:
         pass
     raise HTTPException(status_code=400, detail="Update failed")
@@ -1182,10 +2355,12 @@ async def api_campaigns_update(module: str = Form(...), name: str = Form(""), ag
 @app.delete("/api/campaigns/{module}")
 async def api_campaigns_delete(module: str):
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.delete(f"{_backend_base()}/campaigns/{module}")
-            if r.status_code in (200, 204):
-                return JSONResponse({"ok": True})
+        r = await backend_arequest("DELETE", f"/campaigns/{module}", timeout=10)
+        if r.status_code in (200, 204):
+            BACKEND_FLIGHTS.forget("campaigns")
+            return FastJSONResponse({"ok": True})
+    except BackendUnavailable:
+        raise HTTPException(status_code=503, detail="Campaign backend unavailable")
     except Exception:
         pass
     raise HTTPException(status_code=400, detail="Delete failed")
@@ -1194,91 +2369,103 @@ async def api_campaigns_delete(module: str):
 @app.post("/api/campaigns/upload_prompts")
 async def api_campaigns_upload_prompts(which: str = Form(...), file: UploadFile = File(...)):
     text = (await file.read()).decode("utf-8", errors="ignore")
-    return JSONResponse({"which": which, "text": text})
+    return FastJSONResponse({"which": which, "text": text})
 
 
 @app.post("/api/campaigns/seed_supabase")
 async def api_campaigns_seed_supabase():
     # No-op: Supabase removed. Return success with count=0
-    return JSONResponse({"count": 0, "errors": []})
+    return FastJSONResponse({"count": 0, "errors": []})
 
 
 @app.post("/api/auto_next")
 async def api_auto_next(enabled: bool = Form(...)):
-    global AUTO_NEXT
-    AUTO_NEXT = bool(str(enabled).lower() in ["1", "true", "yes", "on"])
-    return JSONResponse({"ok": True, "auto_next": AUTO_NEXT})
+    auto_next = bool(str(enabled).lower() in ["1", "true", "yes", "on"])
+    STATE.auto_next = auto_next
+    if not auto_next:
+        _release_queued_leads()
+    return FastJSONResponse({"ok": True, "auto_next": auto_next})
 
 
 @app.post("/api/stop_all")
 async def api_stop_all():
     """Disable auto-next and end any running call (end whole session)."""
-    global AUTO_NEXT
-    AUTO_NEXT = False
+    STATE.auto_next = False
+    STATE.pending_next = None
+    _release_queued_leads()
     _end_current_call()
     time.sleep(0.4)
     _cleanup_if_exited()
-    return JSONResponse({"ok": True, "status": CURRENT_STATUS, "auto_next": AUTO_NEXT})
+    return FastJSONResponse({"ok": True, "status": _current_call().get("status") or "idle", "auto_next": False})
+
+
+@app.get("/api/queue")
+async def api_queue_stats():
+    """Progress of the active lead list in the shared work queue."""
+    source, total = _active_queue_source()
+    _ensure_queue_source(source, total)
+    return FastJSONResponse({"ok": True, "source": source, "total": total, "counts": LEAD_QUEUE.stats(source)})
+
+
+@app.post("/api/queue/requeue")
+async def api_queue_requeue(status: str = Form("interrupted")):
+    """Put interrupted (or done) leads of the active list back in the queue."""
+    source, _ = _active_queue_source()
+    try:
+        count = LEAD_QUEUE.requeue(source, status)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FastJSONResponse({"ok": True, "source": source, "requeued": count})
 
 
 # Start watcher thread once
 def _ensure_watcher_started():
     global _WATCHER_STARTED
     if not _WATCHER_STARTED:
-        t = Thread(target=_watcher_loop, daemon=True)
+        t = Thread(target=_watcher_loop, name="dial-watcher", daemon=True)
         t.start()
+        LeaseRenewer(LEAD_QUEUE, WORKER_ID, LEAD_LEASE_TTL).start()
         _WATCHER_STARTED = True
 
 
 _ensure_watcher_started()
 
 
+@app.on_event("startup")
+async def _prewarm_vendor_assets():
+    # Load cached vendor scripts from disk, fetching any missing ones in the background
+    ensure_vendor_warming()
+    if SUPPRESSION_ENABLED:
+        # Maps the DNC index now; rebuilds it in the background if a list changed
+        SUPPRESSION.load()
+
+
+@app.on_event("shutdown")
+async def _stop_room_agents():
+    ROOM_POOL.shutdown()
+    _discard_staged_call("shutting down")
+
+
 @app.get("/vendor/livekit-client.js")
-async def vendor_livekit_client():
+async def vendor_livekit_client(request: Request):
     """Serve the LiveKit Web SDK via backend to bypass CDN/network blocks.
-    Caches the file in memory for subsequent requests.
+    Served from the on-disk vendor cache (precompressed, ETag/304 aware); never fetches on request.
     """
-    cache_key = "livekit-client-2.3.3"
-    if cache_key in _LK_JS_CACHE:
-        return Response(content=_LK_JS_CACHE[cache_key], media_type="application/javascript")
-    cdns = [
-        "https://cdn.livekit.io/npm/livekit-client/2.3.3/livekit-client.umd.min.js",
-        "https://unpkg.com/livekit-client@2.3.3/dist/livekit-client.umd.min.js",
-        "https://cdn.jsdelivr.net/npm/livekit-client@2.3.3/dist/livekit-client.umd.min.js",
-    ]
-    for url in cdns:
-        try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                r = await client.get(url)
-                if r.status_code == 200 and r.content:
-                    _LK_JS_CACHE[cache_key] = r.content
-                    return Response(content=r.content, media_type="application/javascript")
-        except Exception:
-            continue
-    raise HTTPException(status_code=502, detail="Failed to load LiveKit client script from CDNs")
+    asset = get_vendor_asset("livekit-client-2.3.3")
+    if asset is None:
+        ensure_vendor_warming()
+        raise HTTPException(status_code=503, detail="LiveKit client script not cached yet", headers={"Retry-After": "5"})
+    return vendor_asset_response(asset, request.headers)
 
 
 @app.get("/vendor/livekit-client.esm.js")
-async def vendor_livekit_client_esm():
+async def vendor_livekit_client_esm(request: Request):
     """Serve the LiveKit Web ESM build via backend to bypass CORS/CDN blocks."""
-    cache_key = "livekit-client-esm-2.3.3"
-    if cache_key in _LK_JS_CACHE:
-        return Response(content=_LK_JS_CACHE[cache_key], media_type="application/javascript")
-    cdns = [
-        "https://unpkg.com/livekit-client@2.3.3/dist/livekit-client.esm.min.js",
-        "https://cdn.jsdelivr.net/npm/livekit-client@2.3.3/dist/livekit-client.esm.min.js",
-        "https://unpkg.com/livekit-client/dist/livekit-client.esm.min.js",
-    ]
-    for url in cdns:
-        try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                r = await client.get(url)
-                if r.status_code == 200 and r.content:
-                    _LK_JS_CACHE[cache_key] = r.content
-                    return Response(content=r.content, media_type="application/javascript")
-        except Exception:
-            continue
-    raise HTTPException(status_code=502, detail="Failed to load LiveKit ESM module from CDNs")
+    asset = get_vendor_asset("livekit-client-esm-2.3.3")
+    if asset is None:
+        ensure_vendor_warming()
+        raise HTTPException(status_code=503, detail="LiveKit ESM module not cached yet", headers={"Retry-After": "5"})
+    return vendor_asset_response(asset, request.headers)
 
 
 @app.post("/browser/start")
@@ -1289,7 +2476,13 @@ async def start_browser_call(
 ):
     # Create a simple deterministic room name by index (you may swap for UUID)
     room_name = f"room-{lead_global_index+1}"
-    background_tasks.add_task(spawn_agent_connect_room, room_name, campaign)
+    try:
+        await run_in_threadpool(spawn_agent_connect_room, room_name, campaign, lead_global_index + 1)
+    except PoolFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "10"})
+    except RoomBusy:
+        # Another web worker already has an agent in this room; just join it
+        pass
     return RedirectResponse(url=f"/browser/call?room={room_name}{'&campaign='+campaign if campaign else ''}", status_code=303)
 
 
@@ -1328,27 +2521,28 @@ async def issue_token(room: str, identity: str):
         "name": identity,
     }
     token = jwt.encode(payload, LIVEKIT_API_SECRET, algorithm="HS256")
-    return JSONResponse({"token": token})
+    # A browser (re)joining counts as room activity for idle reclamation
+    ROOM_POOL.touch(room)
+    return FastJSONResponse({"token": token})
 
 
-@app.get("/api/leads")
-async def api_get_leads(page: int = 1):
-    """New endpoint to serve leads data as JSON for React frontend"""
-    leads = read_leads(LEADS_CSV)
-    total = len(leads)
-    total_pages = max(1, math.ceil(total / PAGE_SIZE))
-    page = max(1, min(page, total_pages))
-    start = (page - 1) * PAGE_SIZE
-    end = min(start + PAGE_SIZE, total)
-    
-    return JSONResponse({
-        "ok": True,
-        "leads": leads[start:end],
-        "page": page,
-        "total_pages": total_pages,
-        "start_index": start,
-        "total_leads": total
-    })
+@app.get("/api/rooms")
+async def api_rooms():
+    return FastJSONResponse({"ok": True, **ROOM_POOL.snapshot()})
+
+
+@app.post("/api/rooms/{room}/heartbeat")
+async def api_room_heartbeat(room: str):
+    """Keep a browser room's agent from being reclaimed as idle."""
+    return FastJSONResponse({"ok": ROOM_POOL.touch(room)})
+
+
+@app.delete("/api/rooms/{room}")
+async def api_room_release(room: str):
+    """Stop the agent serving a browser room and free its slot."""
+    if not ROOM_POOL.release(room):
+        raise HTTPException(status_code=404, detail="No agent for this room")
+    return FastJSONResponse({"ok": True})
 
 
 @app.get("/api/campaigns")
@@ -1356,7 +2550,7 @@ async def api_get_campaigns():
     """Get available campaigns for dropdown"""
     all_campaigns = dict(CAMPAIGNS)
     try:
-        all_campaigns.update(_list_dynamic_campaigns())
+        all_campaigns.update(await run_in_threadpool(_list_dynamic_campaigns))
     except Exception:
         pass
     
@@ -1367,7 +2561,7 @@ async def api_get_campaigns():
             continue
         campaign_options.append({"key": k, "label": clean})
     
-    return JSONResponse({
+    return FastJSONResponse({
         "ok": True,
         "campaigns": campaign_options
     })
@@ -1381,7 +2575,7 @@ async def call_next(
     page: int = Form(1),
 ):
     lead_index_1based = next_index + 1
-    background_tasks.add_task(spawn_call, lead_index_1based, campaign)
+    background_tasks.add_task(_start_from_form, lead_index_1based, campaign)
 
     url = f"/?page={page}"
     if campaign:
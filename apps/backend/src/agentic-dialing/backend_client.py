@@ -0,0 +1,311 @@
+"""Resilient calls to the Node backend (``BACKEND_API_BASE``).
+
+Every call goes through a per-endpoint ``CircuitBreaker``. After
+``BACKEND_BREAKER_FAILURES`` consecutive failures (transport errors or 5xx) an
+endpoint's breaker opens, and calls fail at once with ``BackendUnavailable``
+instead of each waiting out a timeout; callers fall back to their local caches
+(``campaigns.json``, ``CSV_DIR``). After ``BACKEND_BREAKER_RESET`` seconds one
+trial call is let through (half-open): success closes the breaker, failure
+re-opens it. A trial that ends without a result (cancelled, or a caller bug)
+is released; one that never reports back at all is written off after
+``BACKEND_BREAKER_TRIAL_TIMEOUT`` seconds so the breaker cannot stick half-open.
+
+Idempotent methods are retried up to ``BACKEND_RETRIES`` times with jittered
+exponential backoff; POSTs are never retried. Connecting is bounded by
+``BACKEND_CONNECT_TIMEOUT`` so a host that is down fails in seconds, not after
+the full read timeout.
+
+``SingleFlight`` coalesces identical fetches: concurrent callers for the same
+resource share one in-flight call and its result, which is then reused for
+``BACKEND_COALESCE_WINDOW`` seconds, so a burst of dashboard loads costs the
+backend one request per resource.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+FAILURE_THRESHOLD = int(os.getenv("BACKEND_BREAKER_FAILURES", "5"))
+RESET_TIMEOUT = float(os.getenv("BACKEND_BREAKER_RESET", "30"))
+TRIAL_TIMEOUT = float(os.getenv("BACKEND_BREAKER_TRIAL_TIMEOUT", "120"))
+MAX_RETRIES = int(os.getenv("BACKEND_RETRIES", "2"))
+CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "2"))
+COALESCE_WINDOW = float(os.getenv("BACKEND_COALESCE_WINDOW", "1.0"))
+_BACKOFF_BASE = 0.2
+_BACKOFF_CAP = 2.0
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class BackendUnavailable(Exception):
+    """The endpoint's breaker is open (or the backend failed); use the local fallback."""
+
+
+def base_url() -> str:
+    return os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 trial_timeout: float = TRIAL_TIMEOUT) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.trial_timeout = trial_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trial_started = 0.0
+        self.calls = 0
+        self.rejected = 0
+        self.total_failures = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (half-open admits one trial call at a time)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == HALF_OPEN and self.trial_in_flight and now - self.trial_started >= self.trial_timeout:
+                # The trial's caller never reported back; let another one through
+                self.trial_in_flight = False
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self.trial_in_flight):
+                if self.state == HALF_OPEN:
+                    self.trial_in_flight = True
+                    self.trial_started = now
+                self.calls += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def release(self) -> None:
+        """End an allowed call that produced no result (cancelled or errored locally) without judging the endpoint."""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            self.last_error = error
+            self.trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "failures": self.total_failures,
+                "last_error": self.last_error,
+                "retry_in": retry_in,
+            }
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def breaker(endpoint: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        b = _BREAKERS.get(endpoint)
+        if b is None:
+            b = _BREAKERS[endpoint] = CircuitBreaker(endpoint)
+        return b
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _BREAKERS_LOCK:
+        items = list(_BREAKERS.items())
+    return {name: b.snapshot() for name, b in items}
+
+
+def endpoint_for(path: str) -> str:
+    """Breaker key of a backend path: its first segment(s), e.g. ``campaigns`` or ``csv/list``."""
+    parts = [p for p in path.strip("/").split("/") if p]
+    if not parts:
+        return "root"
+    if parts[0] == "csv" and len(parts) > 1:
+        return f"csv/{parts[1]}" if parts[1] in ("list", "upload", "download") else "csv/delete"
+    return parts[0]
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: spreads the retries of many workers hitting the same outage
+    return random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * (2 ** attempt)))
+
+
+def _timeout(timeout: float) -> httpx.Timeout:
+    return httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout))
+
+
+def _attempts(method: str, retries: Optional[int]) -> int:
+    if retries is None:
+        retries = MAX_RETRIES if method.upper() in IDEMPOTENT_METHODS else 0
+    return 1 + max(0, retries)
+
+
+def request(method: str, path: str, *, timeout: float = 10.0, retries: Optional[int] = None,
+            endpoint: Optional[str] = None, **kwargs: Any) -> httpx.Response:
+    """Call ``BACKEND_API_BASE + path``; raises ``BackendUnavailable`` when it cannot be reached.
+
+    4xx responses are returned (the backend is up); 5xx and transport errors count as failures.
+    """
+    b = breaker(endpoint or endpoint_for(path))
+    attempts = _attempts(method, retries)
+    error = "unreachable"
+    with httpx.Client(timeout=_timeout(timeout)) as client:
+        for attempt in range(attempts):
+            if not b.allow():
+                raise BackendUnavailable(f"{b.name}: circuit open ({error if attempt else b.last_error})")
+            try:
+                r = client.request(method, f"{base_url()}{path}", **kwargs)
+            except httpx.HTTPError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            except BaseException:
+                b.release()
+                raise
+            else:
+                if r.status_code < 500:
+                    b.record_success()
+                    return r
+                error = f"HTTP {r.status_code}"
+            b.record_failure(error)
+            if attempt + 1 < attempts:
+                time.sleep(_backoff(attempt))
+    raise BackendUnavailable(f"{b.name}: {error}")
+
+
+async def arequest(method: str, path: str, *, timeout: float = 10.0, retries: Optional[int] = None,
+                   endpoint: Optional[str] = None, **kwargs: Any) -> httpx.Response:
+    """Async ``request`` for request handlers."""
+    b = breaker(endpoint or endpoint_for(path))
+    attempts = _attempts(method, retries)
+    error = "unreachable"
+    async with httpx.AsyncClient(timeout=_timeout(timeout)) as client:
+        for attempt in range(attempts):
+            if not b.allow():
+                raise BackendUnavailable(f"{b.name}: circuit open ({error if attempt else b.last_error})")
+            try:
+                r = await client.request(method, f"{base_url()}{path}", **kwargs)
+            except httpx.HTTPError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            except BaseException:
+                # Cancelled or a bad argument: says nothing about the endpoint, but frees a half-open trial
+                b.release()
+                raise
+            else:
+                if r.status_code < 500:
+                    b.record_success()
+                    return r
+                error = f"HTTP {r.status_code}"
+            b.record_failure(error)
+            if attempt + 1 < attempts:
+                await asyncio.sleep(_backoff(attempt))
+    raise BackendUnavailable(f"{b.name}: {error}")
+
+
+# -----------------------------
+# Single-flight request coalescing
+# -----------------------------
+class _Flight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one ``fn`` per key at a time; concurrent callers wait for and share its result.
+
+    A successful result is also served to callers arriving within ``fresh_for``
+    seconds after it completed; errors are shared only with callers already waiting.
+    ``forget`` bumps the key's generation: a fetch started before it may still be
+    returned to its own waiters, but is neither cached nor joined by later callers.
+    """
+
+    def __init__(self, fresh_for: float = COALESCE_WINDOW) -> None:
+        self.fresh_for = fresh_for
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._recent: Dict[str, Tuple[float, Any]] = {}
+        self._generations: Dict[str, int] = {}
+        self.calls = 0
+        self.shared = 0
+        self.reused = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent is not None and time.monotonic() - recent[0] < self.fresh_for:
+                self.reused += 1
+                return recent[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generations.get(key, 0)
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                current = self._generations.get(key, 0) == generation
+                if flight.error is None and self.fresh_for > 0 and current:
+                    self._recent[key] = (time.monotonic(), flight.result)
+            flight.event.set()
+        return flight.result
+
+    def forget(self, key: str) -> None:
+        """Drop the reusable result for ``key`` (after a write that changes it), including one still in flight."""
+        with self._lock:
+            self._recent.pop(key, None)
+            self._flights.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = sorted(self._flights)
+        return {"fetches": self.calls, "shared": self.shared, "reused": self.reused, "in_flight": in_flight}
@@ -0,0 +1,150 @@
+"""Memory per concurrent call: one process per call versus many calls in one process.
+
+Runs ``--calls`` offline calls at once (``agent.entrypoint`` with the scripted
+stub model, as in ``bench_agent_turns``) and measures memory while all of them
+are live, laid out the way the two ``AGENT_JOB_EXECUTOR`` modes lay them out:
+
+* process per call: one interpreter per call, as with ``process``;
+* thread per call: one interpreter, each call on its own thread and event
+  loop, as with ``thread``.
+
+This is a proxy, not the executors themselves: the sessions are started by
+this script rather than by ``WorkerOptions(job_executor_type=...)``, since the
+worker only runs jobs a LiveKit server dispatches to it. The executors' own
+per-job bookkeeping (job process/thread supervision, IPC, job context) is not
+included, so treat the figures as the session cost each layout carries.
+
+Memory is PSS (shared pages are split between the processes sharing them, so
+one-interpreter-per-call is not overstated by shared libraries); RSS where
+``/proc/<pid>/smaps_rollup`` is unavailable. An interpreter with the agent
+imported and no call is measured too, to separate the fixed cost from the
+marginal cost of a call. What the noise cancellation plugin's native runtime
+allocates at import varies by tens of MB from one interpreter to the next, so
+each figure is the median of ``--repeat`` runs.
+
+Usage: python benchmarks/bench_agent_memory.py [--calls 4] [--repeat 3] [--hold 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def _memory_mb(pid: int) -> float:
+    for path, key in ((f"/proc/{pid}/smaps_rollup", "Pss:"), (f"/proc/{pid}/status", "VmRSS:")):
+        try:
+            with open(path, encoding="ascii") as fh:
+                for line in fh:
+                    if line.startswith(key):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            continue
+    raise RuntimeError("memory figures need /proc (Linux)")
+
+
+def _host(calls: int) -> None:
+    """Child: start ``calls`` offline calls on their own threads, report "live", hold until stdin closes."""
+    import agent
+    from livekit import rtc
+
+    from bench_agent_turns import ignore_offline_errors, install_session_recorder, run_session
+
+    install_session_recorder(agent)
+    live: List[threading.Event] = []
+
+    def call(n: int, started: threading.Event) -> None:
+        async def run() -> None:
+            ignore_offline_errors()
+            await run_session(agent, rtc, n, started)
+
+        asyncio.run(run())
+
+    for n in range(calls):
+        started = threading.Event()
+        live.append(started)
+        threading.Thread(target=call, args=(n, started), daemon=True).start()
+    for started in live:
+        started.wait()
+    gc.collect()  # import-time garbage would otherwise count against whichever mode collects it later
+    print("live", flush=True)
+    sys.stdin.read()
+    os._exit(0)
+
+
+def _start(calls: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, __file__, "--child", str(calls)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+
+
+def _measure(hosts: List[subprocess.Popen]) -> float:
+    """Total memory of ``hosts`` once every call in them is live."""
+    for p in hosts:
+        if p.stdout.readline().strip() != "live":
+            raise RuntimeError(f"benchmark child {p.pid} failed")
+    time.sleep(0.5)  # let the sessions settle into waiting for the caller
+    total = sum(_memory_mb(p.pid) for p in hosts)
+    for p in hosts:
+        p.stdin.close()
+        p.wait()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=4, help="concurrent calls")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per figure (median reported)")
+    parser.add_argument("--hold", type=float, default=10.0, help="seconds between the scripted caller's turns")
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        _host(args.child)
+        return
+
+    os.environ.update({
+        "AGENT_REALTIME_MODEL": "stub",
+        "TRANSCRIPTS": "0",
+        "STUB_REALTIME_LATENCY": "0.05",
+        "STUB_REALTIME_CHUNK_DELAY": "0.005",
+        # The scripted caller pauses this long before each turn, keeping the calls live while they are measured
+        "STUB_REALTIME_USER_GAP": str(args.hold),
+    })
+    os.chdir(Path(__file__).resolve().parents[1])
+    k = max(1, args.calls)
+
+    runs = max(1, args.repeat)
+    idle = statistics.median(_measure([_start(0)]) for _ in range(runs))
+    per_process = statistics.median(_measure([_start(1) for _ in range(k)]) for _ in range(runs))
+    shared = statistics.median(_measure([_start(k)]) for _ in range(runs))
+
+    print(f"interpreter with agent imported, no call: {idle:.1f} MB")
+    print(f"process per call (proxy for AGENT_JOB_EXECUTOR=process): {k} calls, {per_process:.1f} MB total, "
+          f"{per_process / k:.1f} MB per call")
+    marginal = (shared - idle) / k
+    print(f"one process, thread per call (proxy for AGENT_JOB_EXECUTOR=thread): {k} calls, {shared:.1f} MB total, "
+          f"{shared / k:.1f} MB per call "
+          f"(marginal {f'{marginal:.1f} MB' if marginal >= 1 else 'under 1 MB, within run-to-run noise'} per call)")
+    print(f"memory per call: {per_process / shared:.1f}x less with one thread per call "
+          f"(executor overhead not included)")
+
+
+if __name__ == "__main__":
+    main()
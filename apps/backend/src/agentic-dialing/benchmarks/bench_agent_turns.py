@@ -0,0 +1,202 @@
+"""Benchmark the agent call pipeline offline: session start, turn latency and per-session overhead.
+
+Drives ``agent.entrypoint`` with an offline job context (an unconnected room,
+dispatch metadata carrying a synthetic lead) and the scripted realtime model
+(``AGENT_REALTIME_MODEL=stub``, see ``realtime_stub``). Each session plays the
+script: greeting, then caller turns; nothing touches the network.
+
+Reports, over ``--sessions`` sessions (``--concurrency`` at a time):
+
+* session start: entrypoint call -> greeting's first chunk read by the pipeline;
+* turn latency: caller end of speech -> first reply chunk read, and the
+  pipeline's share of it (minus the stub's configured ``--latency``);
+* per-session overhead: CPU seconds and RSS growth per session.
+
+Usage: python benchmarks/bench_agent_turns.py [--sessions 10] [--concurrency 1] [--script call.json|journal.jsonl]
+       [--latency 0.3] [--chunk-delay 0.02] [--user-gap 0.2] [--text-only]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Errors the agent framework logs only because the room is not connected (span attributes)
+_OFFLINE_ERRORS = ("cannot access local participant before connecting",)
+
+LEAD = {
+    "prospect_name": "Dana Whitfield",
+    "resource_name": "Oracle BI modernisation guide",
+    "job_title": "Director of Finance Systems",
+    "company_name": "Acme Logistics",
+    "email": "dana.whitfield@acme-logistics.example",
+    "phone": "15550100",
+}
+
+
+class OfflineJobContext:
+    """The parts of ``agents.JobContext`` that ``entrypoint`` uses, without a worker or server."""
+
+    def __init__(self, n: int, room: Any) -> None:
+        self.room = room
+        self.job = type("Job", (), {"id": f"bench-{n}", "metadata": json.dumps({"lead": LEAD})})()
+        self.shutdown_callbacks: List[Any] = []
+
+    async def connect(self) -> None:
+        pass
+
+    def add_shutdown_callback(self, cb: Any) -> None:
+        self.shutdown_callbacks.append(cb)
+
+
+OFFLINE_ERRORS_IGNORED = [0]
+
+
+def ignore_offline_errors() -> None:
+    """Install a handler on the running loop that drops the offline-room errors (and counts them)."""
+
+    def on_error(loop: asyncio.AbstractEventLoop, context: Dict[str, Any]) -> None:
+        if any(m in str(context.get("exception") or context.get("message")) for m in _OFFLINE_ERRORS):
+            OFFLINE_ERRORS_IGNORED[0] += 1
+            return
+        loop.default_exception_handler(context)
+
+    asyncio.get_running_loop().set_exception_handler(on_error)
+
+
+# AgentSessions created by entrypoint in the current task (context), so runs can be measured and closed
+_CREATED: contextvars.ContextVar[List[Any]] = contextvars.ContextVar("created_sessions")
+
+
+def install_session_recorder(agent: Any) -> None:
+    class RecordingSession(agent.AgentSession):
+        def __init__(self, *a: Any, **kw: Any) -> None:
+            super().__init__(*a, **kw)
+            _CREATED.get().append(self)
+
+    agent.AgentSession = RecordingSession
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # no /proc: peak RSS is the closest figure
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def run_session(agent: Any, rtc: Any, n: int, started_event: Any = None) -> Dict[str, Any]:
+    """One offline call through ``agent.entrypoint``; ``started_event`` (if given) is set once it is live."""
+    created: List[Any] = []
+    _CREATED.set(created)
+    ctx = OfflineJobContext(n, rtc.Room())
+    started = time.perf_counter()
+    await agent.entrypoint(ctx)
+    entered = time.perf_counter()
+    if started_event is not None:
+        started_event.set()
+    session = created[0]
+    rt = session.current_agent.llm.sessions[0]
+    await rt.done.wait()
+    for cb in ctx.shutdown_callbacks:
+        await cb()
+    await session.aclose()
+    greeting = rt.turns[0]
+    return {
+        "entrypoint": entered - started,
+        "model_session": rt.opened - started,
+        "first_words": greeting.get("first_chunk", entered) - started,
+        "turns": [t["first_chunk"] - t["user_end"] for t in rt.turns[1:] if "first_chunk" in t],
+        "seconds": time.perf_counter() - started,
+    }
+
+
+async def bench(args: argparse.Namespace) -> None:
+    t0 = time.perf_counter()
+    import agent  # noqa: E402  (reads AGENT_REALTIME_MODEL / STUB_* at import)
+    from livekit import rtc  # noqa: E402
+
+    import_s = time.perf_counter() - t0
+
+    ignore_offline_errors()
+
+    install_session_recorder(agent)
+
+    # Warm-up session: first-use imports and caches are start-up cost, not per-session overhead
+    await run_session(agent, rtc, 0)
+    rss0, cpu0, wall0 = _rss_mb(), time.process_time(), time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    for first in range(1, args.sessions + 1, args.concurrency):
+        batch = range(first, min(args.sessions, first + args.concurrency - 1) + 1)
+        results.extend(await asyncio.gather(*(run_session(agent, rtc, n) for n in batch)))
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - wall0
+    rss = _rss_mb() - rss0
+
+    turns = [t for r in results for t in r["turns"]]
+    starts = [r["first_words"] for r in results]
+    ms = lambda s: round(1000 * s, 1)  # noqa: E731
+    print(f"agent import: {import_s:.2f}s; model: stub (latency {args.latency}s, chunk {args.chunk_delay}s)")
+    print(f"sessions: {len(results)} x {len(turns) // max(1, len(results))} turns, concurrency {args.concurrency}, "
+          f"wall {wall:.2f}s")
+    print(f"session start (entrypoint -> first words): p50 {ms(statistics.median(starts))} ms, "
+          f"p95 {ms(_pct(starts, 0.95))} ms; entrypoint returns after "
+          f"{ms(statistics.median(r['entrypoint'] for r in results))} ms, model session opened after "
+          f"{ms(statistics.median(r['model_session'] for r in results))} ms")
+    if turns:
+        print(f"turn latency: p50 {ms(statistics.median(turns))} ms, p95 {ms(_pct(turns, 0.95))} ms, "
+              f"max {ms(max(turns))} ms; pipeline share p50 {ms(statistics.median(turns) - args.latency)} ms")
+    print(f"per session: {cpu / len(results) * 1000:.1f} ms CPU, {rss / len(results):+.2f} MB RSS "
+          f"({cpu / wall:.2f} cores busy while running)")
+    if OFFLINE_ERRORS_IGNORED[0]:
+        print(f"({OFFLINE_ERRORS_IGNORED[0]} offline-room span errors ignored)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--script", help="call script (JSON) or recorded transcript journal (.jsonl)")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub model's time to first reply chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    parser.add_argument("--user-gap", type=float, default=0.2)
+    parser.add_argument("--text-only", action="store_true", help="replies without the silent audio track")
+    args = parser.parse_args()
+    args.concurrency = max(1, args.concurrency)
+
+    os.environ.update({
+        "AGENT_REALTIME_MODEL": "stub",
+        "TRANSCRIPTS": "0",
+        "STUB_REALTIME_LATENCY": str(args.latency),
+        "STUB_REALTIME_CHUNK_DELAY": str(args.chunk_delay),
+        "STUB_REALTIME_USER_GAP": str(args.user_gap),
+        "STUB_REALTIME_AUDIO": "0" if args.text_only else "1",
+    })
+    if args.script:
+        os.environ["STUB_REALTIME_SCRIPT"] = str(Path(args.script).resolve())
+    os.chdir(Path(__file__).resolve().parents[1])
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark the post-call analysis pipeline on a synthetic backlog of transcripts.
+
+Writes ``--calls`` transcript journals shaped like the agent's (.transcripts/
+JSONL, ~20 turns each, drawn from the script's CQ answers, objections and
+closes), then analyses the backlog inline (one process) and with the process
+pool, reporting calls/second against ``--target``.
+
+Usage: python benchmarks/bench_call_analysis.py [--calls 5000] [--workers N] [--batch 64] [--target 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import call_analysis  # noqa: E402
+
+AGENT = [
+    "Hi, this is Alex from SplashBI. Do you have a quick minute?",
+    "What are your current challenges with Oracle reporting or BI tools?",
+    "When it comes to evaluating solutions like this, what role do you typically play in the decision-making process?",
+    "If this solution resonates with your team, what's your typical evaluation timeframe?",
+    "I have your email as david.miller@cybernova.com, is that right?",
+    "Excellent. You'll hear from our team within 48 hours.",
+    "I totally get that. This is just an exploration call, no commitments.",
+]
+USER = [
+    "Sure, go ahead.",
+    "Honestly our reporting is slow and very manual, month end is a pain.",
+    "No real challenges, everything's fine.",
+    "I'm the decision maker for BI tools here.",
+    "I'd recommend it but my CFO decides.",
+    "Probably next quarter.",
+    "We'd look at it in 3 months.",
+    "Yes, that's correct.",
+    "Actually, my email is d.miller@cybernova.io",
+    "We don't have budget for this right now.",
+    "We use Tableau for most of it.",
+    "I'm too busy, can you call me back tomorrow?",
+    "Not interested, thanks.",
+    "Sorry, wrong number, he no longer works here.",
+    "Tell me more about it.",
+]
+
+
+def write_backlog(root: Path, calls: int, seed: int = 11) -> None:
+    rnd = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    for c in range(calls):
+        call = f"job-{c:06d}"
+        t = 0.0
+        with open(root / f"{call}.jsonl", "w", encoding="utf-8") as fh:
+            for seq in range(rnd.randint(8, 30)):
+                speaker = "agent" if seq % 2 == 0 else "user"
+                text = rnd.choice(AGENT if speaker == "agent" else USER)
+                t += rnd.uniform(1.0, 8.0)
+                fh.write(json.dumps({"call": call, "seq": seq + 1, "speaker": speaker, "text": text,
+                                     "is_final": True, "ts": 1.7e9 + t, "start": round(t, 3)}) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--target", type=float, default=1000.0, help="calls/second the pool should sustain")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / ".transcripts"
+        write_backlog(root, args.calls)
+        out = call_analysis.analysis_dir(root)
+        runs = [("inline", 1), (f"pool x{args.workers}", args.workers)]
+        print(f"backlog: {args.calls:,} calls")
+        header = f"{'mode':12} {'seconds':>9} {'calls/s':>10}  dispositions"
+        print(header)
+        print("-" * len(header))
+        pool_rate = None
+        for name, workers in runs:
+            shutil.rmtree(out, ignore_errors=True)
+            journals = list(call_analysis.pending_journals(root, settle=0))
+            summary = call_analysis.run_analysis(journals, out, workers=workers, batch_size=args.batch)
+            print(f"{name:12} {summary['seconds']:9.2f} {summary['calls_per_sec']:10.0f}  {summary['dispositions']}")
+            pool_rate = summary["calls_per_sec"]
+        verdict = "meets" if pool_rate and pool_rate >= args.target else "below"
+        print(f"pool throughput {pool_rate:.0f} calls/s {verdict} target {args.target:.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
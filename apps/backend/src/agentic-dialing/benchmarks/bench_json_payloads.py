@@ -0,0 +1,89 @@
+"""Benchmark JSON rendering and bytes-on-wire for lead/campaign API payloads.
+
+Compares Starlette's default JSONResponse rendering (stdlib json) with
+fast_json.dumps, and identity vs gzip vs brotli body sizes.
+
+Usage: python benchmarks/bench_json_payloads.py [--rows 5000] [--repeat 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import fast_json  # noqa: E402
+
+FIRST = ["David", "Daniel", "Priya", "Maria", "Chen", "Aisha", "Lucas", "Emma", "Ravi", "Sofia"]
+LAST = ["Miller", "Taylor", "Sharma", "Garcia", "Wang", "Khan", "Silva", "Brown", "Iyer", "Rossi"]
+TITLES = ["CFO", "CTO", "VP Finance", "Head of IT", "Director of Operations", "Controller"]
+COMPANIES = ["CyberNova", "BrightPath", "DataCore", "FutureSoft", "Northwind", "BluePeak"]
+TIMEZONES = ["Asia/Kolkata", "Australia/Sydney", "America/New_York", "Europe/London"]
+
+
+def make_leads(n: int, seed: int = 7) -> list[dict]:
+    rnd = random.Random(seed)
+    leads = []
+    for _ in range(n):
+        first, last = rnd.choice(FIRST), rnd.choice(LAST)
+        company = rnd.choice(COMPANIES)
+        leads.append({
+            "prospect_name": f"{first} {last}",
+            "company_name": company,
+            "job_title": rnd.choice(TITLES),
+            "phone": f"91{rnd.randrange(10**9, 10**10)}",
+            "email": f"{first.lower()}.{last.lower()}@{company.lower()}.com",
+            "timezone": rnd.choice(TIMEZONES),
+        })
+    return leads
+
+
+def stdlib_render(content) -> bytes:
+    # Mirrors starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def timeit(fn, payload, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="rows in the large lead page / preview")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    leads = make_leads(args.rows)
+    payloads = {
+        "/api/leads (page of 8)": {"ok": True, "leads": leads[:8], "page": 1, "total_pages": args.rows // 8, "start_index": 0, "total_leads": args.rows},
+        f"/api/leads (page of {args.rows})": {"ok": True, "leads": leads, "page": 1, "total_pages": 1, "start_index": 0, "total_leads": args.rows},
+        f"/api/csv/preview ({args.rows} rows)": {"ok": True, "headers": list(leads[0].keys()), "rows": leads},
+        "/api/campaigns (200)": {"ok": True, "campaigns": [{"key": f"Campaign {i} (campaign-{i})", "label": f"Campaign {i}"} for i in range(200)]},
+    }
+
+    print(f"serialiser: {'orjson' if fast_json.orjson is not None else 'stdlib (orjson not installed)'}; "
+          f"brotli: {'yes' if fast_json.brotli is not None else 'no'}")
+    header = f"{'payload':34} {'stdlib ms':>10} {'fast ms':>9} {'speedup':>8} {'raw B':>10} {'gzip B':>9} {'br B':>9} {'saved':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, payload in payloads.items():
+        t_std = timeit(stdlib_render, payload, args.repeat)
+        t_fast = timeit(fast_json.dumps, payload, args.repeat)
+        raw = fast_json.dumps(payload)
+        gz = len(fast_json.compress_body(raw, "gzip"))
+        br = len(fast_json.compress_body(raw, "br")) if fast_json.brotli is not None else 0
+        best = min(x for x in (gz, br) if x) if len(raw) >= fast_json.COMPRESSION_MIN_BYTES else len(raw)
+        print(f"{name:34} {t_std * 1e3:10.3f} {t_fast * 1e3:9.3f} {t_std / t_fast:7.1f}x "
+              f"{len(raw):10d} {gz:9d} {br or '-':>9} {1 - best / len(raw):6.0%}")
+
+
+if __name__ == "__main__":
+    main()
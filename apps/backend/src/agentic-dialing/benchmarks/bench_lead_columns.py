@@ -0,0 +1,120 @@
+"""Benchmark the memory-mapped columnar lead store against parsed lead dicts.
+
+Generates a synthetic leads CSV and compares, for the dict path (csv.DictReader
+into List[Dict]) and the columnar path (lead_columns.LeadColumns):
+load time, Python heap retained after loading (tracemalloc), random row access,
+and LeadStore index build time. The one-off columnar conversion is timed too.
+
+Usage: python benchmarks/bench_lead_columns.py [--rows 1000000] [--access 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import lead_columns  # noqa: E402
+from lead_store import LeadStore  # noqa: E402
+
+FIRST = ["David", "Daniel", "Priya", "Maria", "Chen", "Aisha", "Lucas", "Emma", "Ravi", "Sofia"]
+LAST = ["Miller", "Taylor", "Sharma", "Garcia", "Wang", "Khan", "Silva", "Brown", "Iyer", "Rossi"]
+TITLES = ["CFO", "CTO", "VP Finance", "Head of IT", "Director of Operations", "Controller"]
+COMPANIES = ["CyberNova", "BrightPath", "DataCore", "FutureSoft", "Northwind", "BluePeak"]
+TIMEZONES = ["Asia/Kolkata", "Australia/Sydney", "America/New_York", "Europe/London"]
+
+
+def write_csv(path: Path, n: int, seed: int = 7) -> None:
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["prospect_name", "company_name", "job_title", "phone", "email", "timezone", "resource_name"])
+        for _ in range(n):
+            first, last = rnd.choice(FIRST), rnd.choice(LAST)
+            company = rnd.choice(COMPANIES)
+            w.writerow([
+                f"{first} {last}", company, rnd.choice(TITLES), f"91{rnd.randrange(10**9, 10**10)}",
+                f"{first.lower()}.{last.lower()}@{company.lower()}.com", rnd.choice(TIMEZONES), "Alex",
+            ])
+
+
+def parse_dicts(path: Path) -> list:
+    # Same shape as the web app's dict loader
+    leads = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            leads.append({k: (row.get(k) or "").strip() for k in lead_columns.LEAD_FIELDS})
+    return leads
+
+
+def measure_load(fn):
+    """(result, seconds, bytes retained); timed without tracemalloc, which slows allocation down."""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def time_access(leads, picks) -> float:
+    start = time.perf_counter()
+    for i in picks:
+        leads[i].get("phone")
+    return (time.perf_counter() - start) / len(picks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--access", type=int, default=10_000, help="random row lookups to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "leads.csv"
+        write_csv(path, args.rows)
+        picks = [random.randrange(args.rows) for _ in range(args.access)]
+
+        dicts, t_dicts, mem_dicts = measure_load(lambda: parse_dicts(path))
+        a_dicts = time_access(dicts, picks)
+        start = time.perf_counter()
+        LeadStore(str(path), dicts, (0, 0))
+        s_dicts = time.perf_counter() - start
+        del dicts
+        gc.collect()
+
+        start = time.perf_counter()
+        out = lead_columns.build_columns(path)
+        t_build = time.perf_counter() - start
+
+        cols, t_cols, mem_cols = measure_load(lambda: lead_columns.LeadColumns(out))
+        a_cols = time_access(cols, picks)
+        start = time.perf_counter()
+        LeadStore(str(path), cols, (0, 0))
+        s_cols = time.perf_counter() - start
+
+        print(f"rows: {args.rows:,}; CSV {path.stat().st_size / 2**20:.1f} MiB; "
+              f"columns file {out.stat().st_size / 2**20:.1f} MiB (mapped, shared via page cache)")
+        print(f"one-off conversion: {t_build:.2f} s")
+        header = f"{'path':10} {'load s':>9} {'heap MiB':>10} {'row access us':>14} {'LeadStore s':>12}"
+        print(header)
+        print("-" * len(header))
+        print(f"{'dicts':10} {t_dicts:9.3f} {mem_dicts / 2**20:10.1f} {a_dicts * 1e6:14.2f} {s_dicts:12.2f}")
+        print(f"{'columns':10} {t_cols:9.4f} {mem_cols / 2**20:10.3f} {a_cols * 1e6:14.2f} {s_cols:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
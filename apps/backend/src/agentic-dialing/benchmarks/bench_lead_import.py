@@ -0,0 +1,87 @@
+"""Benchmark parallel chunked lead CSV import against the sequential parser.
+
+Generates a synthetic leads CSV (with a BOM, a duplicated header column and
+some multi-line quoted notes, so chunk boundaries fall inside quoted fields)
+and builds its columnar file (``lead_columns.build_columns``) sequentially and
+with ``lead_import.parse_columns`` for each ``--workers`` count, checking that
+every build is byte-identical to the sequential one. Reports MB/s and speedup;
+speedup is bounded by the cores available (printed).
+
+Usage: python benchmarks/bench_lead_import.py [--rows 2000000] [--workers 2,4,8] [--chunk-mb 32]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import lead_columns  # noqa: E402
+import lead_import  # noqa: E402
+from bench_lead_columns import COMPANIES, FIRST, LAST, TIMEZONES, TITLES  # noqa: E402
+
+NOTES = ["", "", "", "Asked for a callback\nafter 3pm", 'Said "not now", try Q3', "Gatekeeper, ask for\r\nthe CFO"]
+
+
+def write_csv(path: Path, n: int, seed: int = 7) -> None:
+    rnd = random.Random(seed)
+    with open(path, "w", encoding="utf-8-sig", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["prospect_name", "company_name", "job_title", "phone", "email", "timezone", "notes",
+                    "resource_name", "phone"])
+        for _ in range(n):
+            first, last = rnd.choice(FIRST), rnd.choice(LAST)
+            company = rnd.choice(COMPANIES)
+            phone = f"91{rnd.randrange(10**9, 10**10)}"
+            w.writerow([
+                f" {first} {last}", company, rnd.choice(TITLES), "", f"{first.lower()}.{last.lower()}@{company.lower()}.com",
+                rnd.choice(TIMEZONES), rnd.choice(NOTES), "Alex", phone,
+            ])
+
+
+def build(path: Path, parallel: bool, workers: int, chunk_mb: float) -> bytes:
+    """Columnar file built from ``path`` (header included: it records nothing run-specific)."""
+    lead_import.WORKERS = workers
+    lead_import.PARALLEL_MIN_BYTES = 0 if parallel else 1 << 62
+    lead_import.CHUNK_BYTES = int(chunk_mb * 2**20)
+    out = lead_columns.build_columns(path)
+    return out.read_bytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", default="2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--chunk-mb", type=float, default=32.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "leads.csv"
+        write_csv(path, args.rows)
+        mb = path.stat().st_size / 2**20
+        print(f"{args.rows} rows, {mb:.1f} MB; {os.cpu_count()} CPUs; chunks of {args.chunk_mb:g} MB")
+
+        start = time.perf_counter()
+        expected = build(path, False, 1, args.chunk_mb)
+        seq = time.perf_counter() - start
+        print(f"sequential: {seq:.2f}s, {mb / seq:.1f} MB/s")
+
+        # build_columns parses sequentially with fewer than two workers
+        for workers in [int(w) for w in args.workers.split(",") if w.strip() and int(w) > 1]:
+            start = time.perf_counter()
+            got = build(path, True, workers, args.chunk_mb)
+            elapsed = time.perf_counter() - start
+            same = "identical" if got == expected else "DIFFERENT"
+            print(f"parallel x{workers}: {elapsed:.2f}s, {mb / elapsed:.1f} MB/s, "
+                  f"{seq / elapsed:.2f}x; output {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark Lead records from the shared parser against the per-row dicts they replace.
+
+Parses the same synthetic CSV into (a) one dict per row, as app.py and agent.py
+used to, and (b) ``leads.Lead`` records via ``iter_csv_leads``, and reports
+parse time and Python heap per row (tracemalloc).
+
+Usage: python benchmarks/bench_lead_records.py [--rows 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_lead_columns import write_csv  # noqa: E402
+from leads import LEAD_FIELDS, iter_csv_leads  # noqa: E402
+
+
+def parse_dicts(path: Path) -> list:
+    # The removed per-module parsers: a fresh dict with the same keys for every row
+    leads = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            leads.append({k: (row.get(k) or "").strip() for k in LEAD_FIELDS})
+    return leads
+
+
+def parse_records(path: Path) -> list:
+    return list(iter_csv_leads(path))
+
+
+def measure(fn, path: Path):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(path)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = fn(path)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained, len(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "leads.csv"
+        write_csv(path, args.rows)
+        header = f"{'parser':10} {'parse s':>9} {'rows/s':>10} {'heap MiB':>10} {'bytes/row':>10}"
+        print(f"rows: {args.rows:,}")
+        print(header)
+        print("-" * len(header))
+        for name, fn in (("dicts", parse_dicts), ("Lead", parse_records)):
+            elapsed, retained, n = measure(fn, path)
+            print(f"{name:10} {elapsed:9.3f} {n / elapsed:10,.0f} {retained / 2**20:10.1f} {retained / max(1, n):10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Offline post-call analysis: keyword hits and dispositions from transcript journals.
+
+Finished calls (journals under ``.transcripts/`` not written to for
+``ANALYSIS_SETTLE_SECS``) are analysed outside the dialer, in a process pool:
+journals are grouped into batches of ``--batch`` calls per task so the
+per-task pickling cost is amortised, and at most ``2 x workers`` batches are in
+flight at a time so a backlog of thousands of calls never queues up in memory.
+
+Each call yields one ``.transcripts/.analysis/<call>.json`` with its
+disposition and keyword records shaped like the ``transcription_keywords``
+model (keyword, occurrences, first_occurrence_time, category). A call is only
+re-analysed when its journal is newer than its result.
+
+Usage: python call_analysis.py [--workers N] [--batch 64] [--settle 30] [--force]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from transcripts import TRANSCRIPT_DIR
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SETTLE_SECS = float(os.getenv("ANALYSIS_SETTLE_SECS", "30"))
+
+INTERESTED = "interested"
+CALLBACK = "callback"
+WRONG_PERSON = "wrong_person"
+NOT_INTERESTED = "not_interested"
+NO_CONVERSATION = "no_conversation"
+UNDETERMINED = "undetermined"
+
+# -----------------------------
+# Rules (script stages and objections from prompts.py)
+# -----------------------------
+# (keyword, category, speaker or None for both, pattern)
+KEYWORD_RULES: List[Tuple[str, str, Optional[str], str]] = [
+    # CQ1 - current challenges
+    ("reporting challenges", "cq1_challenges", "user", r"\b(reporting|reports?)\b.*\b(slow|manual|hard|pain|challenge|issue|problem)s?\b"),
+    ("no challenges", "cq1_challenges", "user", r"\b(no (real )?challenges|everything'?s (fine|good)|we'?re (fine|good))\b"),
+    ("it dependency", "cq1_challenges", "user", r"\b(depend(ent|ency)? on it|it team|waiting on it)\b"),
+    ("enough resources", "cq1_resources", "user", r"\b(enough|not enough|short on|lack(ing)?) (resources|people|staff|bandwidth)\b"),
+    # CQ2 - decision-making role
+    ("decision maker", "cq2_role", "user", r"\b(i('m| am) the decision[- ]maker|i (make|sign off on) (the )?decisions?|final say)\b"),
+    ("influencer", "cq2_role", "user", r"\b(influence|recommend|part of the (team|committee)|my (boss|manager|cfo|cio) decides)\b"),
+    # CQ3 - evaluation timeframe
+    ("evaluation timeframe", "cq3_timeframe", "user", r"\b(this|next) (week|month|quarter|year)\b|\b\d+\s*(weeks?|months?)\b|\bq[1-4]\b"),
+    # Email confirmation
+    ("email confirmed", "email", "user", r"\b(that'?s (right|correct)|yes,? that'?s (it|me|my email)|correct email)\b"),
+    ("email corrected", "email", "user", r"\b(actually|no),? (it'?s|my email is)\b|[\w.+-]+@[\w-]+\.[\w.]+"),
+    # Objections
+    ("budget", "objection", "user", r"\b(no budget|don'?t have (the )?budget|not in (the )?budget|budget cycle)\b"),
+    ("too busy", "objection", "user", r"\b(too busy|in the middle of something|bad time|in a meeting)\b"),
+    ("already have a solution", "objection", "user", r"\b(already have (something|a (tool|solution))|not sure we need it|don'?t need it)\b"),
+    ("another sales call", "objection", "user", r"\b(another sales call|sales call|stop calling)\b"),
+    ("how did you get my number", "objection", "user", r"\bhow did you get (my|this) (number|contact)\b"),
+    # Interest / follow-up
+    ("tell me more", "interest", "user", r"\b(tell me more|sounds (interesting|good)|i'?m interested|send (it|me))\b"),
+    ("follow-up agreed", "follow_up", "agent", r"\b(you'?ll hear from our team|have them (follow up|reach out))\b"),
+]
+
+# "We use Tableau" -> competitor keyword "tableau"
+_COMPETITOR = re.compile(r"\bwe (?:already |currently )?use ([A-Za-z][\w.&-]{1,40})", re.IGNORECASE)
+_COMPETITOR_SKIP = frozenset({"a", "an", "the", "it", "that", "this", "some", "something", "excel", "oracle"})
+
+# Checked in this order: the first that matches decides the call
+DISPOSITION_RULES: List[Tuple[str, str]] = [
+    (WRONG_PERSON, r"\b(wrong (number|person)|no longer (work|with)|doesn'?t work here|not the right person|left the company)\b"),
+    (CALLBACK, r"\b(call (me )?(back|later)|try (me )?(again|later)|(tomorrow|next week|later today)|in an hour)\b"),
+    (NOT_INTERESTED, r"\b(not interested|no thanks|don'?t call|remove me|take me off)\b"),
+]
+
+_KEYWORDS = [(kw, cat, who, re.compile(p, re.IGNORECASE)) for kw, cat, who, p in KEYWORD_RULES]
+# Rules that apply to each speaker, so a segment only runs its own
+_KEYWORDS_FOR = {
+    speaker: [(kw, cat, rx) for kw, cat, who, rx in _KEYWORDS if who in (None, speaker)]
+    for speaker in ("user", "agent")
+}
+_KEYWORDS_ANY = [(kw, cat, rx) for kw, cat, _, rx in _KEYWORDS]
+_DISPOSITIONS = [(name, re.compile(p, re.IGNORECASE)) for name, p in DISPOSITION_RULES]
+
+
+def analysis_dir(journal_dir: Path = TRANSCRIPT_DIR) -> Path:
+    return journal_dir / ".analysis"
+
+
+def _read_segments(path: Path) -> List[Dict[str, Any]]:
+    segments = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                seg = json.loads(line)
+            except ValueError:
+                continue  # torn final line of a crashed writer
+            if seg.get("is_final", True) and seg.get("text"):
+                segments.append(seg)
+    return segments
+
+
+def analyse_segments(call_id: str, segments: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Disposition and ``transcription_keywords``-shaped records for one call."""
+    hits: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def hit(keyword: str, category: str, at: Optional[float]) -> None:
+        rec = hits.get((keyword, category))
+        if rec is None:
+            hits[(keyword, category)] = {
+                "call_id": call_id,
+                "keyword": keyword,
+                "occurrences": 1,
+                "first_occurrence_time": at,
+                "category": category,
+            }
+        else:
+            rec["occurrences"] += 1
+
+    user_turns = 0
+    disposition_at: Dict[str, float] = {}
+    for seg in segments:
+        text = seg.get("text") or ""
+        speaker = seg.get("speaker")
+        at = seg.get("start")
+        for keyword, category, rx in _KEYWORDS_FOR.get(speaker, _KEYWORDS_ANY):
+            for _ in rx.findall(text):
+                hit(keyword, category, at)
+        if speaker != "user":
+            continue
+        user_turns += 1
+        for m in _COMPETITOR.finditer(text):
+            name = m.group(1).strip(".").lower()
+            if name not in _COMPETITOR_SKIP:
+                hit(name, "competitor", at)
+        for name, rx in _DISPOSITIONS:
+            if name not in disposition_at and rx.search(text):
+                disposition_at[name] = at if at is not None else 0.0
+
+    categories = {cat for _, cat in hits}
+    if not user_turns:
+        disposition = NO_CONVERSATION
+    elif WRONG_PERSON in disposition_at:
+        disposition = WRONG_PERSON
+    elif "follow_up" in categories or "email confirmed" in {kw for kw, _ in hits}:
+        disposition = INTERESTED
+    elif CALLBACK in disposition_at:
+        disposition = CALLBACK
+    elif NOT_INTERESTED in disposition_at:
+        disposition = NOT_INTERESTED
+    elif "interest" in categories:
+        disposition = INTERESTED
+    else:
+        disposition = UNDETERMINED
+
+    return {
+        "call_id": call_id,
+        "disposition": disposition,
+        "user_turns": user_turns,
+        "keywords": sorted(hits.values(), key=lambda r: (r["first_occurrence_time"] or 0.0, r["keyword"])),
+        "analysed_at": time.time(),
+    }
+
+
+def _write_result(out: Path, result: Dict[str, Any]) -> None:
+    tmp = out.with_name(f".{out.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, out)
+
+
+def analyse_batch(journals: List[str], out_dir: str) -> Dict[str, int]:
+    """Pool task: analyse a batch of journals and write their results; returns disposition counts."""
+    counts: Dict[str, int] = {}
+    out_root = Path(out_dir)
+    for journal in journals:
+        path = Path(journal)
+        try:
+            segments = _read_segments(path)
+            call_id = segments[0].get("call", path.stem) if segments else path.stem
+            result = analyse_segments(str(call_id), segments)
+            _write_result(out_root / f"{path.stem}.json", result)
+        except OSError:
+            counts["error"] = counts.get("error", 0) + 1
+            continue
+        counts[result["disposition"]] = counts.get(result["disposition"], 0) + 1
+    return counts
+
+
+def pending_journals(journal_dir: Path = TRANSCRIPT_DIR, settle: float = ANALYSIS_SETTLE_SECS,
+                     force: bool = False) -> Iterator[Path]:
+    """Journals of finished calls that have no up-to-date analysis."""
+    out_dir = analysis_dir(journal_dir)
+    cutoff = time.time() - settle
+    try:
+        entries = list(os.scandir(journal_dir))
+    except OSError:
+        return
+    for entry in entries:
+        if not entry.name.endswith(".jsonl") or not entry.is_file():
+            continue
+        mtime = entry.stat().st_mtime
+        if mtime > cutoff:
+            continue  # call may still be live
+        if not force:
+            try:
+                if os.stat(out_dir / f"{entry.name[:-6]}.json").st_mtime >= mtime:
+                    continue
+            except OSError:
+                pass
+        yield Path(entry.path)
+
+
+def _batches(items: Iterable[Path], size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for item in items:
+        batch.append(str(item))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_analysis(journals: Iterable[Path], out_dir: Path, workers: Optional[int] = None,
+                 batch_size: int = 64) -> Dict[str, Any]:
+    """Analyse ``journals`` in a process pool with bounded in-flight batches; returns a summary."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    totals: Dict[str, int] = {}
+    calls = 0
+    start = time.perf_counter()
+
+    def collect(done) -> None:
+        nonlocal calls
+        for fut in done:
+            for name, n in fut.result().items():
+                totals[name] = totals.get(name, 0) + n
+                calls += n
+
+    if workers <= 1:
+        for batch in _batches(journals, batch_size):
+            for name, n in analyse_batch(batch, str(out_dir)).items():
+                totals[name] = totals.get(name, 0) + n
+                calls += n
+    else:
+        max_in_flight = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            for batch in _batches(journals, batch_size):
+                if len(in_flight) >= max_in_flight:
+                    # Backpressure: wait for a batch to finish before reading more of the backlog
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(pool.submit(analyse_batch, batch, str(out_dir)))
+            collect(in_flight)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "calls": calls,
+        "dispositions": totals,
+        "seconds": round(elapsed, 3),
+        "calls_per_sec": round(calls / elapsed, 1) if elapsed > 0 else None,
+        "workers": workers,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyse finished call transcripts")
+    parser.add_argument("--dir", default=str(TRANSCRIPT_DIR), help="transcript journal directory")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--batch", type=int, default=64, help="calls per pool task")
+    parser.add_argument("--settle", type=float, default=ANALYSIS_SETTLE_SECS,
+                        help="seconds a journal must be idle before its call counts as finished")
+    parser.add_argument("--force", action="store_true", help="re-analyse calls with existing results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    journal_dir = Path(args.dir)
+    summary = run_analysis(
+        pending_journals(journal_dir, settle=args.settle, force=args.force),
+        analysis_dir(journal_dir),
+        workers=args.workers,
+        batch_size=args.batch,
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
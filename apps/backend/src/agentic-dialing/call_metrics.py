@@ -0,0 +1,212 @@
+"""CPU and memory accounting for agent call processes.
+
+The call supervisor samples each call's process tree (the ``agent.py`` child
+and its descendants) every ``CALL_METRICS_INTERVAL`` seconds: CPU time, RSS and
+open file descriptors, summed over the tree. ``CallUsage`` turns the samples
+into per-call figures (CPU seconds, average/peak cores, average/peak RSS and
+fds), and ``add_to_totals`` / ``describe_totals`` aggregate finished calls into
+cores per call, which is what host sizing needs (calls per core = 1 / average
+cores per call).
+
+Uses psutil when installed; otherwise reads ``/proc`` (Linux). Elsewhere
+without psutil nothing is sampled.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import psutil  # type: ignore
+except Exception:  # optional: /proc is read directly without it
+    psutil = None
+
+CALL_METRICS_INTERVAL = float(os.getenv("CALL_METRICS_INTERVAL", "2"))
+
+_PROC = "/proc"
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _proc_available() -> bool:
+    return os.path.isdir(f"{_PROC}/self")
+
+
+def _tree_psutil(pid: int) -> Dict[int, Tuple[float, int, int]]:
+    """{pid: (cpu seconds, rss bytes, open fds)} for ``pid`` and its descendants."""
+    out: Dict[int, Tuple[float, int, int]] = {}
+    try:
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return out
+    for p in procs:
+        try:
+            with p.oneshot():
+                t = p.cpu_times()
+                rss = p.memory_info().rss
+                fds = p.num_fds() if hasattr(p, "num_fds") else p.num_handles()
+            out[p.pid] = (t.user + t.system, rss, fds)
+        except psutil.Error:
+            continue
+    return out
+
+
+def _read_stat(pid: int) -> Optional[Tuple[int, float, int]]:
+    """(ppid, own cpu seconds, rss bytes) from /proc/<pid>/stat."""
+    try:
+        with open(f"{_PROC}/{pid}/stat", "rb") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses; fields follow the last ')'
+    fields = raw[raw.rfind(b")") + 2:].split()
+    ppid = int(fields[1])
+    utime, stime = int(fields[11]), int(fields[12])
+    rss_pages = int(fields[21])
+    return ppid, (utime + stime) / _CLK_TCK, rss_pages * _PAGE
+
+
+def _count_fds(pid: int) -> int:
+    try:
+        return len(os.listdir(f"{_PROC}/{pid}/fd"))
+    except OSError:
+        return 0
+
+
+def _tree_proc(pid: int) -> Dict[int, Tuple[float, int, int]]:
+    stats: Dict[int, Tuple[int, float, int]] = {}
+    for name in os.listdir(_PROC):
+        if name.isdigit():
+            st = _read_stat(int(name))
+            if st is not None:
+                stats[int(name)] = st
+    if pid not in stats:
+        return {}
+    children: Dict[int, List[int]] = {}
+    for p, (ppid, _, _) in stats.items():
+        children.setdefault(ppid, []).append(p)
+    out: Dict[int, Tuple[float, int, int]] = {}
+    todo = [pid]
+    while todo:
+        p = todo.pop()
+        _, cpu, rss = stats[p]
+        out[p] = (cpu, rss, _count_fds(p))
+        todo.extend(children.get(p, ()))
+    return out
+
+
+def sample_tree(pid: int) -> Dict[int, Tuple[float, int, int]]:
+    if psutil is not None:
+        return _tree_psutil(pid)
+    if _proc_available():
+        return _tree_proc(pid)
+    return {}
+
+
+class CallUsage:
+    """Running resource figures for one call's process tree."""
+
+    def __init__(self, pid: int, interval: float = CALL_METRICS_INTERVAL, exclude_prior: bool = False) -> None:
+        """``exclude_prior``: the tree already ran before the call (a pre-staged agent); its CPU
+        time at the first sample is not counted."""
+        self.pid = pid
+        self.exclude_prior = exclude_prior
+        self.interval = interval
+        self.started = time.time()
+        self.samples = 0
+        self.processes = 0
+        self._next = 0.0
+        # Highest CPU time seen per pid, and what it had used before the call
+        self._cpu_seen: Dict[int, float] = {}
+        self._cpu_base: Dict[int, float] = {}
+        self._last: Optional[Tuple[float, float]] = None  # (wall, cpu) of the previous sample
+        self.cpu_seconds = 0.0
+        self.peak_cores = 0.0
+        self.rss_sum = 0
+        self.rss_peak = 0
+        self.fds_sum = 0
+        self.fds_peak = 0
+
+    def sample(self, now: Optional[float] = None) -> bool:
+        """Take a sample if one is due; returns False once the tree has gone."""
+        now = now or time.time()
+        if now < self._next:
+            return True
+        self._next = now + self.interval
+        tree = sample_tree(self.pid)
+        if not tree:
+            return False
+        rss = fds = 0
+        for p, (cpu, p_rss, p_fds) in tree.items():
+            if p not in self._cpu_base:
+                self._cpu_base[p] = cpu if self.exclude_prior and self.samples == 0 else 0.0
+            self._cpu_seen[p] = max(self._cpu_seen.get(p, 0.0), cpu)
+            rss += p_rss
+            fds += p_fds
+        # Own CPU time only (reaped children would be counted twice); exited descendants keep their last figure
+        self.cpu_seconds = sum(max(0.0, c - self._cpu_base.get(p, 0.0)) for p, c in self._cpu_seen.items())
+        if self._last is not None and now > self._last[0]:
+            self.peak_cores = max(self.peak_cores, (self.cpu_seconds - self._last[1]) / (now - self._last[0]))
+        self._last = (now, self.cpu_seconds)
+        self.samples += 1
+        self.processes = max(self.processes, len(tree))
+        self.rss_sum += rss
+        self.rss_peak = max(self.rss_peak, rss)
+        self.fds_sum += fds
+        self.fds_peak = max(self.fds_peak, fds)
+        return True
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        wall = max((now or time.time()) - self.started, 1e-6)
+        n = max(self.samples, 1)
+        return {
+            "pid": self.pid,
+            "seconds": round(wall, 1),
+            "samples": self.samples,
+            "processes": self.processes,
+            "cpu_seconds": round(self.cpu_seconds, 2),
+            "avg_cores": round(self.cpu_seconds / wall, 3),
+            "peak_cores": round(self.peak_cores, 3),
+            "avg_rss_mb": round(self.rss_sum / n / 2**20, 1),
+            "peak_rss_mb": round(self.rss_peak / 2**20, 1),
+            "avg_fds": round(self.fds_sum / n, 1),
+            "peak_fds": self.fds_peak,
+        }
+
+
+def add_to_totals(totals: Optional[Dict[str, Any]], call: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one finished call's summary into the running totals (a JSON-friendly dict)."""
+    t = dict(totals or {})
+    if not call.get("samples"):
+        return t
+    t["calls"] = t.get("calls", 0) + 1
+    t["call_seconds"] = round(t.get("call_seconds", 0.0) + call["seconds"], 1)
+    t["cpu_seconds"] = round(t.get("cpu_seconds", 0.0) + call["cpu_seconds"], 2)
+    t["rss_mb_sum"] = round(t.get("rss_mb_sum", 0.0) + call["avg_rss_mb"], 1)
+    t["peak_rss_mb"] = max(t.get("peak_rss_mb", 0.0), call["peak_rss_mb"])
+    t["peak_cores"] = max(t.get("peak_cores", 0.0), call["peak_cores"])
+    t["peak_fds"] = max(t.get("peak_fds", 0), call["peak_fds"])
+    return t
+
+
+def describe_totals(totals: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Averages over finished calls, including calls per core for host sizing."""
+    t = totals or {}
+    calls = t.get("calls", 0)
+    if not calls:
+        return {"calls": 0}
+    avg_cores = t["cpu_seconds"] / t["call_seconds"] if t.get("call_seconds") else 0.0
+    return {
+        "calls": calls,
+        "avg_call_seconds": round(t["call_seconds"] / calls, 1),
+        "avg_cpu_seconds": round(t["cpu_seconds"] / calls, 2),
+        "avg_cores_per_call": round(avg_cores, 3),
+        "calls_per_core": round(1 / avg_cores, 1) if avg_cores > 0 else None,
+        "avg_rss_mb": round(t["rss_mb_sum"] / calls, 1),
+        "peak_rss_mb": t["peak_rss_mb"],
+        "peak_cores": t["peak_cores"],
+        "peak_fds": t["peak_fds"],
+    }
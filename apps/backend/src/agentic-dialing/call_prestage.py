@@ -0,0 +1,71 @@
+"""Pre-staged next call for auto-next dialling.
+
+Starting a console call cold means a new interpreter, the LiveKit and plugin
+imports, reading the CSV and loading the campaign prompts, all between the end
+of one call and the start of the next. While a call is live with auto-next on,
+the worker that owns it claims the next lead and starts its agent process
+parked (``agent.py park <handoff>``): everything is imported, the lead is
+resolved and the prompts are rendered, and the process waits for the handoff
+file. When the current call ends the handoff is written and the next call
+starts right away.
+
+A staged call is only used if it still matches what would be dialled (same
+lead list and campaign, process alive); otherwise it is discarded and its lead
+goes back to the queue.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from room_pool import write_handoff
+
+
+class StagedCall:
+    __slots__ = ("handle", "handoff", "lead_index", "source", "campaign", "staged_at")
+
+    def __init__(self, handle: Any, handoff: Path, lead_index: int, source: str, campaign: Optional[str]) -> None:
+        self.handle = handle
+        self.handoff = handoff
+        self.lead_index = lead_index
+        self.source = source
+        self.campaign = campaign
+        self.staged_at = time.time()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return getattr(self.handle, "pid", None)
+
+    def alive(self) -> bool:
+        return self.handle.poll() is None
+
+    def matches(self, source: str, campaign: Optional[str]) -> bool:
+        """True if this is still the call auto-next would start for ``source`` and ``campaign``."""
+        return self.source == source and (self.campaign or None) == (campaign or None) and self.alive()
+
+    def launch(self) -> Any:
+        """Release the parked process into a console call; returns its Popen handle."""
+        write_handoff(self.handoff, {"mode": "console"})
+        return self.handle
+
+    def discard(self) -> None:
+        try:
+            self.handle.terminate()
+        except Exception:
+            pass
+        try:
+            os.unlink(self.handoff)
+        except OSError:
+            pass
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "lead_index": self.lead_index,
+            "source": self.source,
+            "campaign": self.campaign,
+            "pid": self.pid,
+            "staged_at": self.staged_at,
+        }
@@ -0,0 +1,248 @@
+"""Streaming, conditional, atomic downloads of prospect CSVs.
+
+Remote CSVs (served by the Node backend) can be hundreds of megabytes, so they
+are streamed to a temporary file next to the destination while their SHA-256 is
+computed, then renamed over it in one step: readers see either the old file or
+the complete new one, never a partial write.
+
+Validators from the last download (ETag, Last-Modified, content hash) are kept
+in a hidden ``.<name>.meta.json`` sidecar. Revalidation sends them as
+``If-None-Match``/``If-Modified-Since``; a 304, or a 200 whose body hashes to
+what is already on disk, leaves the local file (and its mtime, which keys the
+lead store caches) untouched.
+
+Both fetchers take an optional ``backend_client.CircuitBreaker``: while it is
+open the cached copy is returned without a request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+_TIMEOUT = httpx.Timeout(20.0, connect=5.0, read=60.0)
+
+_sync_locks: Dict[str, threading.Lock] = {}
+_async_locks: Dict[str, asyncio.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _meta_path(dest: Path) -> Path:
+    return dest.with_name(f".{dest.name}.meta.json")
+
+
+def read_meta(dest: Path) -> Dict[str, Any]:
+    """Validators of the last download, or {} when they no longer describe the file on disk."""
+    try:
+        meta = json.loads(_meta_path(dest).read_text(encoding="utf-8"))
+        st = dest.stat()
+    except (OSError, ValueError):
+        return {}
+    # Replaced locally (upload) since it was downloaded: the validators are stale
+    if not isinstance(meta, dict) or meta.get("size") != st.st_size or meta.get("mtime_ns") != st.st_mtime_ns:
+        return {}
+    return meta
+
+
+def _write_meta(dest: Path, meta: Dict[str, Any]) -> None:
+    st = dest.stat()
+    meta = {**meta, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "fetched": time.time()}
+    path = _meta_path(dest)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _conditional_headers(meta: Dict[str, Any]) -> Dict[str, str]:
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+class _Partial:
+    """Temporary file beside ``dest``, hashed while written and renamed over ``dest`` when complete."""
+
+    def __init__(self, dest: Path) -> None:
+        self.dest = dest
+        self.tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:8]}.part")
+        self.fh = open(self.tmp, "wb")
+        self.sha = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.fh.write(chunk)
+        self.sha.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, previous: Dict[str, Any], response: httpx.Response) -> bool:
+        """Install the new file; returns False when its content equals what is already on disk."""
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        self.fh.close()
+        digest = self.sha.hexdigest()
+        meta = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "sha256": digest,
+        }
+        if previous.get("sha256") == digest and self.dest.exists():
+            os.unlink(self.tmp)
+            _write_meta(self.dest, meta)
+            return False
+        os.replace(self.tmp, self.dest)
+        _write_meta(self.dest, meta)
+        return True
+
+    def abort(self) -> None:
+        try:
+            self.fh.close()
+        except OSError:
+            pass
+        try:
+            os.unlink(self.tmp)
+        except OSError:
+            pass
+
+
+def write_csv_atomic(dest: Path, content: bytes) -> None:
+    """Replace ``dest`` in one step (for uploads); drops download validators that no longer apply.
+
+    Re-uploading identical content leaves the file (and its mtime, which keys the
+    lead caches and the lead queue source) untouched.
+    """
+    try:
+        if dest.stat().st_size == len(content) and dest.read_bytes() == content:
+            return
+    except OSError:
+        pass
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex[:8]}.part")
+    with open(tmp, "wb") as fh:
+        fh.write(content)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, dest)
+    try:
+        os.unlink(_meta_path(dest))
+    except OSError:
+        pass
+
+
+def _lock_for(dest: Path, table: Dict[str, Any], factory) -> Any:
+    with _locks_guard:
+        lock = table.get(str(dest))
+        if lock is None:
+            lock = table[str(dest)] = factory()
+        return lock
+
+
+def _record(breaker: Any, response: httpx.Response) -> bool:
+    if breaker is None:
+        return False
+    if response.status_code >= 500:
+        breaker.record_failure(f"HTTP {response.status_code}")
+    else:
+        breaker.record_success()
+    return True
+
+
+def fetch_csv(url: str, dest: Path, force: bool = False, breaker: Any = None) -> Optional[Path]:
+    """Download ``url`` to ``dest`` unless it is cached; ``force`` revalidates the cached copy.
+
+    Returns ``dest`` when a usable local copy exists afterwards (a failed refresh keeps the old one).
+    """
+    if dest.exists() and not force:
+        return dest
+    if breaker is not None and not breaker.allow():
+        return dest if dest.exists() else None
+    recorded = False
+    try:
+        with _lock_for(dest, _sync_locks, threading.Lock):
+            meta = read_meta(dest) if dest.exists() else {}
+            try:
+                with httpx.Client(timeout=_TIMEOUT, follow_redirects=True) as client:
+                    with client.stream("GET", url, headers=_conditional_headers(meta)) as r:
+                        recorded = _record(breaker, r)
+                        if r.status_code == 304:
+                            return dest
+                        if r.status_code != 200:
+                            logger.warning("CSV download %s returned %s", url, r.status_code)
+                        else:
+                            partial = _Partial(dest)
+                            try:
+                                for chunk in r.iter_bytes(CHUNK_SIZE):
+                                    partial.write(chunk)
+                                if partial.size:
+                                    partial.commit(meta, r)
+                                else:
+                                    partial.abort()
+                            except BaseException:
+                                partial.abort()
+                                raise
+            except Exception as exc:
+                if breaker is not None and isinstance(exc, httpx.TransportError):
+                    breaker.record_failure(f"{type(exc).__name__}: {exc}")
+                    recorded = True
+                logger.exception("Failed to download CSV from %s", url)
+    finally:
+        if breaker is not None and not recorded:
+            # Cancelled or failed locally: free a half-open trial without judging the backend
+            breaker.release()
+    return dest if dest.exists() else None
+
+
+async def fetch_csv_async(url: str, dest: Path, force: bool = False, breaker: Any = None) -> Optional[Path]:
+    """``fetch_csv`` for request handlers: streams without blocking the event loop."""
+    if dest.exists() and not force:
+        return dest
+    if breaker is not None and not breaker.allow():
+        return dest if dest.exists() else None
+    recorded = False
+    try:
+        async with _lock_for(dest, _async_locks, asyncio.Lock):
+            meta = await asyncio.to_thread(read_meta, dest) if dest.exists() else {}
+            try:
+                async with httpx.AsyncClient(timeout=_TIMEOUT, follow_redirects=True) as client:
+                    async with client.stream("GET", url, headers=_conditional_headers(meta)) as r:
+                        recorded = _record(breaker, r)
+                        if r.status_code == 304:
+                            return dest
+                        if r.status_code != 200:
+                            logger.warning("CSV download %s returned %s", url, r.status_code)
+                        else:
+                            partial = await asyncio.to_thread(_Partial, dest)
+                            try:
+                                async for chunk in r.aiter_bytes(CHUNK_SIZE):
+                                    await asyncio.to_thread(partial.write, chunk)
+                                if partial.size:
+                                    await asyncio.to_thread(partial.commit, meta, r)
+                                else:
+                                    partial.abort()
+                            except BaseException:
+                                partial.abort()
+                                raise
+            except Exception as exc:
+                if breaker is not None and isinstance(exc, httpx.TransportError):
+                    breaker.record_failure(f"{type(exc).__name__}: {exc}")
+                    recorded = True
+                logger.exception("Failed to download CSV from %s", url)
+    finally:
+        if breaker is not None and not recorded:
+            # Cancelled or failed locally: free a half-open trial without judging the backend
+            breaker.release()
+    return dest if dest.exists() else None
@@ -0,0 +1,281 @@
+"""Shared dialer state so several web workers (or hosts) act as one dialer.
+
+The web app used to keep the selected CSV, campaign, auto-next flag and the
+running call in module globals, which only works with a single uvicorn worker.
+``DialState`` exposes the same values as attributes backed by a
+``DialStateBackend``:
+
+  - ``SQLiteDialStateBackend`` (default): a WAL-mode SQLite file shared by all
+    workers on a host (or on a shared volume);
+  - ``MemoryDialStateBackend``: process-local, for single-worker/dev runs;
+  - anything else: implement ``DialStateBackend`` (e.g. on Redis) and register
+    it with ``register_backend(scheme, factory)``.
+
+Leases (owner + expiry) provide mutual exclusion across processes: the running
+call slot and the elected auto-next watcher are both leases.
+
+Configure with ``DIAL_STATE_URL``: ``sqlite:///path/to/state.sqlite3`` or ``memory://``.
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+_MISSING = object()
+
+
+class DialStateBackend(abc.ABC):
+    """Key/value + lease interface every state store must provide. Values are JSON-serialisable."""
+
+    @abc.abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store ``value``; ``None`` deletes the key."""
+        ...
+
+    @abc.abstractmethod
+    def setdefault(self, key: str, value: Any) -> Any:
+        """Store ``value`` only if ``key`` is absent; returns the stored value."""
+        ...
+
+    @abc.abstractmethod
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        """Atomically replace ``expected`` (None = absent) with ``value``."""
+        ...
+
+    @abc.abstractmethod
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Take or renew lease ``name`` for ``ttl`` seconds; False if another owner holds it."""
+        ...
+
+    @abc.abstractmethod
+    def release_lease(self, name: str, owner: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def lease_holder(self, name: str) -> Optional[str]:
+        """Current unexpired owner of ``name``, if any."""
+        ...
+
+
+class MemoryDialStateBackend(DialStateBackend):
+    def __init__(self) -> None:
+        self._data: Dict[str, str] = {}
+        self._leases: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self._data.get(key)
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            if value is None:
+                self._data.pop(key, None)
+            else:
+                self._data[key] = json.dumps(value)
+
+    def setdefault(self, key: str, value: Any) -> Any:
+        with self._lock:
+            if key not in self._data and value is not None:
+                self._data[key] = json.dumps(value)
+        return self.get(key)
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        with self._lock:
+            raw = self._data.get(key)
+            current = None if raw is None else json.loads(raw)
+            if current != expected:
+                return False
+            if value is None:
+                self._data.pop(key, None)
+            else:
+                self._data[key] = json.dumps(value)
+            return True
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder and holder[0] != owner and holder[1] > now:
+                return False
+            self._leases[name] = (owner, now + ttl)
+            return True
+
+    def release_lease(self, name: str, owner: str) -> None:
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder and holder[0] == owner:
+                del self._leases[name]
+
+    def lease_holder(self, name: str) -> Optional[str]:
+        holder = self._leases.get(name)
+        if holder and holder[1] > time.time():
+            return holder[0]
+        return None
+
+
+class SQLiteDialStateBackend(DialStateBackend):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS dial_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS dial_leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tx(self):
+        return ImmediateTransaction(self._conn())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._conn().execute("SELECT value FROM dial_state WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        conn = self._conn()
+        if value is None:
+            conn.execute("DELETE FROM dial_state WHERE key = ?", (key,))
+        else:
+            conn.execute("INSERT OR REPLACE INTO dial_state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def setdefault(self, key: str, value: Any) -> Any:
+        if value is not None:
+            self._conn().execute("INSERT OR IGNORE INTO dial_state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        return self.get(key)
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        with self._tx() as conn:
+            row = conn.execute("SELECT value FROM dial_state WHERE key = ?", (key,)).fetchone()
+            current = None if row is None else json.loads(row[0])
+            if current != expected:
+                return False
+            if value is None:
+                conn.execute("DELETE FROM dial_state WHERE key = ?", (key,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO dial_state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            return True
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._tx() as conn:
+            row = conn.execute("SELECT owner, expires FROM dial_leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO dial_leases (name, owner, expires) VALUES (?, ?, ?)", (name, owner, now + ttl)
+            )
+            return True
+
+    def release_lease(self, name: str, owner: str) -> None:
+        self._conn().execute("DELETE FROM dial_leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def lease_holder(self, name: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT owner FROM dial_leases WHERE name = ? AND expires > ?", (name, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+
+class ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK so read-modify-write is atomic across processes.
+
+    Shared by the SQLite-backed stores (dial state, lead queue).
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+_BACKENDS: Dict[str, Callable[[str], DialStateBackend]] = {
+    "memory": lambda rest: MemoryDialStateBackend(),
+    # sqlite:///abs/path.sqlite3 or sqlite://relative/path.sqlite3
+    "sqlite": lambda rest: SQLiteDialStateBackend(rest),
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str], DialStateBackend]) -> None:
+    """Register a backend factory for ``scheme://...`` URLs (receives the part after '//')."""
+    _BACKENDS[scheme] = factory
+
+
+def create_backend(url: str) -> DialStateBackend:
+    scheme, sep, rest = (url or "").partition("://")
+    if not sep:
+        # Bare path: treat as a SQLite file
+        return SQLiteDialStateBackend(url)
+    factory = _BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"Unsupported DIAL_STATE_URL scheme '{scheme}'; register a DialStateBackend for it")
+    return factory(rest)
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class DialState:
+    """Attribute-style view of the shared state (``STATE.auto_next = True``)."""
+
+    FIELDS: Dict[str, Any] = {
+        "leads_csv": None,
+        "selected_csv_remote_key": None,
+        "active_lead_set": None,
+        "selected_campaign": None,
+        "auto_next": False,
+        # {"owner", "pid", "lead_index", "status", "started", "stop_requested", "campaign"}
+        "current_call": None,
+        # {"after": lead_index, "campaign", "queued"} queued by the call owner for the elected watcher
+        "pending_next": None,
+        # {"owner", "lead_index", "source", "campaign", "pid", "staged_at"}: next call parked by the call owner
+        "staged_next": None,
+        # call_metrics.CallUsage.summary() of the live (or last) call, plus {"live", "lead_index", "campaign"}
+        "call_usage": None,
+        # call_metrics.add_to_totals() over finished calls
+        "call_usage_totals": None,
+    }
+
+    def __init__(self, backend: DialStateBackend) -> None:
+        object.__setattr__(self, "backend", backend)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self.FIELDS:
+            raise AttributeError(name)
+        return self.backend.get(name, self.FIELDS[name])
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in self.FIELDS:
+            raise AttributeError(name)
+        self.backend.set(name, value)
+
+    def seed(self, name: str, value: Any) -> Any:
+        """Initialise ``name`` unless another worker already did."""
+        return self.backend.setdefault(name, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
@@ -0,0 +1,245 @@
+"""Fast JSON rendering and negotiated response compression for the web API.
+
+``FastJSONResponse`` renders with orjson when it is installed (falling back to a
+compact stdlib encoder, with a warning at import), and ``CompressionMiddleware``
+gzip/brotli-encodes response bodies above a size threshold for clients that
+accept it. ``negotiate_encoding`` is shared with the vendor asset cache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # type: ignore
+except Exception:  # optional: stdlib json is used without it
+    orjson = None
+
+try:
+    import brotli  # type: ignore
+except Exception:  # optional: gzip only without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
+# Content types worth compressing; everything else (images, audio, archives) passes through
+_COMPRESSIBLE_PREFIXES = (
+    "application/json",
+    "application/javascript",
+    "text/",
+    "image/svg+xml",
+)
+
+
+def _default(obj: Any) -> Any:
+    """Serialise the non-JSON types handlers return (lead records, paths, sets)."""
+    as_dict = getattr(obj, "as_dict", None)
+    if callable(as_dict):
+        return as_dict()
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    logger.warning("orjson is not installed; JSON responses use the slower stdlib encoder")
+    _ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    def dumps(content: Any) -> bytes:
+        return _ENCODER.encode(content).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (or compact stdlib json)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Encodings the middleware can produce, preferred first when the client rates them equally
+_SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """The encoding in ``available`` the client rates highest (q-value), or None for identity.
+
+    Ties go to the earlier entry of ``available``; an encoding the header does not name
+    gets the ``*`` rating, and q=0 excludes it.
+    """
+    accepted = _accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Incremental gzip/brotli encoder with a common process/flush/finish interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=brotli_quality)
+            self._process = self._c.process
+            self._flush = self._c.flush
+            self._finish = self._c.finish
+        else:
+            self._c = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._process = self._c.compress
+            self._flush = lambda: self._c.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._c.flush
+
+    def process(self, data: bytes) -> bytes:
+        return self._process(data) if data else b""
+
+    def flush(self) -> bytes:
+        """Everything processed so far, decodable by the client without waiting for more."""
+        return self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    c = _Compressor(encoding, gzip_level, brotli_quality)
+    return c.process(body) + c.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying negotiated gzip/brotli to bodies above ``minimum_size``.
+
+    Responses that already carry a Content-Encoding (e.g. precompressed vendor
+    assets), partial content and non-text media types are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES, gzip_level: int = 6, brotli_quality: int = 5) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers") or []:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept, _SUPPORTED_ENCODINGS)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSend(send, encoding, self)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSend:
+    def __init__(self, send: Callable, encoding: str, mw: CompressionMiddleware) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.mw = mw
+        self.start: Optional[dict] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    def _eligible(self, message: dict) -> bool:
+        if message.get("status", 200) in (204, 206, 304):
+            return False
+        content_type = ""
+        for name, value in message.get("headers") or []:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return content_type.startswith(_COMPRESSIBLE_PREFIXES)
+
+    def _encoded_headers(self, headers: List[Tuple[bytes, bytes]], length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+        out = []
+        vary = None
+        for name, value in headers:
+            if name == b"content-length":
+                continue
+            if name == b"vary":
+                vary = value
+                continue
+            out.append((name, value))
+        out.append((b"content-encoding", self.encoding.encode("latin-1")))
+        out.append((b"vary", (vary + b", Accept-Encoding") if vary else b"Accept-Encoding"))
+        if length is not None:
+            out.append((b"content-length", str(length).encode("latin-1")))
+        return out
+
+    async def __call__(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start = self.start
+        if start is not None:
+            # First body chunk: decide whether to compress
+            self.start = None
+            headers = list(start.get("headers") or [])
+            if not more_body:
+                if len(body) < self.mw.minimum_size:
+                    await self.send(start)
+                    await self.send(message)
+                    self.passthrough = True
+                    return
+                compressed = compress_body(body, self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+                await self.send({**start, "headers": self._encoded_headers(headers, len(compressed))})
+                await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+            self.compressor = _Compressor(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+            await self.send({**start, "headers": self._encoded_headers(headers, None)})
+
+        chunk = self.compressor.process(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        elif body:
+            # Streamed responses (event streams, exports) must reach the client chunk by chunk
+            chunk += self.compressor.flush()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,268 @@
+"""Memory-mapped columnar lead files for large lead lists.
+
+Parsing a CSV into ``List[Dict[str, str]]`` costs several small objects per row:
+a million-row list takes gigabytes and seconds to rebuild in every process that
+needs it (each web worker, each agent child). Instead, a CSV is converted once
+into a ``.<name>.leadcols`` file next to it, with every lead field stored as a
+column: an array of ``rows + 1`` offsets followed by the UTF-8 blob of all
+values. ``LeadColumns`` maps that file read-only, so all processes share the
+same page-cache pages and opening it is O(1); rows are materialised as ``Lead``
+records only when accessed.
+
+Layout (native byte order, recorded in the header)::
+
+    b"LEADCOL1" | u32 header length | JSON header | 8-byte aligned columns
+
+The header holds the row count, the source CSV signature (mtime_ns, size) and,
+per field, the position of its offsets and blob. A file whose signature does
+not match its CSV is stale and is rebuilt. Large CSVs are parsed in parallel
+by ``lead_import``.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import lead_import
+from leads import LEAD_FIELDS, Lead, iter_csv_leads
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LEADCOL1"
+_ALIGN = 8
+
+_OPEN: Dict[str, "LeadColumns"] = {}
+_OPEN_LOCK = threading.Lock()
+_BUILD_LOCK = threading.Lock()
+
+
+def columns_path(csv_path: Union[str, Path]) -> Path:
+    p = Path(csv_path)
+    return p.with_name(f".{p.stem}.leadcols")
+
+
+def _csv_signature(csv_path: Union[str, Path]) -> Optional[List[int]]:
+    try:
+        st = os.stat(csv_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+
+def _parse_sequential(csv_path: Union[str, Path],
+                      fields: Sequence[str]) -> Tuple[int, Dict[str, bytearray], Dict[str, array]]:
+    blobs = {f: bytearray() for f in fields}
+    offsets = {f: array("Q", [0]) for f in fields}
+    rows = 0
+    for lead in iter_csv_leads(csv_path):
+        for f in fields:
+            blob = blobs[f]
+            blob += getattr(lead, f).encode("utf-8")
+            offsets[f].append(len(blob))
+        rows += 1
+    return rows, blobs, offsets
+
+
+def build_columns(csv_path: Union[str, Path], fields: Sequence[str] = LEAD_FIELDS) -> Path:
+    """Convert ``csv_path`` into its columnar file (written atomically) and return its path."""
+    signature = _csv_signature(csv_path)
+    if signature is None:
+        raise FileNotFoundError(str(csv_path))
+    parsed = None
+    if signature[1] >= lead_import.PARALLEL_MIN_BYTES and lead_import.WORKERS > 1:
+        try:
+            parsed = lead_import.parse_columns(csv_path, fields)
+        except lead_import.IrregularCSV as exc:
+            logger.info("Parsing %s sequentially: %s", csv_path, exc)
+        except Exception:
+            # Pool failures (a worker killed, BrokenProcessPool, no processes allowed) must not fail the import
+            logger.exception("Parallel parse of %s failed; parsing sequentially", csv_path)
+    rows, blobs, offsets = parsed or _parse_sequential(csv_path, fields)
+
+    # Narrow offsets to u32 where the column fits (halves the offset arrays)
+    typecodes = {f: ("I" if len(blobs[f]) < 2**32 else "Q") for f in fields}
+    header: Dict[str, object] = {
+        "rows": rows,
+        "source": signature,
+        "byteorder": sys.byteorder,
+        "fields": [],
+    }
+    # Positions depend on the header length, so lay out columns relative to the data start first
+    layout = []
+    pos = 0
+    for f in fields:
+        item = array("I", offsets[f]) if typecodes[f] == "I" else offsets[f]
+        off_bytes = item.tobytes()
+        layout.append((f, typecodes[f], pos, off_bytes, len(blobs[f])))
+        pos += len(off_bytes)
+        pos += _pad(pos)
+        pos += len(blobs[f])
+        pos += _pad(pos)
+
+    def encode_header(base: int) -> bytes:
+        header["fields"] = [
+            [f, tc, base + rel, base + rel + len(ob) + _pad(rel + len(ob)), blen]
+            for f, tc, rel, ob, blen in layout
+        ]
+        return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    # The header's own length feeds back into the positions; iterate until it is stable
+    base = 0
+    raw = encode_header(base)
+    while True:
+        start = len(MAGIC) + 4 + len(raw)
+        new_base = start + _pad(start)
+        if new_base == base:
+            break
+        base = new_base
+        raw = encode_header(base)
+
+    out = columns_path(csv_path)
+    tmp = out.with_name(f"{out.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<I", len(raw)))
+        fh.write(raw)
+        fh.write(b"\0" * (base - fh.tell()))
+        for f, _, _, off_bytes, _ in layout:
+            fh.write(off_bytes)
+            fh.write(b"\0" * _pad(fh.tell()))
+            fh.write(blobs[f])
+            fh.write(b"\0" * _pad(fh.tell()))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, out)
+    return out
+
+
+class LeadColumns(Sequence):
+    """Read-only, memory-mapped lead list; ``leads[i]`` materialises one row as a ``Lead``."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = str(path)
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mm)
+        if bytes(mv[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} is not a lead columns file")
+        (hlen,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        header = json.loads(bytes(mv[len(MAGIC) + 4:len(MAGIC) + 4 + hlen]))
+        if header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{self.path} was written on a {header.get('byteorder')}-endian host")
+        self.rows: int = int(header["rows"])
+        self.source: Tuple[int, int] = tuple(header["source"])  # type: ignore[assignment]
+        self._offsets: Dict[str, memoryview] = {}
+        self._blobs: Dict[str, memoryview] = {}
+        for name, typecode, off_pos, blob_pos, blob_len in header["fields"]:
+            width = 4 if typecode == "I" else 8
+            self._offsets[name] = mv[off_pos:off_pos + width * (self.rows + 1)].cast(typecode)
+            self._blobs[name] = mv[blob_pos:blob_pos + blob_len]
+        self.fields: Tuple[str, ...] = tuple(self._offsets)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def value(self, idx: int, field: str) -> str:
+        offsets = self._offsets.get(field)
+        if offsets is None:
+            return ""
+        return str(self._blobs[field][offsets[idx]:offsets[idx + 1]], "utf-8")
+
+    def column(self, field: str) -> Iterator[str]:
+        """All values of one field in row order, without building row records."""
+        offsets = self._offsets.get(field)
+        if offsets is None:
+            yield from ("" for _ in range(self.rows))
+            return
+        blob = self._blobs[field]
+        start = offsets[0]
+        for i in range(1, self.rows + 1):
+            end = offsets[i]
+            yield str(blob[start:end], "utf-8")
+            start = end
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self.rows))]
+        if idx < 0:
+            idx += self.rows
+        if not 0 <= idx < self.rows:
+            raise IndexError("lead index out of range")
+        return Lead(*(self.value(idx, f) for f in LEAD_FIELDS))
+
+    def __iter__(self) -> Iterator[Lead]:
+        for i in range(self.rows):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+
+def open_columns(csv_path: Union[str, Path], build: bool = True) -> Optional[LeadColumns]:
+    """Columnar view of ``csv_path``: reused while fresh, (re)built from the CSV when ``build``.
+
+    Returns None when the CSV is missing or the file cannot be read or written.
+    """
+    key = str(Path(csv_path).resolve())
+    signature = _csv_signature(key)
+    if signature is None:
+        return None
+    with _OPEN_LOCK:
+        cols = _OPEN.get(key)
+    if cols is not None and list(cols.source) == signature:
+        return cols
+    path = columns_path(key)
+    cols = _try_open(path, signature)
+    if cols is None and build:
+        with _BUILD_LOCK:
+            cols = _try_open(path, signature)
+            if cols is None:
+                try:
+                    build_columns(key)
+                except (OSError, csv.Error, UnicodeDecodeError):
+                    return None
+                cols = _try_open(path, signature)
+    if cols is not None:
+        with _OPEN_LOCK:
+            _OPEN[key] = cols
+    return cols
+
+
+def _try_open(path: Path, signature: List[int]) -> Optional[LeadColumns]:
+    try:
+        cols = LeadColumns(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return cols if list(cols.source) == signature else None
+
+
+def remove_columns(csv_path: Union[str, Path]) -> None:
+    key = str(Path(csv_path).resolve())
+    with _OPEN_LOCK:
+        _OPEN.pop(key, None)
+    try:
+        os.unlink(columns_path(key))
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        out = build_columns(arg)
+        print(f"{arg} -> {out} ({len(LeadColumns(out))} rows, {out.stat().st_size} bytes)")
@@ -0,0 +1,202 @@
+"""Parallel parsing of large lead CSVs into lead columns.
+
+``lead_columns.build_columns`` uses this for files of ``LEAD_IMPORT_PARALLEL_MB``
+or more. The file is cut into ``LEAD_IMPORT_CHUNK_MB`` byte ranges that are
+parsed in a process pool, and the chunk results (per field, a UTF-8 blob plus
+value end offsets) are merged in file order into exactly what the sequential
+parser produces.
+
+A byte range rarely starts on a record boundary, and a newline only ends a
+record outside a quoted field. In RFC 4180 CSV, quotes appear only around
+fields (doubled inside them), so a position is outside quotes exactly when the
+number of ``"`` before it is even. Two passes over the file:
+
+1. each worker counts the quotes in its range; prefix sums give the quote
+   parity at every range start;
+2. each worker moves its range start (and end) forward to the first newline
+   with even parity, then parses the records in between.
+
+Files this rule does not hold for (a bare ``"`` inside an unquoted field, an
+odd quote count, or a chunk that ends inside a quoted field) raise
+``IrregularCSV``, and the caller parses them sequentially.
+
+Workers are started with ``forkserver`` (``spawn`` where that is unavailable),
+never forked from the web worker: a fork would copy its threads' locks and
+open connections mid-use into every child.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import multiprocessing
+import os
+import re
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from leads import LEAD_FIELDS, field_columns
+
+try:
+    import numpy  # type: ignore
+except Exception:  # optional: offsets are rebased in pure Python without it
+    numpy = None
+
+PARALLEL_MIN_BYTES = int(float(os.getenv("LEAD_IMPORT_PARALLEL_MB", "64")) * 2**20)
+CHUNK_BYTES = int(float(os.getenv("LEAD_IMPORT_CHUNK_MB", "32")) * 2**20)
+WORKERS = int(os.getenv("LEAD_IMPORT_WORKERS", "0")) or (os.cpu_count() or 1)
+_READ_BLOCK = 1 << 20
+# A quote with ordinary characters on both sides cannot open, close or escape a quoted field
+_BARE_QUOTE = re.compile(rb'[^,\r\n"]"[^,\r\n"]')
+
+# (rows, {field: (UTF-8 blob, value end offsets as native u64 bytes)})
+ParsedColumns = Tuple[int, Dict[str, Tuple[bytes, bytes]]]
+
+
+class IrregularCSV(ValueError):
+    """The file cannot be split by quote parity; parse it sequentially."""
+
+
+def _boundary(fh, pos: int, parity: int, size: int) -> int:
+    """First record start after ``pos``: just past a newline at or after ``pos`` with an even quote count.
+
+    ``parity`` is the quote count before ``pos`` modulo 2.
+    """
+    while pos < size:
+        fh.seek(pos)
+        block = fh.read(_READ_BLOCK)
+        if not block:
+            break
+        start = 0
+        while True:
+            nl = block.find(b"\n", start)
+            if nl < 0:
+                break
+            parity = (parity + block.count(b'"', start, nl)) & 1
+            if not parity:
+                return pos + nl + 1
+            start = nl + 1
+        parity = (parity + block.count(b'"', start)) & 1
+        pos += len(block)
+    return size
+
+
+def _scan(path: str, start: int, end: int) -> Tuple[int, bool]:
+    """Pass 1: (quotes in [start, end), whether a bare quote makes the parity rule unsafe)."""
+    with open(path, "rb") as fh:
+        lo = max(0, start - 1)
+        fh.seek(lo)
+        data = fh.read(end + 1 - lo)
+    body = data[start - lo:end - lo]
+    return body.count(b'"'), _BARE_QUOTE.search(data) is not None
+
+
+def _parse_range(path: str, start: int, start_parity: Optional[int], end: int, end_parity: int, size: int,
+                 cols: List[int], fields: Sequence[str]) -> ParsedColumns:
+    """Pass 2: parse the records between the boundaries found from ``start`` and ``end``.
+
+    ``start_parity`` is None when ``start`` is itself a record start (the first range).
+    """
+    with open(path, "rb") as fh:
+        a = start if start_parity is None else _boundary(fh, start, start_parity, size)
+        b = _boundary(fh, end, end_parity, size) if end < size else size
+        if a >= b:
+            return 0, {f: (b"", b"") for f in fields}
+        fh.seek(a)
+        text = fh.read(b - a).decode("utf-8")
+    values: List[List[str]] = [[] for _ in fields]
+    pairs = list(zip(cols, values))
+    rows = 0
+    try:
+        for row in csv.reader(io.StringIO(text, newline=""), strict=True):
+            if not row:
+                continue
+            n = len(row)
+            for col, out in pairs:
+                out.append(row[col].strip() if 0 <= col < n else "")
+            rows += 1
+    except csv.Error as exc:
+        # Typically a chunk that ends inside a quoted field: the parity assumption did not hold
+        raise IrregularCSV(f"bytes {a}-{b}: {exc}") from exc
+    result = {}
+    for field, vals in zip(fields, values):
+        encoded = [v.encode("utf-8") for v in vals]
+        result[field] = (b"".join(encoded), array("Q", accumulate(map(len, encoded))).tobytes())
+    return rows, result
+
+
+def _rebase(ends: bytes, base: int) -> bytes:
+    if numpy is not None:
+        return (numpy.frombuffer(ends, dtype=numpy.uint64) + numpy.uint64(base)).tobytes()
+    return array("Q", map(base.__add__, array("Q", ends))).tobytes()
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def parse_columns(csv_path: Union[str, Path], fields: Sequence[str] = LEAD_FIELDS, workers: Optional[int] = None,
+                  chunk_bytes: Optional[int] = None) -> Tuple[int, Dict[str, bytearray], Dict[str, array]]:
+    """Parse ``csv_path`` in ``workers`` processes: (rows, {field: blob}, {field: offsets incl. leading 0}).
+
+    Raises ``IrregularCSV`` when the file cannot be split safely (see module docstring).
+    """
+    path = str(csv_path)
+    size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        header_end = _boundary(fh, 0, 0, size)
+        fh.seek(0)
+        header = next(csv.reader(io.StringIO(fh.read(header_end).decode("utf-8-sig"), newline="")), None)
+    blobs = {f: bytearray() for f in fields}
+    ends = {f: bytearray(8) for f in fields}  # offset 0
+    if header is None:
+        return 0, blobs, {f: array("Q", [0]) for f in fields}
+    cols = field_columns(header, fields)
+
+    workers = max(1, workers or WORKERS)
+    chunk_bytes = max(_READ_BLOCK, chunk_bytes or CHUNK_BYTES)
+    splits = list(range(header_end, size, chunk_bytes)) + [size]
+    ranges = list(zip(splits, splits[1:]))
+    rows = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as pool:
+        scans = list(pool.map(_scan, [path] * len(ranges), [a for a, _ in ranges], [b for _, b in ranges]))
+        if any(bare for _, bare in scans):
+            raise IrregularCSV("bare quote inside an unquoted field")
+        parity = [0]
+        for quotes, _ in scans:
+            parity.append((parity[-1] + quotes) & 1)
+        if parity[-1]:
+            raise IrregularCSV("odd number of quotes")
+
+        # Ordered merge with at most 2 x workers chunk results held at once
+        pending: deque = deque()
+
+        def merge(fut) -> None:
+            nonlocal rows
+            n, parts = fut.result()
+            for f in fields:
+                blob, part_ends = parts[f]
+                ends[f] += _rebase(part_ends, len(blobs[f]))
+                blobs[f] += blob
+            rows += n
+
+        for i, (a, b) in enumerate(ranges):
+            if len(pending) >= 2 * workers:
+                merge(pending.popleft())
+            # The first range starts right after the header, which is a record start
+            pending.append(pool.submit(_parse_range, path, a, parity[i] if i else None, b, parity[i + 1], size,
+                                       cols, fields))
+        while pending:
+            merge(pending.popleft())
+
+    offsets = {}
+    for f in fields:
+        arr = array("Q")
+        arr.frombytes(bytes(ends[f]))
+        offsets[f] = arr
+    return rows, blobs, offsets
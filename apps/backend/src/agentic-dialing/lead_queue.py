@@ -0,0 +1,403 @@
+"""Lease-based lead work queue so several dialers can drain one lead list in parallel.
+
+Every lead of a source (a CSV or a lead set) is a row keyed by (source, 1-based
+index) moving through::
+
+    pending -> claimed -> dialing -> done
+                  |          |
+        (lease expires)  (lease expires)
+                  v          v
+               pending   interrupted
+
+Workers claim small batches under a time-limited lease and renew it while they
+are alive. A claimed lead whose worker disappears goes back to ``pending`` and
+is picked up by someone else. A lead whose call had already started is never
+redialled automatically (the prospect may have been reached); it is parked as
+``interrupted`` and can be requeued explicitly, so nothing is silently dropped.
+A claimed lead whose number is on a do-not-call list is finished as
+``suppressed`` instead of being dialled; one whose number was dialled recently
+is deferred: it goes back to ``pending`` with a ``not_before`` time and is not
+claimed again until then.
+
+A CSV is keyed by its resolved path, so a resync, re-download or edited
+re-upload of the same list keeps its queue. ``ensure_source`` is given the
+list's content ``version`` and, when it changes, re-lays the rows over the new
+content: every lead keeps the status of the row with the same identity
+(``lead_key``: phone, else e-mail, else name and company) wherever it moved,
+new leads start pending and rows of removed leads are dropped.
+
+The queue is a WAL-mode SQLite file (``LEAD_QUEUE_DB``), shared by processes on
+one host or over a shared volume.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from dial_state import ImmediateTransaction
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_QUEUE_DB = BASE_DIR / ".lead_queue.sqlite3"
+DEFAULT_LEASE_TTL = 60.0
+STATUSES = ("pending", "claimed", "dialing", "done", "interrupted", "suppressed")
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS lead_queue (
+        source TEXT NOT NULL,
+        lead_index INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        owner TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        updated REAL,
+        not_before REAL,
+        lead_key TEXT,
+        PRIMARY KEY (source, lead_index)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS lead_queue_status ON lead_queue (source, status, lead_index)",
+    "CREATE INDEX IF NOT EXISTS lead_queue_owner ON lead_queue (owner)",
+    "CREATE TABLE IF NOT EXISTS lead_queue_sources (source TEXT PRIMARY KEY, total INTEGER NOT NULL, version TEXT)",
+)
+# Columns added after the first release: (table, column, type), created on open if missing
+_ADDED_COLUMNS = (
+    ("lead_queue", "not_before", "REAL"),
+    ("lead_queue", "lead_key", "TEXT"),
+    ("lead_queue_sources", "version", "TEXT"),
+)
+_NON_DIGITS = re.compile(r"\D")
+
+
+def csv_source(csv_path: Union[str, Path]) -> str:
+    """Queue key of a CSV file: its resolved path (same-named files elsewhere get their own queue)."""
+    return f"csv:{Path(csv_path).resolve()}"
+
+
+def csv_version(csv_path: Union[str, Path]) -> Optional[str]:
+    """Content version of a CSV file for ``ensure_source``: its size and mtime."""
+    try:
+        st = os.stat(csv_path)
+    except OSError:
+        return None
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+def lead_key(lead: Mapping[str, Any]) -> Optional[str]:
+    """Identity of a lead across rewrites of its list: phone digits, else e-mail, else name and company."""
+    phone = _NON_DIGITS.sub("", str(lead.get("phone") or ""))
+    if phone:
+        return f"tel:{phone}"
+    email = str(lead.get("email") or "").strip().lower()
+    if email:
+        return f"mail:{email}"
+    name = " ".join(str(lead.get("prospect_name") or "").lower().split())
+    company = " ".join(str(lead.get("company_name") or "").lower().split())
+    return f"name:{name}|{company}" if name or company else None
+
+
+class LeadWorkQueue:
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = str(path or DEFAULT_QUEUE_DB)
+        self._local = threading.local()
+        conn = self._conn()
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        for table, column, kind in _ADDED_COLUMNS:
+            if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tx(self) -> ImmediateTransaction:
+        return ImmediateTransaction(self._conn())
+
+    # -----------------------------
+    # Sources
+    # -----------------------------
+
+    def ensure_source(self, source: str, total: int, version: Optional[str] = None,
+                      keys: Optional[Callable[[], Sequence[Optional[str]]]] = None) -> None:
+        """Make sure rows 1..total exist for ``source`` (new rows start pending).
+
+        ``version`` identifies the list's content; when it differs from the recorded one the
+        rows are reconciled with the new content by ``keys()`` (one ``lead_key`` per lead, in
+        order) instead of starting over. Without ``keys`` rows are matched by index.
+        """
+        row = self._conn().execute(
+            "SELECT total, version FROM lead_queue_sources WHERE source = ?", (source,)
+        ).fetchone()
+        if row is not None and total <= row[0] and (version is None or row[1] == version):
+            return
+        # A full pass over the list: done before taking the write lock
+        lead_keys = list(keys()) if keys is not None and version is not None else None
+        with self._tx() as conn:
+            row = conn.execute("SELECT total, version FROM lead_queue_sources WHERE source = ?", (source,)).fetchone()
+            if row is None:
+                row = self._adopt_legacy(conn, source, total)
+            if row is None:
+                self._insert_rows(conn, source, 1, total, lead_keys)
+            elif version is not None and row[1] != version:
+                self._reconcile(conn, source, total, lead_keys)
+            elif total > row[0]:
+                self._insert_rows(conn, source, row[0] + 1, total, lead_keys)
+            else:
+                return
+            if version is None and row is not None:
+                total, version = max(total, row[0]), row[1]
+            conn.execute(
+                "INSERT OR REPLACE INTO lead_queue_sources (source, total, version) VALUES (?, ?, ?)",
+                (source, total, version),
+            )
+
+    def _insert_rows(self, conn: sqlite3.Connection, source: str, first: int, last: int,
+                     lead_keys: Optional[List[Optional[str]]]) -> None:
+        now = time.time()
+        if lead_keys is None:
+            conn.execute(
+                """WITH RECURSIVE seq(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+                   INSERT OR IGNORE INTO lead_queue (source, lead_index, updated) SELECT ?, i, ? FROM seq""",
+                (first, last, source, now),
+            )
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO lead_queue (source, lead_index, updated, lead_key) VALUES (?, ?, ?, ?)",
+            [(source, i, now, lead_keys[i - 1] if i <= len(lead_keys) else None) for i in range(first, last + 1)],
+        )
+
+    def _reconcile(self, conn: sqlite3.Connection, source: str, total: int,
+                   lead_keys: Optional[List[Optional[str]]]) -> None:
+        """Re-lay ``source``'s rows over its changed list, each lead keeping its progress."""
+        old = conn.execute(
+            "SELECT lead_index, lead_key, status, owner, lease_expires, attempts, updated, not_before "
+            "FROM lead_queue WHERE source = ? ORDER BY lead_index",
+            (source,),
+        ).fetchall()
+        by_key: Dict[str, deque] = {}
+        by_index: Dict[int, tuple] = {}
+        for r in old:
+            if r[1] is not None and lead_keys is not None:
+                by_key.setdefault(r[1], deque()).append(r)
+            else:
+                # Rows recorded without an identity can only be matched by position
+                by_index[r[0]] = r
+        now = time.time()
+        rows = []
+        for i in range(1, total + 1):
+            key = lead_keys[i - 1] if lead_keys is not None and i <= len(lead_keys) else None
+            same = by_key.get(key) if key is not None else None
+            r = same.popleft() if same else by_index.pop(i, None)
+            if r is None:
+                rows.append((source, i, "pending", None, None, 0, now, None, key))
+            else:
+                rows.append((source, i, r[2], r[3], r[4], r[5], r[6], r[7], key))
+        conn.execute("DELETE FROM lead_queue WHERE source = ?", (source,))
+        conn.executemany(
+            "INSERT INTO lead_queue (source, lead_index, status, owner, lease_expires, attempts, updated, not_before, "
+            "lead_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _adopt_legacy(self, conn: sqlite3.Connection, source: str, total: int) -> Optional[Tuple[int, None]]:
+        """Take over the rows of this CSV recorded under an older key; returns its (total, version) or None.
+
+        Keys were ``csv:<path>@<size>-<mtime>`` (one queue per file version; the most recently
+        used one is adopted and the rest dropped) and, before that, ``csv:<file name>``
+        (adopted only for a list of the same size). Adopted rows are then reconciled by index.
+        """
+        if not source.startswith("csv:"):
+            return None
+        prefix = source + "@"
+        versions = conn.execute(
+            "SELECT s.source, s.total FROM lead_queue_sources s LEFT JOIN lead_queue q ON q.source = s.source "
+            "WHERE substr(s.source, 1, ?) = ? GROUP BY s.source ORDER BY MAX(q.updated) DESC",
+            (len(prefix), prefix),
+        ).fetchall()
+        adopted = versions[0] if versions else None
+        for old, _ in versions[1:]:
+            conn.execute("DELETE FROM lead_queue WHERE source = ?", (old,))
+            conn.execute("DELETE FROM lead_queue_sources WHERE source = ?", (old,))
+        if adopted is None:
+            legacy = "csv:" + os.path.basename(source[4:])
+            old = conn.execute("SELECT source, total FROM lead_queue_sources WHERE source = ?", (legacy,)).fetchone()
+            adopted = old if old is not None and old[1] == total else None
+        if adopted is None:
+            return None
+        conn.execute("UPDATE lead_queue SET source = ? WHERE source = ?", (source, adopted[0]))
+        conn.execute("DELETE FROM lead_queue_sources WHERE source = ?", (adopted[0],))
+        conn.execute("INSERT INTO lead_queue_sources (source, total) VALUES (?, ?)", (source, adopted[1]))
+        return adopted[1], None
+
+    def _expire(self, conn: sqlite3.Connection, source: str, now: float) -> None:
+        conn.execute(
+            "UPDATE lead_queue SET status = 'pending', owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE source = ? AND status = 'claimed' AND lease_expires < ?",
+            (now, source, now),
+        )
+        conn.execute(
+            "UPDATE lead_queue SET status = 'interrupted', owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE source = ? AND status = 'dialing' AND lease_expires < ?",
+            (now, source, now),
+        )
+
+    # -----------------------------
+    # Claims
+    # -----------------------------
+
+    def claim(self, source: str, owner: str, limit: int = 1, ttl: float = DEFAULT_LEASE_TTL, after: int = 0) -> List[int]:
+        """Claim up to ``limit`` pending leads, preferring indexes after ``after``; returns 1-based indexes."""
+        now = time.time()
+        with self._tx() as conn:
+            self._expire(conn, source, now)
+            picked = [r[0] for r in conn.execute(
+                "SELECT lead_index FROM lead_queue WHERE source = ? AND status = 'pending' AND lead_index > ? "
+                "AND (not_before IS NULL OR not_before <= ?) ORDER BY lead_index LIMIT ?",
+                (source, after, now, limit),
+            )]
+            if len(picked) < limit and after > 0:
+                # Wrap around to anything left earlier in the list
+                picked += [r[0] for r in conn.execute(
+                    "SELECT lead_index FROM lead_queue WHERE source = ? AND status = 'pending' AND lead_index <= ? "
+                    "AND (not_before IS NULL OR not_before <= ?) ORDER BY lead_index LIMIT ?",
+                    (source, after, now, limit - len(picked)),
+                )]
+            conn.executemany(
+                "UPDATE lead_queue SET status = 'claimed', owner = ?, lease_expires = ?, updated = ?, not_before = NULL "
+                "WHERE source = ? AND lead_index = ?",
+                [(owner, now + ttl, now, source, idx) for idx in picked],
+            )
+        return picked
+
+    def claim_index(self, source: str, index: int, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """Claim one specific lead (manual pick). Fails only while another live worker holds it."""
+        now = time.time()
+        with self._tx() as conn:
+            self._expire(conn, source, now)
+            row = conn.execute(
+                "SELECT status, owner FROM lead_queue WHERE source = ? AND lead_index = ?", (source, index)
+            ).fetchone()
+            if row and row[0] in ("claimed", "dialing") and row[1] != owner:
+                return False
+            if row and row[0] == "dialing":
+                return True
+            if row:
+                # Updated in place: the row keeps its attempts and lead identity
+                conn.execute(
+                    "UPDATE lead_queue SET status = 'claimed', owner = ?, lease_expires = ?, updated = ?, not_before = NULL "
+                    "WHERE source = ? AND lead_index = ?",
+                    (owner, now + ttl, now, source, index),
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO lead_queue (source, lead_index, status, owner, lease_expires, updated) "
+                    "VALUES (?, ?, 'claimed', ?, ?, ?)",
+                    (source, index, owner, now + ttl, now),
+                )
+            return True
+
+    def start(self, source: str, index: int, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """Mark a claimed lead as being dialled; False if the claim was lost."""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE lead_queue SET status = 'dialing', attempts = attempts + 1, lease_expires = ?, updated = ? "
+            "WHERE source = ? AND lead_index = ? AND owner = ? AND status = 'claimed'",
+            (now + ttl, now, source, index, owner),
+        )
+        return cur.rowcount == 1
+
+    def finish(self, source: str, index: int, owner: str, status: str = "done") -> bool:
+        if status not in ("done", "interrupted", "pending", "suppressed"):
+            raise ValueError(f"Cannot finish a lead as '{status}'")
+        cur = self._conn().execute(
+            "UPDATE lead_queue SET status = ?, owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE source = ? AND lead_index = ? AND owner = ?",
+            (status, time.time(), source, index, owner),
+        )
+        return cur.rowcount == 1
+
+    def defer(self, source: str, index: int, owner: str, until: float) -> bool:
+        """Hand a claimed lead back as pending, not to be claimed again before ``until``."""
+        cur = self._conn().execute(
+            "UPDATE lead_queue SET status = 'pending', owner = NULL, lease_expires = NULL, not_before = ?, updated = ? "
+            "WHERE source = ? AND lead_index = ? AND owner = ? AND status = 'claimed'",
+            (until, time.time(), source, index, owner),
+        )
+        return cur.rowcount == 1
+
+    def renew(self, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> int:
+        """Extend every live claim of ``owner``; returns how many leads it still holds."""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE lead_queue SET lease_expires = ? WHERE owner = ? AND status IN ('claimed', 'dialing')",
+            (now + ttl, owner),
+        )
+        return cur.rowcount
+
+    def release(self, owner: str, source: Optional[str] = None, indexes: Optional[List[int]] = None) -> int:
+        """Return claimed-but-not-dialled leads of ``owner`` to the pool."""
+        sql = ("UPDATE lead_queue SET status = 'pending', owner = NULL, lease_expires = NULL, updated = ? "
+               "WHERE owner = ? AND status = 'claimed'")
+        params: list = [time.time(), owner]
+        if source is not None:
+            sql += " AND source = ?"
+            params.append(source)
+        if indexes is not None:
+            if not indexes:
+                return 0
+            sql += f" AND lead_index IN ({','.join('?' * len(indexes))})"
+            params.extend(indexes)
+        return self._conn().execute(sql, params).rowcount
+
+    def requeue(self, source: str, status: str = "interrupted") -> int:
+        """Put ``interrupted`` (or ``done``) leads of a source back to pending."""
+        if status not in ("interrupted", "done"):
+            raise ValueError(f"Cannot requeue leads in status '{status}'")
+        return self._conn().execute(
+            "UPDATE lead_queue SET status = 'pending', updated = ? WHERE source = ? AND status = ?",
+            (time.time(), source, status),
+        ).rowcount
+
+    def stats(self, source: str) -> Dict[str, int]:
+        with self._tx() as conn:
+            self._expire(conn, source, time.time())
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM lead_queue WHERE source = ? GROUP BY status", (source,)
+            ).fetchall())
+        return {status: int(counts.get(status, 0)) for status in STATUSES}
+
+
+class LeaseRenewer:
+    """Background thread renewing all claims of one owner every ``ttl / 3`` seconds."""
+
+    def __init__(self, queue: LeadWorkQueue, owner: str, ttl: float = DEFAULT_LEASE_TTL) -> None:
+        self.queue = queue
+        self.owner = owner
+        self.ttl = ttl
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lead-lease-renewer", daemon=True)
+
+    def start(self) -> "LeaseRenewer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.queue.renew(self.owner, self.ttl)
+            except sqlite3.Error:
+                pass
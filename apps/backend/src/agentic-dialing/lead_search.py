@@ -0,0 +1,214 @@
+"""In-memory inverted + prefix index for typeahead search over prospects.
+
+Tokens from ``prospect_name``, ``company_name``, ``email`` and ``phone`` map to
+posting lists of row ids; a sorted vocabulary gives prefix lookups by bisection.
+Indexes are built incrementally in a background thread (searches made while a
+build is running see the rows indexed so far) and are keyed by the CSV version
+of the lead store they were built from, so a re-upload triggers a rebuild.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+SEARCH_FIELDS = ("prospect_name", "company_name", "email", "phone")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+BUILD_CHUNK_ROWS = 50_000
+
+_SPLIT = re.compile(r"[^0-9a-z]+")
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def lead_tokens(lead: Dict[str, str]) -> set:
+    """All index tokens for a lead (casefolded words, email local part, phone digits)."""
+    tokens = set()
+    for field in ("prospect_name", "company_name"):
+        tokens.update(t for t in _SPLIT.split((lead.get(field) or "").casefold()) if t)
+    email = (lead.get("email") or "").strip().casefold()
+    if email:
+        tokens.add(email)
+        tokens.update(t for t in _SPLIT.split(email) if t)
+    digits = _NON_DIGITS.sub("", lead.get("phone") or "")
+    if digits:
+        tokens.add(digits)
+        if len(digits) > 10:
+            # National number, so searches without the country code match too
+            tokens.add(digits[-10:])
+    return tokens
+
+
+def query_tokens(q: str) -> List[str]:
+    q = (q or "").strip().casefold()
+    if not q:
+        return []
+    if "@" in q:
+        return [q]
+    digits = _NON_DIGITS.sub("", q)
+    if digits and len(digits) >= len(_SPLIT.sub("", q)):
+        # Phone-like query: match on digits regardless of spacing/punctuation
+        return [digits]
+    return [t for t in _SPLIT.split(q) if t]
+
+
+class LeadSearchIndex:
+    def __init__(self, leads: Sequence[Dict[str, str]]) -> None:
+        self.leads = leads
+        # token -> row id (single hit) or ascending array of row ids
+        self._postings: Dict[str, Union[int, array]] = {}
+        self._vocab: List[str] = []
+        self.indexed = 0
+        self.complete = False
+        self.build_seconds = 0.0
+
+    def add_rows(self, start: int, end: int) -> None:
+        """Index rows [start, end) and merge their new tokens into the vocabulary."""
+        postings = self._postings
+        new_tokens = []
+        for i in range(start, end):
+            for tok in lead_tokens(self.leads[i]):
+                cur = postings.get(tok)
+                if cur is None:
+                    postings[tok] = i
+                    new_tokens.append(tok)
+                elif isinstance(cur, int):
+                    postings[tok] = array("i", (cur, i))
+                else:
+                    cur.append(i)
+        if new_tokens:
+            new_tokens.sort()
+            self._vocab = list(heapq.merge(self._vocab, new_tokens))
+        self.indexed = end
+
+    def build(self, chunk_rows: int = BUILD_CHUNK_ROWS) -> None:
+        started = time.perf_counter()
+        total = len(self.leads)
+        start = self.indexed
+        while start < total:
+            end = min(start + chunk_rows, total)
+            self.add_rows(start, end)
+            start = end
+            # Grow chunks geometrically so vocabulary merges stay O(n log n) overall
+            chunk_rows *= 2
+        self.complete = True
+        self.build_seconds = time.perf_counter() - started
+
+    def _ids(self, tok: str) -> Iterable[int]:
+        cur = self._postings.get(tok)
+        if cur is None:
+            return ()
+        return (cur,) if isinstance(cur, int) else cur
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        vocab = self._vocab
+        return bisect_left(vocab, prefix), bisect_left(vocab, prefix + "\uffff")
+
+    def _candidates(self, tok: str) -> Iterable[int]:
+        """Exact hits first, then hits of longer tokens sharing the prefix."""
+        yield from self._ids(tok)
+        lo, hi = self._prefix_range(tok)
+        vocab = self._vocab
+        for j in range(lo, hi):
+            term = vocab[j]
+            if term != tok:
+                yield from self._ids(term)
+
+    def _estimate(self, tok: str, cap: int = 1 << 20) -> int:
+        """Number of postings a prefix token expands to (counting stops at ``cap``)."""
+        lo, hi = self._prefix_range(tok)
+        n = 0
+        for j in range(lo, min(hi, lo + 64)):
+            cur = self._postings.get(self._vocab[j])
+            n += 1 if isinstance(cur, int) else len(cur or ())
+            if n >= cap:
+                break
+        if hi - lo > 64:
+            n += cap
+        return n
+
+    def _checker(self, tok: str):
+        """Per-row predicate for a non-driving query token."""
+        lo, hi = self._prefix_range(tok)
+        if hi - lo <= 8:
+            lists = [self._postings[self._vocab[j]] for j in range(lo, hi)]
+
+            def contains(idx: int) -> bool:
+                for cur in lists:
+                    if isinstance(cur, int):
+                        if cur == idx:
+                            return True
+                    else:
+                        pos = bisect_left(cur, idx)
+                        if pos < len(cur) and cur[pos] == idx:
+                            return True
+                return False
+            return contains
+
+        def prefix_match(idx: int) -> bool:
+            return any(h.startswith(tok) for h in lead_tokens(self.leads[idx]))
+        return prefix_match
+
+    def search(self, q: str, limit: int = DEFAULT_LIMIT) -> List[int]:
+        """Row ids whose tokens prefix-match every query token (at most ``limit``)."""
+        tokens = query_tokens(q)
+        if not tokens:
+            return []
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        # Drive from the most selective token, verify the others per candidate row
+        ranked = sorted(tokens, key=self._estimate)
+        driver = ranked[0]
+        checks = [self._checker(t) for t in ranked[1:]]
+        seen = set()
+        out: List[int] = []
+        for idx in self._candidates(driver):
+            if idx in seen:
+                continue
+            seen.add(idx)
+            if checks and not all(check(idx) for check in checks):
+                continue
+            out.append(idx)
+            if len(out) >= limit:
+                break
+        return out
+
+
+# Keyed by the LeadStore itself (one per CSV version): an index goes away with its store
+# when lead_store evicts it, so this never outgrows the store cache
+_INDEXES: "weakref.WeakKeyDictionary[object, LeadSearchIndex]" = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+
+def get_search_index(store, background: bool = True) -> LeadSearchIndex:
+    """Return the index for a LeadStore, starting a (background) build for new CSV versions."""
+    with _LOCK:
+        index = _INDEXES.get(store)
+        if index is not None:
+            return index
+        index = LeadSearchIndex(store.leads)
+        _INDEXES[store] = index
+    if background:
+        threading.Thread(target=index.build, name="lead-search-index", daemon=True).start()
+    else:
+        index.build()
+    return index
+
+
+def search_leads(store, q: str, limit: int = DEFAULT_LIMIT) -> Dict[str, object]:
+    index = get_search_index(store)
+    started = time.perf_counter()
+    ids = index.search(q, limit)
+    took_ms = (time.perf_counter() - started) * 1e3
+    return {
+        "results": [{"index": i, "lead": store.leads[i]} for i in ids],
+        "complete": index.complete,
+        "indexed": index.indexed,
+        "total": len(store.leads),
+        "took_ms": round(took_ms, 3),
+    }
@@ -0,0 +1,362 @@
+"""Virtual lead sets: several CSV files exposed as one lazily concatenated lead sequence.
+
+A lead set is an ordered or weighted list of CSV members. Rows are never loaded
+wholesale: each member file is scanned once for record offsets (quoted newlines
+respected), and individual rows are read by seeking into the file on demand.
+The global index of a row is stable for as long as the member files are unchanged.
+
+Ordered sets run through members back to back. Weighted sets interleave members
+with smooth weighted round-robin (weights 3:1 -> A A B A A A B A ...), dropping a
+member from the rotation once it is exhausted.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from leads import Lead, lead_from_values
+
+BASE_DIR = Path(__file__).resolve().parent
+LEAD_SETS_STORE = BASE_DIR / "lead_sets.json"
+
+MODES = ("ordered", "weighted")
+_MAX_OPEN_FILES = 8
+
+
+# -----------------------------
+# Per-file record index
+# -----------------------------
+
+class CsvRowIndex:
+    """Byte offsets of every data record in a CSV file, built with one streaming pass."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        st = os.stat(path)
+        self.signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        self.offsets = array("Q")
+        self.header: List[str] = []
+        with open(path, "rb") as f:
+            pos = 0
+            record_start = 0
+            blank = True
+            in_quotes = False
+            header = b""
+            for line in f:
+                if b'"' in line and line.count(b'"') & 1:
+                    in_quotes = not in_quotes
+                pos += len(line)
+                blank = blank and not line.strip()
+                if not self.header:
+                    header += line
+                if in_quotes:
+                    continue
+                if not self.header:
+                    self.header = next(csv.reader(io.StringIO(header.decode("utf-8-sig", errors="replace"))), [])
+                elif not blank:
+                    self.offsets.append(record_start)
+                record_start = pos
+                blank = True
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+_INDEXES: Dict[str, CsvRowIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_row_index(path: str) -> CsvRowIndex:
+    """Return the (cached) record index for ``path``, rescanning only if the file changed."""
+    key = str(Path(path).resolve())
+    st = os.stat(key)
+    with _INDEX_LOCK:
+        idx = _INDEXES.get(key)
+        if idx is not None and idx.signature == (st.st_ino, st.st_mtime_ns, st.st_size):
+            return idx
+    idx = CsvRowIndex(key)
+    with _INDEX_LOCK:
+        _INDEXES[key] = idx
+    return idx
+
+
+class _FileHandles:
+    """Small LRU of open member files so dozens of members do not exhaust descriptors.
+
+    Handles are keyed by path *and* file signature (inode, mtime, size): once a member
+    is replaced (e.g. atomically by a sync), its old handle would keep reading the
+    unlinked file, so a new signature opens the new file and closes the stale handle.
+    """
+
+    def __init__(self, limit: int = _MAX_OPEN_FILES) -> None:
+        self.limit = limit
+        self._files: "OrderedDict[Tuple[str, tuple], object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_record(self, path: str, signature: tuple, offset: int) -> bytes:
+        key = (path, signature)
+        with self._lock:
+            f = self._files.get(key)
+            if f is None:
+                for stale in [k for k in self._files if k[0] == path]:
+                    self._files.pop(stale).close()
+                f = open(path, "rb")
+                self._files[key] = f
+                while len(self._files) > self.limit:
+                    _, old = self._files.popitem(last=False)
+                    old.close()
+            else:
+                self._files.move_to_end(key)
+            f.seek(offset)
+            chunks = []
+            in_quotes = False
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                chunks.append(line)
+                if b'"' in line and line.count(b'"') & 1:
+                    in_quotes = not in_quotes
+                if not in_quotes:
+                    break
+            return b"".join(chunks)
+
+    def close(self) -> None:
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+
+_HANDLES = _FileHandles()
+
+
+def _row_to_lead(header: List[str], raw: bytes) -> Lead:
+    values = next(csv.reader(io.StringIO(raw.decode("utf-8", errors="replace"))), [])
+    return lead_from_values(header, values)
+
+
+# -----------------------------
+# Global index plan
+# -----------------------------
+
+class _Phase:
+    """A stretch of the global sequence during which the set of active members is fixed."""
+
+    __slots__ = ("start", "periods", "pattern", "ranks", "per_period", "base", "tail", "length")
+
+    def __init__(self, start: int, periods: int, pattern: List[int], base: List[int], tail: List[Tuple[int, int]]):
+        self.start = start
+        self.periods = periods
+        self.pattern = pattern
+        # ranks[slot]: how many earlier slots in the period belong to the same member
+        self.per_period: Dict[int, int] = {}
+        self.ranks = []
+        for k in pattern:
+            self.ranks.append(self.per_period.get(k, 0))
+            self.per_period[k] = self.per_period.get(k, 0) + 1
+        self.base = base
+        self.tail = tail
+        self.length = periods * len(pattern) + len(tail)
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        width = len(self.pattern)
+        full = self.periods * width
+        if offset < full:
+            period, slot = divmod(offset, width)
+            k = self.pattern[slot]
+            return k, self.base[k] + period * self.per_period[k] + self.ranks[slot]
+        return self.tail[offset - full]
+
+
+def _swrr_pattern(members: List[int], weights: List[int]) -> List[int]:
+    """One period of smooth weighted round-robin over ``members``."""
+    total = sum(weights[k] for k in members)
+    current = {k: 0 for k in members}
+    out = []
+    for _ in range(total):
+        for k in members:
+            current[k] += weights[k]
+        best = max(members, key=lambda k: current[k])
+        current[best] -= total
+        out.append(best)
+    return out
+
+
+def _build_plan(counts: List[int], weights: List[int], mode: str) -> List[_Phase]:
+    phases: List[_Phase] = []
+    pos = 0
+    if mode == "ordered":
+        for k, n in enumerate(counts):
+            if n:
+                base = [0] * len(counts)
+                phases.append(_Phase(pos, n, [k], base, []))
+                pos += n
+        return phases
+
+    remaining = list(counts)
+    consumed = [0] * len(counts)
+    while any(remaining):
+        active = [k for k, n in enumerate(remaining) if n > 0]
+        pattern = _swrr_pattern(active, weights)
+        periods = min(remaining[k] // weights[k] for k in active)
+        base = list(consumed)
+        for k in active:
+            consumed[k] += periods * weights[k]
+            remaining[k] -= periods * weights[k]
+        # Partial period until the first member runs dry, then re-plan without it
+        tail: List[Tuple[int, int]] = []
+        for k in pattern:
+            if remaining[k] == 0:
+                break
+            tail.append((k, consumed[k]))
+            consumed[k] += 1
+            remaining[k] -= 1
+        phase = _Phase(pos, periods, pattern, base, tail)
+        phases.append(phase)
+        pos += phase.length
+    return phases
+
+
+class LeadSetSequence(Sequence):
+    """Read-only sequence of lead dicts spanning all members of a lead set."""
+
+    def __init__(self, name: str, paths: List[str], weights: Optional[List[int]] = None, mode: str = "ordered") -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown lead set mode: {mode}")
+        self.name = name
+        self.paths = paths
+        self.mode = mode
+        self.weights = [max(1, int(w)) for w in (weights or [1] * len(paths))]
+        self._plan: Optional[List[_Phase]] = None
+        self._starts: List[int] = []
+        self._signature: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def _indexes(self) -> List[CsvRowIndex]:
+        return [get_row_index(p) for p in self.paths]
+
+    def _ensure_plan(self) -> Tuple[List[_Phase], List[int], List[CsvRowIndex]]:
+        """(plan, phase starts, member indexes) for the member files as they are now (stats each one)."""
+        indexes = self._indexes()
+        sig = tuple(ix.signature for ix in indexes)
+        with self._lock:
+            if self._plan is None or sig != self._signature:
+                self._plan = _build_plan([len(ix) for ix in indexes], self.weights, self.mode)
+                self._starts = [ph.start for ph in self._plan]
+                self._signature = sig
+            return self._plan, self._starts, indexes
+
+    def version(self) -> str:
+        """Content version of the whole set (its member files' signatures), for the lead queue."""
+        self._ensure_plan()
+        return repr(self._signature)
+
+    def __len__(self) -> int:
+        plan, _, _ = self._ensure_plan()
+        return plan[-1].start + plan[-1].length if plan else 0
+
+    @staticmethod
+    def _locate(plan: List[_Phase], starts: List[int], i: int) -> Tuple[int, int]:
+        """(member number, zero-based row in that member) for global index ``i``."""
+        total = plan[-1].start + plan[-1].length if plan else 0
+        if i < 0:
+            i += total
+        if not 0 <= i < total:
+            raise IndexError("lead set index out of range")
+        phase = plan[bisect_right(starts, i) - 1]
+        return phase.locate(i - phase.start)
+
+    def locate(self, i: int) -> Tuple[str, int]:
+        """Map a zero-based global index to (member path, zero-based row in that file)."""
+        plan, starts, _ = self._ensure_plan()
+        k, local = self._locate(plan, starts, i)
+        return self.paths[k], local
+
+    def __getitem__(self, i):
+        # A slice checks the member files once, then reads every row against that plan
+        plan, starts, indexes = self._ensure_plan()
+        if isinstance(i, slice):
+            total = plan[-1].start + plan[-1].length if plan else 0
+            return [self._read(plan, starts, indexes, j) for j in range(*i.indices(total))]
+        return self._read(plan, starts, indexes, i)
+
+    def __iter__(self) -> Iterator[Lead]:
+        plan, starts, indexes = self._ensure_plan()
+        total = plan[-1].start + plan[-1].length if plan else 0
+        for j in range(total):
+            yield self._read(plan, starts, indexes, j)
+
+    def _read(self, plan: List[_Phase], starts: List[int], indexes: List[CsvRowIndex], i: int) -> Lead:
+        k, local = self._locate(plan, starts, i)
+        ix = indexes[k]
+        return _row_to_lead(ix.header, _HANDLES.read_record(ix.path, ix.signature, ix.offsets[local]))
+
+    def member_counts(self) -> List[Tuple[str, int]]:
+        _, _, indexes = self._ensure_plan()
+        return [(os.path.basename(p), len(ix)) for p, ix in zip(self.paths, indexes)]
+
+
+# -----------------------------
+# Definitions store
+# -----------------------------
+
+def load_lead_sets() -> List[Dict[str, object]]:
+    try:
+        payload = json.loads(LEAD_SETS_STORE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    return [it for it in payload if isinstance(it, dict)] if isinstance(payload, list) else []
+
+
+def save_lead_sets(items: List[Dict[str, object]]) -> None:
+    tmp = LEAD_SETS_STORE.with_name(LEAD_SETS_STORE.name + ".tmp")
+    tmp.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, LEAD_SETS_STORE)
+
+
+def find_lead_set(name: str) -> Optional[Dict[str, object]]:
+    return next((it for it in load_lead_sets() if it.get("name") == name), None)
+
+
+def parse_members(spec: str) -> List[Dict[str, object]]:
+    """Parse 'a.csv:3, b.csv, c.csv:1' (weights default to 1) or a JSON member list."""
+    spec = (spec or "").strip()
+    if spec.startswith("["):
+        raw = json.loads(spec)
+        return [{"file": str(m["file"]), "weight": int(m.get("weight", 1))} for m in raw]
+    members = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.rpartition(":") if part.rsplit(":", 1)[-1].isdigit() else (part, "", "1")
+        members.append({"file": name.strip(), "weight": int(weight or 1)})
+    return members
+
+
+_SEQUENCES: Dict[str, Tuple[str, LeadSetSequence]] = {}
+
+
+def open_lead_set(definition: Dict[str, object], resolve: Callable[[str], Path]) -> LeadSetSequence:
+    """Build (or reuse) the lazy sequence for a stored definition; ``resolve`` maps member names to paths."""
+    name = str(definition.get("name") or "")
+    fingerprint = json.dumps(definition, sort_keys=True)
+    cached = _SEQUENCES.get(name)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    members = list(definition.get("members") or [])
+    paths = [str(resolve(str(m.get("file") or ""))) for m in members]
+    weights = [int(m.get("weight") or 1) for m in members]
+    seq = LeadSetSequence(name, paths, weights, str(definition.get("mode") or "ordered"))
+    _SEQUENCES[name] = (fingerprint, seq)
+    return seq
@@ -0,0 +1,255 @@
+"""Indexed, cached view over the active leads CSV.
+
+A ``LeadStore`` is built once per CSV version (path + mtime + size) over a list
+of lead dicts or a memory-mapped ``LeadColumns`` file, and keeps:
+  - equality postings (value -> ascending row ids) for the filterable fields,
+  - lazily built sort orders per field,
+  - an LRU of materialised query results (filters + sort -> ordered row ids).
+
+Pages are addressed with keyset cursors (last sort key + row id), located by
+binary search, so page 1000 costs the same as page 1.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FILTER_FIELDS = ("company_name", "job_title", "timezone")
+SORT_FIELDS = ("prospect_name", "company_name", "job_title", "timezone", "email", "phone")
+DEFAULT_PAGE_SIZE = 8
+MAX_PAGE_SIZE = 500
+_QUERY_CACHE_SIZE = 32
+_STORE_CACHE_SIZE = 2  # the active CSV and the one switched away from
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed or was issued for a different query."""
+
+
+def _norm(value: str) -> str:
+    return (value or "").strip().casefold()
+
+
+def _column(leads: Sequence[Dict[str, str]], field: str) -> Iterable[str]:
+    """Values of one field in row order; columnar lead lists avoid building row dicts."""
+    column = getattr(leads, "column", None)
+    if column is not None:
+        return column(field)
+    return (lead.get(field, "") for lead in leads)
+
+
+class LeadStore:
+    def __init__(self, path: str, leads: Sequence[Dict[str, str]], signature: Tuple[int, int]) -> None:
+        self.path = path
+        self.leads = leads
+        self.signature = signature
+        self._value = getattr(leads, "value", None)
+        self._lock = threading.Lock()
+        self._orders: Dict[str, array] = {}
+        self._results: "OrderedDict[tuple, array]" = OrderedDict()
+        self._postings: Dict[str, Dict[str, array]] = {f: {} for f in FILTER_FIELDS}
+        for field in FILTER_FIELDS:
+            postings = self._postings[field]
+            for i, value in enumerate(_column(leads, field)):
+                key = _norm(value)
+                ids = postings.get(key)
+                if ids is None:
+                    ids = postings[key] = array("i")
+                ids.append(i)
+
+    def __len__(self) -> int:
+        return len(self.leads)
+
+    def get(self, idx0: int) -> Optional[Dict[str, str]]:
+        if 0 <= idx0 < len(self.leads):
+            return self.leads[idx0]
+        return None
+
+    def facet_values(self, field: str) -> List[str]:
+        """Distinct (normalised) values of a filterable field."""
+        return sorted(k for k in self._postings.get(field, {}) if k)
+
+    def _sort_key(self, sort: Optional[str], idx: int) -> str:
+        if not sort:
+            return ""
+        if self._value is not None:
+            return _norm(self._value(idx, sort))
+        return _norm(self.leads[idx].get(sort, ""))
+
+    def _order(self, sort: str) -> array:
+        order = self._orders.get(sort)
+        if order is None:
+            keys = [_norm(v) for v in _column(self.leads, sort)]
+            order = array("i", sorted(range(len(keys)), key=lambda i: (keys[i], i)))
+            self._orders[sort] = order
+        return order
+
+    def query(self, filters: Dict[str, str], sort: Optional[str] = None, descending: bool = False) -> array:
+        """Return matching row ids in result order (cached per query)."""
+        cache_key = (tuple(sorted(filters.items())), sort, descending)
+        with self._lock:
+            hit = self._results.get(cache_key)
+            if hit is not None:
+                self._results.move_to_end(cache_key)
+                return hit
+
+            matched: Optional[set] = None
+            postings: List[array] = []
+            for field, value in filters.items():
+                ids = self._postings[field].get(_norm(value))
+                if ids is None:
+                    postings = []
+                    matched = set()
+                    break
+                postings.append(ids)
+            if postings:
+                # Intersect starting from the most selective posting list
+                postings.sort(key=len)
+                matched = set(postings[0])
+                for ids in postings[1:]:
+                    matched.intersection_update(ids)
+
+            if sort:
+                order = self._order(sort)
+                if matched is None:
+                    ids = array("i", order)
+                else:
+                    ids = array("i", (i for i in order if i in matched))
+            elif matched is None:
+                ids = array("i", range(len(self.leads)))
+            else:
+                ids = array("i", sorted(matched))
+            if descending:
+                ids.reverse()
+
+            self._results[cache_key] = ids
+            while len(self._results) > _QUERY_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return ids
+
+    def _seek(self, ids: array, sort: Optional[str], descending: bool, key: str, row: int) -> int:
+        """Index of the first result strictly after (key, row) in result order."""
+        target = (key, row)
+        lo, hi = 0, len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = ids[mid]
+            here = (self._sort_key(sort, i), i)
+            after = here < target if descending else here > target
+            if after:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def page(
+        self,
+        filters: Dict[str, str],
+        sort: Optional[str] = None,
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        offset: int = 0,
+    ) -> Tuple[List[Tuple[int, Dict[str, str]]], Optional[str], int]:
+        """Return ([(row_id, lead)], next_cursor, total_matching)."""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        ids = self.query(filters, sort, descending)
+        fingerprint = _fingerprint(filters, sort, descending)
+        if cursor:
+            key, row = decode_cursor(cursor, fingerprint)
+            start = self._seek(ids, sort, descending, key, row)
+        else:
+            start = max(0, offset)
+        chunk = ids[start:start + limit]
+        rows = [(i, self.leads[i]) for i in chunk]
+        next_cursor = None
+        if rows and start + limit < len(ids):
+            last = rows[-1][0]
+            next_cursor = encode_cursor(self._sort_key(sort, last), last, fingerprint)
+        return rows, next_cursor, len(ids)
+
+
+def _fingerprint(filters: Dict[str, str], sort: Optional[str], descending: bool) -> str:
+    raw = json.dumps([sorted((k, _norm(v)) for k, v in filters.items()), sort or "", descending])
+    return hashlib.blake2s(raw.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def encode_cursor(key: str, row: int, fingerprint: str) -> str:
+    raw = json.dumps([key, row, fingerprint], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, row, fp = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        row = int(row)
+        key = str(key)
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if fp != fingerprint:
+        raise InvalidCursor("Cursor does not match the requested filters/sort")
+    return key, row
+
+
+_STORES: "OrderedDict[str, LeadStore]" = OrderedDict()
+_STORES_LOCK = threading.Lock()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_lead_store(path: str, loader: Callable[[str], Sequence[Dict[str, str]]]) -> LeadStore:
+    """Return the store for ``path``, rebuilding it only when the file changed."""
+    key = str(Path(path).resolve()) if path else ""
+    sig = _file_signature(key) if key else None
+    if sig is None:
+        return LeadStore(key, [], (0, 0))
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is not None and store.signature == sig:
+            _STORES.move_to_end(key)
+            return store
+        store = LeadStore(key, loader(key), sig)
+        _STORES[key] = store
+        _STORES.move_to_end(key)
+        while len(_STORES) > _STORE_CACHE_SIZE:
+            _STORES.popitem(last=False)
+        return store
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    with _STORES_LOCK:
+        if path is None:
+            _STORES.clear()
+        else:
+            _STORES.pop(str(Path(path).resolve()), None)
+
+
+def parse_filters(values: Dict[str, Optional[str]]) -> Dict[str, str]:
+    return {k: v for k, v in values.items() if k in FILTER_FIELDS and v not in (None, "")}
+
+
+def validate_sort(sort: Optional[str]) -> Tuple[Optional[str], bool]:
+    """Parse 'field' / '-field' into (field, descending). Raises ValueError for unknown fields."""
+    sort = (sort or "").strip()
+    if not sort:
+        return None, False
+    descending = sort.startswith("-")
+    field = sort.lstrip("-+")
+    if field not in SORT_FIELDS:
+        raise ValueError(f"Unsupported sort field: {field}")
+    return field, descending
@@ -0,0 +1,126 @@
+"""Lead records and the one CSV lead parser shared by the web app, the agent and lead sets.
+
+``Lead`` is a read-only mapping over ``__slots__`` (no per-row dict, no repeated
+key strings), so existing ``lead.get("phone")`` / ``lead["email"]`` code keeps
+working and ``fast_json`` serialises it through ``as_dict``. Low-cardinality
+values (company, title, timezone, caller) are shared between rows while parsing.
+"""
+
+from __future__ import annotations
+
+import csv
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+LEAD_FIELDS = ("prospect_name", "company_name", "job_title", "phone", "email", "timezone", "resource_name")
+# Fields with few distinct values: one string object per value instead of one per row
+SHARED_FIELDS = ("company_name", "job_title", "timezone", "resource_name")
+
+_FIELD_SET = frozenset(LEAD_FIELDS)
+
+
+class Lead(Mapping):
+    __slots__ = LEAD_FIELDS
+
+    def __init__(
+        self,
+        prospect_name: str = "",
+        company_name: str = "",
+        job_title: str = "",
+        phone: str = "",
+        email: str = "",
+        timezone: str = "",
+        resource_name: str = "",
+    ) -> None:
+        self.prospect_name = prospect_name
+        self.company_name = company_name
+        self.job_title = job_title
+        self.phone = phone
+        self.email = email
+        self.timezone = timezone
+        self.resource_name = resource_name
+
+    @classmethod
+    def from_row(cls, row: Mapping, shared: Optional[Dict[str, str]] = None) -> "Lead":
+        """Build from a CSV row (header -> value), stripping values; ``shared`` interns repeated ones."""
+        values = []
+        for field in LEAD_FIELDS:
+            value = (row.get(field) or "").strip()
+            if shared is not None and field in SHARED_FIELDS:
+                value = shared.setdefault(value, value)
+            values.append(value)
+        return cls(*values)
+
+    def __getitem__(self, field: str) -> str:
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field) if field in _FIELD_SET else default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(LEAD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(LEAD_FIELDS)
+
+    def __reduce__(self):
+        return (Lead, tuple(getattr(self, f) for f in LEAD_FIELDS))
+
+    def as_dict(self) -> Dict[str, str]:
+        return {f: getattr(self, f) for f in LEAD_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"Lead({self.prospect_name!r}, {self.company_name!r}, phone={self.phone!r})"
+
+
+def field_columns(header: List[str], fields: Iterable[str] = LEAD_FIELDS) -> List[int]:
+    """Column of each field in a CSV header (-1 when absent); later duplicates win, as with DictReader."""
+    names = [h.strip() for h in header]
+    return [max((i for i, h in enumerate(names) if h == field), default=-1) for field in fields]
+
+
+def _iter_rows(lines: Iterable[str]) -> Iterator[Lead]:
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    cols = field_columns(header)
+    shared_at = [field in SHARED_FIELDS for field in LEAD_FIELDS]
+    shared: Dict[str, str] = {}
+    pairs = list(zip(cols, shared_at))
+    for row in reader:
+        if not row:
+            continue
+        n = len(row)
+        values = []
+        for col, is_shared in pairs:
+            value = row[col].strip() if 0 <= col < n else ""
+            if is_shared:
+                value = shared.setdefault(value, value)
+            values.append(value)
+        yield Lead(*values)
+
+
+def iter_csv_leads(source: Union[str, Path, TextIO, Iterable[str]]) -> Iterator[Lead]:
+    """Stream ``Lead`` records from a CSV path or an open text stream (header row required)."""
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8-sig", newline="") as fh:
+            yield from _iter_rows(fh)
+    else:
+        yield from _iter_rows(source)
+
+
+def read_csv_leads(path: Union[str, Path]) -> List[Lead]:
+    """All leads of a CSV file; [] when the file is missing or unreadable."""
+    try:
+        return list(iter_csv_leads(path))
+    except (OSError, csv.Error, UnicodeDecodeError):
+        return []
+
+
+def lead_from_values(header: List[str], values: List[str]) -> Lead:
+    """One lead from a parsed CSV record and its header."""
+    return Lead.from_row(dict(zip(header, values)))
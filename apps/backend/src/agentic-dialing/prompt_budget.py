@@ -0,0 +1,268 @@
+"""Token budget of campaign prompts, shared-section detection and block composition.
+
+Campaign prompts are large and mostly identical between campaigns (persona,
+rules, objection handling). This module:
+
+  - counts tokens per campaign prompt (``tiktoken`` when installed, otherwise a
+    chars/words estimate that tracks it within a few percent on English text);
+  - splits prompts into sections (markdown headings / blank-line paragraphs) and
+    reports the ones that appear in several campaigns;
+  - composes prompts from shared blocks: ``{{block:objections}}`` in a campaign
+    text is replaced by ``prompt_blocks/objections.md``;
+  - separates the static, cacheable part of a session prompt from the per-call
+    delta (lead context + script placeholder values).
+
+Run ``python prompt_budget.py`` for a report of the configured campaigns.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken  # type: ignore
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    tiktoken = None
+    _ENCODING = None
+
+BASE_DIR = Path(__file__).resolve().parent
+BLOCKS_DIR = BASE_DIR / "prompt_blocks"
+TOKENIZER = "tiktoken/cl100k_base" if _ENCODING is not None else "estimate"
+MIN_SHARED_TOKENS = 8
+_MAX_INCLUDE_DEPTH = 5
+
+_INCLUDE = re.compile(r"\{\{\s*block:([A-Za-z0-9_.-]+)\s*\}\}")
+_BLOCK_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+_HEADING = re.compile(r"^\s*#{1,6}\s+\S")
+_WS = re.compile(r"\s+")
+
+# Script placeholders filled from the lead (see agent.py)
+PLACEHOLDERS = (
+    ("[Prospect Name]", "prospect_name"),
+    ("[Resource Name]", "resource_name"),
+    ("[Job Title]", "job_title"),
+    ("[Company Name]", "company_name"),
+    ("[____@abc.com]", "email"),
+)
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    # Average of the two usual rules of thumb (4 chars/token, 0.75 words/token)
+    return max(1, round((len(text) / 4 + len(text.split()) * 4 / 3) / 2))
+
+
+# -----------------------------
+# Shared blocks
+# -----------------------------
+
+def list_blocks() -> Dict[str, str]:
+    if not BLOCKS_DIR.exists():
+        return {}
+    return {p.stem: p.read_text(encoding="utf-8") for p in sorted(BLOCKS_DIR.glob("*.md"))}
+
+
+def save_block(name: str, text: str) -> Path:
+    if not _BLOCK_NAME.match(name or ""):
+        raise ValueError("Block names may only contain letters, digits, '.', '_' and '-'")
+    BLOCKS_DIR.mkdir(parents=True, exist_ok=True)
+    path = BLOCKS_DIR / f"{name}.md"
+    path.write_text(text.strip() + "\n", encoding="utf-8")
+    return path
+
+
+def delete_block(name: str) -> bool:
+    if not _BLOCK_NAME.match(name or ""):
+        return False
+    path = BLOCKS_DIR / f"{name}.md"
+    if not path.exists():
+        return False
+    path.unlink()
+    return True
+
+
+def compose(text: str, blocks: Optional[Dict[str, str]] = None, _depth: int = 0) -> str:
+    """Expand ``{{block:name}}`` markers (blocks may include other blocks)."""
+    if not text or "{{" not in text:
+        return text
+    if blocks is None:
+        blocks = list_blocks()
+
+    def expand(m: "re.Match[str]") -> str:
+        body = blocks.get(m.group(1))
+        if body is None or _depth >= _MAX_INCLUDE_DEPTH:
+            return ""
+        return compose(body.strip(), blocks, _depth + 1)
+
+    return _INCLUDE.sub(expand, text)
+
+
+# -----------------------------
+# Sections and analysis
+# -----------------------------
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split a prompt into (title, body) sections at markdown headings and blank lines."""
+    sections: List[Tuple[str, str]] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        body = "\n".join(current).strip()
+        if body:
+            sections.append((body.splitlines()[0].lstrip("# ").strip()[:80], body))
+        current.clear()
+
+    for line in (text or "").splitlines():
+        if not line.strip():
+            flush()
+        elif _HEADING.match(line):
+            flush()
+            current.append(line)
+        else:
+            current.append(line)
+    flush()
+    return sections
+
+
+def _fingerprint(body: str) -> str:
+    norm = _WS.sub(" ", body).strip().casefold()
+    return hashlib.blake2s(norm.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def load_campaign_texts(campaigns: Dict[str, Tuple[str, str, str]]) -> Dict[str, Dict[str, str]]:
+    """Import each campaign module and return its composed agent/session texts."""
+    blocks = list_blocks()
+    out: Dict[str, Dict[str, str]] = {}
+    for key, (module_name, agent_attr, session_attr) in campaigns.items():
+        try:
+            mod = importlib.import_module(module_name)
+        except Exception:
+            continue
+        out[key] = {
+            "module": module_name,
+            "agent": compose(str(getattr(mod, agent_attr, "") or ""), blocks),
+            "session": compose(str(getattr(mod, session_attr, "") or ""), blocks),
+        }
+    return out
+
+
+def analyse(
+    prompts: Dict[str, Dict[str, str]],
+    sample_lead: Optional[Dict[str, str]] = None,
+    min_shared_tokens: int = MIN_SHARED_TOKENS,
+) -> Dict[str, Any]:
+    """Token counts per campaign and sections shared by two or more campaigns.
+
+    ``per_call_tokens`` is what each call sends on top of the static instructions,
+    measured with ``sample_lead``.
+    """
+    campaigns = []
+    seen: Dict[str, Dict[str, Any]] = {}
+    for key, texts in prompts.items():
+        agent_tokens = count_tokens(texts.get("agent", ""))
+        session_tokens = count_tokens(texts.get("session", ""))
+        _, delta = split_static_and_delta(texts.get("agent", ""), texts.get("session", ""), sample_lead or {})
+        campaigns.append({
+            "campaign": key,
+            "module": texts.get("module"),
+            "agent_tokens": agent_tokens,
+            "session_tokens": session_tokens,
+            "total_tokens": agent_tokens + session_tokens,
+            "per_call_tokens": count_tokens(delta),
+        })
+        for part in ("agent", "session"):
+            for title, body in split_sections(texts.get(part, "")):
+                tokens = count_tokens(body)
+                if tokens < min_shared_tokens:
+                    continue
+                entry = seen.setdefault(_fingerprint(body), {"title": title, "tokens": tokens, "campaigns": [], "text": body})
+                if key not in entry["campaigns"]:
+                    entry["campaigns"].append(key)
+
+    shared = [e for e in seen.values() if len(e["campaigns"]) > 1]
+    for e in shared:
+        # Tokens saved per full prompt set if the section were sent once as a shared block
+        e["duplicate_tokens"] = e["tokens"] * (len(e["campaigns"]) - 1)
+    shared.sort(key=lambda e: e["duplicate_tokens"], reverse=True)
+    total = sum(c["total_tokens"] for c in campaigns)
+    duplicate = sum(e["duplicate_tokens"] for e in shared)
+    return {
+        "tokenizer": TOKENIZER,
+        "campaigns": sorted(campaigns, key=lambda c: c["total_tokens"], reverse=True),
+        "shared_sections": shared,
+        "total_tokens": total,
+        "duplicate_tokens": duplicate,
+    }
+
+
+# -----------------------------
+# Static prompt / per-call delta
+# -----------------------------
+
+def lead_context(lead: Dict[str, str]) -> str:
+    return (
+        f"Lead Context:\n"
+        f"- Prospect Name: {lead.get('prospect_name','')}\n"
+        f"- Job Title: {lead.get('job_title','')}\n"
+        f"- Company: {lead.get('company_name','')}\n"
+        f"- Email: {lead.get('email','')}\n"
+        f"- Phone: {lead.get('phone','')}\n"
+        f"- Timezone: {lead.get('timezone','')}\n"
+        f"- Caller (Resource Name): {lead.get('resource_name','')}\n"
+    )
+
+
+def split_static_and_delta(agent_text: str, session_text: str, lead: Optional[Dict[str, str]]) -> Tuple[str, str]:
+    """Return (static instructions, per-call instructions).
+
+    The static part (persona + script, placeholders left in place) is identical for
+    every call of a campaign, so it can be set once as agent instructions and cached
+    by the model provider; only the lead context and placeholder values vary per call.
+    """
+    static = agent_text.rstrip()
+    if session_text:
+        static += "\n\n# Call Script\n" + session_text.strip()
+    if not lead:
+        return static, "Begin the call now, following the Call Script."
+    values = [f"{ph} = {lead.get(field)}" for ph, field in PLACEHOLDERS if lead.get(field)]
+    delta = lead_context(lead)
+    if values:
+        delta += "\nScript placeholder values: " + "; ".join(values) + "\n"
+    return static, delta + "\nBegin the call now, following the Call Script."
+
+
+def _print_report(report: Dict[str, Any], show: int = 10) -> None:
+    print(f"Tokenizer: {report['tokenizer']}")
+    for c in report["campaigns"]:
+        print(
+            f"  {c['total_tokens']:>7}  (agent {c['agent_tokens']:>6}, session {c['session_tokens']:>6}, "
+            f"per call {c['per_call_tokens']:>4})  {c['campaign']}"
+        )
+    print(f"Total: {report['total_tokens']} tokens, {report['duplicate_tokens']} duplicated across campaigns")
+    for e in report["shared_sections"][:show]:
+        print(f"  {e['duplicate_tokens']:>7} dup  {e['tokens']:>5} tok  x{len(e['campaigns'])}  {e['title']}")
+
+
+def _campaigns_from_agent() -> Dict[str, Tuple[str, str, str]]:
+    from backend.agent import get_campaigns
+
+    return get_campaigns()
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    report = analyse(load_campaign_texts(_campaigns_from_agent()))
+    if "--json" in sys.argv[1:]:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_report(report)
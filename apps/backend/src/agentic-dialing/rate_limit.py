@@ -0,0 +1,230 @@
+"""Calls-per-second limits for outbound dialling (global, per country prefix, per campaign).
+
+Each limit is a token bucket (``rate`` dials per second, up to ``burst`` at
+once). A dial needs one token from every bucket that applies to it: the global
+bucket, the bucket of the longest configured country prefix of the number, and
+the campaign's bucket. Buckets may go into debt: ``reserve`` takes the tokens
+now and returns how long the caller must wait before dialling, so waiters are
+served in arrival order and can wait with ``asyncio.sleep`` (``acquire``)
+instead of holding a thread. ``try_acquire`` takes tokens only if all of them
+are available and otherwise reports the wait, for callers that re-queue.
+
+Configured with ``DIAL_RATE_LIMITS`` (JSON); each limit is ``"rate"`` or
+``"rate/burst"``::
+
+    {"global": "1/3", "country": {"1": "0.5", "44": "1/2"}, "campaign": {"Demo (demo)": "0.2"}}
+
+With a shared ``dial_state`` backend (``from_env(store)``) the buckets hold
+for all web workers together; without one they are per process. A dial whose
+call then fails to start gives its tokens back with ``cancel``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from suppression import normalize_number
+
+logger = logging.getLogger(__name__)
+
+_RATE_WINDOW = 60.0
+
+
+def parse_limit(value: Any) -> Tuple[float, float]:
+    """``"rate"``, ``"rate/burst"`` or a number -> (rate per second, burst)."""
+    if isinstance(value, (int, float)):
+        rate, burst = float(value), None
+    else:
+        text = str(value).strip()
+        rate_s, _, burst_s = text.partition("/")
+        rate, burst = float(rate_s), (float(burst_s) if burst_s else None)
+    if rate <= 0:
+        raise ValueError(f"rate must be positive: {value!r}")
+    return rate, max(1.0, burst if burst is not None else rate)
+
+
+class TokenBucket:
+    """``rate`` tokens per second up to ``burst``.
+
+    With a ``store`` (a ``dial_state.DialStateBackend``) the balance lives under
+    ``dial_rate:<name>`` and is updated by compare-and-set, so every web worker
+    sharing that backend draws from the same bucket. The counters are per worker.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, store: Any = None) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.store = store
+        self.key = f"dial_rate:{name}"
+        self._state: Dict[str, float] = {"tokens": burst, "updated": time.time()}
+        self.granted = 0
+        self.throttled = 0
+        self._recent: deque = deque()
+
+    def _read(self) -> Optional[Dict[str, float]]:
+        return self._state if self.store is None else self.store.get(self.key)
+
+    def _balance(self, state: Optional[Dict[str, float]], now: float) -> float:
+        if state is None:
+            return self.burst
+        return min(self.burst, state["tokens"] + max(0.0, now - state["updated"]) * self.rate)
+
+    def _add(self, delta: float, now: float) -> float:
+        """Refill, then add ``delta`` tokens (taking may go into debt); returns the balance before."""
+        while True:
+            state = self._read()
+            before = self._balance(state, now)
+            new = {"tokens": min(self.burst, before + delta), "updated": max(now, state["updated"] if state else now)}
+            if self.store is None:
+                self._state = new
+                return before
+            if self.store.compare_and_set(self.key, state, new):
+                return before
+
+    def tokens(self, now: float) -> float:
+        return self._balance(self._read(), now)
+
+    def wait_time(self, now: float) -> float:
+        tokens = self.tokens(now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, now: float) -> float:
+        """Take one token; returns how long its holder must wait for it (0 when it was available)."""
+        before = self._add(-1, now)
+        self.granted += 1
+        self._recent.append(now)
+        if before < 1:
+            self.throttled += 1
+            return (1 - before) / self.rate
+        return 0.0
+
+    def refund(self) -> None:
+        self._add(1, time.time())
+        self.granted -= 1
+        if self._recent:
+            self._recent.pop()
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        while self._recent and now - self._recent[0] > _RATE_WINDOW:
+            self._recent.popleft()
+        return {
+            "limit_per_sec": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens(now), 2),
+            "rate_per_sec": round(len(self._recent) / _RATE_WINDOW, 3),
+            "granted": self.granted,
+            "throttled": self.throttled,
+        }
+
+
+class DialRateLimiter:
+    def __init__(self, config: Optional[Dict[str, Any]] = None, store: Any = None) -> None:
+        config = config or {}
+        self._lock = threading.Lock()
+        self.global_bucket: Optional[TokenBucket] = None
+        self.country: Dict[str, TokenBucket] = {}
+        self.campaign: Dict[str, TokenBucket] = {}
+        if config.get("global") is not None:
+            self.global_bucket = TokenBucket("global", *parse_limit(config["global"]), store=store)
+        for prefix, value in (config.get("country") or {}).items():
+            prefix = "".join(ch for ch in str(prefix) if ch.isdigit())
+            if prefix:
+                self.country[prefix] = TokenBucket(f"country:{prefix}", *parse_limit(value), store=store)
+        for key, value in (config.get("campaign") or {}).items():
+            self.campaign[str(key)] = TokenBucket(f"campaign:{key}", *parse_limit(value), store=store)
+        # Longest prefix first, so "1242" wins over "1"
+        self._prefixes = sorted(self.country, key=len, reverse=True)
+        self.waiting = 0
+
+    @classmethod
+    def from_env(cls, store: Any = None) -> "DialRateLimiter":
+        raw = os.getenv("DIAL_RATE_LIMITS", "").strip()
+        if not raw:
+            return cls()
+        try:
+            return cls(json.loads(raw), store)
+        except (ValueError, TypeError, AttributeError):
+            logger.exception("Invalid DIAL_RATE_LIMITS; dialling is not rate limited")
+            return cls()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.global_bucket or self.country or self.campaign)
+
+    def buckets_for(self, phone: Optional[str], campaign: Optional[str]) -> List[TokenBucket]:
+        buckets = [self.global_bucket] if self.global_bucket else []
+        number = normalize_number(phone) if self._prefixes and phone else None
+        if number is not None:
+            digits = str(number)
+            prefix = next((p for p in self._prefixes if digits.startswith(p)), None)
+            if prefix is not None:
+                buckets.append(self.country[prefix])
+        if campaign and campaign in self.campaign:
+            buckets.append(self.campaign[campaign])
+        return buckets
+
+    def try_acquire(self, phone: Optional[str], campaign: Optional[str]) -> Tuple[float, List[TokenBucket]]:
+        """Take a token from every applicable bucket if all have one: returns (0, buckets taken from);
+        else (the wait, []) with nothing taken."""
+        wait, buckets = self.reserve(phone, campaign)
+        if wait > 0:
+            self.cancel(buckets)
+            return wait, []
+        return 0.0, buckets
+
+    def reserve(self, phone: Optional[str], campaign: Optional[str]) -> Tuple[float, List[TokenBucket]]:
+        """Take the tokens now (buckets may go into debt); returns (seconds to wait, buckets taken from)."""
+        buckets = self.buckets_for(phone, campaign)
+        if not buckets:
+            return 0.0, buckets
+        with self._lock:
+            now = time.time()
+            return max(b.take(now) for b in buckets), buckets
+
+    def cancel(self, buckets: List[TokenBucket]) -> None:
+        """Give back a reservation that will not be used."""
+        with self._lock:
+            for b in buckets:
+                b.refund()
+
+    async def acquire(self, phone: Optional[str], campaign: Optional[str],
+                      max_wait: Optional[float] = None) -> Tuple[float, List[TokenBucket]]:
+        """Wait (without blocking a thread) until this dial may go out; returns (seconds waited, buckets
+        taken from), the latter for ``cancel`` if the dial does not happen after all.
+
+        Raises ``TimeoutError`` without taking anything when the wait would exceed ``max_wait``.
+        """
+        wait, buckets = self.reserve(phone, campaign)
+        if wait <= 0:
+            return 0.0, buckets
+        if max_wait is not None and wait > max_wait:
+            self.cancel(buckets)
+            raise TimeoutError(wait)
+        self.waiting += 1
+        try:
+            await asyncio.sleep(wait)
+        except BaseException:
+            self.cancel(buckets)
+            raise
+        finally:
+            self.waiting -= 1
+        return wait, buckets
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            return {
+                "enabled": self.enabled,
+                "waiting": self.waiting,
+                "global": self.global_bucket.snapshot(now) if self.global_bucket else None,
+                "country": {p: b.snapshot(now) for p, b in self.country.items()},
+                "campaign": {k: b.snapshot(now) for k, b in self.campaign.items()},
+            }
@@ -0,0 +1,277 @@
+"""Deterministic stand-in for the realtime model, for exercising the call pipeline offline.
+
+``StubRealtimeModel`` plays a scripted call: ``generate_reply`` (the agent's
+opening) returns the script's greeting, then each scripted turn is replayed as
+if the realtime server heard the caller: speech started/stopped, the final
+transcript, and, ``latency`` seconds later, a server-initiated generation
+streaming the scripted reply in word chunks every ``chunk_delay`` seconds.
+The next caller turn starts ``user_gap`` seconds after the pipeline has read
+the whole reply. No network, no randomness: the same script gives the same
+events in the same order.
+
+Scripts are JSON (``{"greeting": ..., "turns": [{"user": ..., "agent": ...}]}``)
+or a transcript journal recorded by ``transcripts.py`` (``.transcripts/<call>.jsonl``),
+whose caller/agent segments become the turns. Selected in ``agent.py`` with
+``AGENT_REALTIME_MODEL=stub``; ``STUB_REALTIME_SCRIPT``, ``STUB_REALTIME_LATENCY``,
+``STUB_REALTIME_CHUNK_DELAY``, ``STUB_REALTIME_USER_GAP`` and
+``STUB_REALTIME_AUDIO`` (``0`` for text only; by default replies carry silent
+24 kHz audio, as room sessions expect an audio modality) configure it.
+
+Each session records per-turn timestamps (``turns``) so benchmarks can report
+turn latency: caller end of speech -> first reply chunk read by the pipeline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from livekit import rtc
+from livekit.agents import llm
+from livekit.agents.types import NOT_GIVEN, NotGivenOr
+
+SAMPLE_RATE = 24000
+_FRAME_MS = 20
+# Length of the silent audio sent with each reply
+_SECONDS_PER_WORD = 0.3
+
+DEFAULT_SCRIPT: Dict[str, Any] = {
+    "greeting": "Hi, this is Alex from SplashBI. Do you have a quick minute?",
+    "turns": [
+        {"user": "Sure, go ahead.", "agent": "What are your current challenges with Oracle reporting or BI tools?"},
+        {"user": "Our month end reporting is slow and very manual.",
+         "agent": "That is common. What role do you play in evaluating tools like this?"},
+        {"user": "I'm the decision maker for BI tools here.",
+         "agent": "Great. If it resonates with your team, what's your typical evaluation timeframe?"},
+        {"user": "Probably next quarter.", "agent": "Excellent. You'll hear from our team within 48 hours. Thank you!"},
+    ],
+}
+
+
+def load_script(path: Optional[str]) -> Dict[str, Any]:
+    """A call script from JSON or a transcript journal; the built-in demo call without ``path``."""
+    if not path:
+        return DEFAULT_SCRIPT
+    p = Path(path)
+    if p.suffix != ".jsonl":
+        return json.loads(p.read_text(encoding="utf-8"))
+    greeting = ""
+    turns: List[Dict[str, str]] = []
+    user: Optional[str] = None
+    with open(p, encoding="utf-8") as fh:
+        segments = [json.loads(line) for line in fh if line.strip()]
+    for seg in sorted(segments, key=lambda s: s.get("seq", 0)):
+        text = (seg.get("text") or "").strip()
+        if not text or seg.get("is_final") is False:
+            continue
+        if seg.get("speaker") == "user":
+            user = f"{user} {text}" if user else text
+        elif user is None and not turns:
+            greeting = f"{greeting} {text}".strip()
+        elif user is None:
+            turns[-1]["agent"] += " " + text
+        else:
+            turns.append({"user": user, "agent": text})
+            user = None
+    return {"greeting": greeting, "turns": turns}
+
+
+class StubRealtimeModel(llm.RealtimeModel):
+    def __init__(
+        self,
+        script: Optional[Dict[str, Any]] = None,
+        latency: float = 0.3,
+        chunk_delay: float = 0.02,
+        user_gap: float = 0.2,
+        audio: bool = True,
+    ) -> None:
+        super().__init__(
+            capabilities=llm.RealtimeCapabilities(
+                message_truncation=False,
+                turn_detection=True,
+                user_transcription=True,
+                auto_tool_reply_generation=False,
+                audio_output=audio,
+                manual_function_calls=False,
+            )
+        )
+        self.script = script or DEFAULT_SCRIPT
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.user_gap = user_gap
+        self.audio = audio
+        self.sessions: List[StubRealtimeSession] = []
+
+    @classmethod
+    def from_env(cls) -> "StubRealtimeModel":
+        return cls(
+            script=load_script(os.getenv("STUB_REALTIME_SCRIPT")),
+            latency=float(os.getenv("STUB_REALTIME_LATENCY", "0.3")),
+            chunk_delay=float(os.getenv("STUB_REALTIME_CHUNK_DELAY", "0.02")),
+            user_gap=float(os.getenv("STUB_REALTIME_USER_GAP", "0.2")),
+            audio=os.getenv("STUB_REALTIME_AUDIO", "1") != "0",
+        )
+
+    @property
+    def model(self) -> str:
+        return "stub"
+
+    @property
+    def provider(self) -> str:
+        return "local"
+
+    def session(self, *, turn_detection_disabled: bool = False) -> "StubRealtimeSession":
+        sess = StubRealtimeSession(self)
+        self.sessions.append(sess)
+        return sess
+
+    async def aclose(self) -> None:
+        for sess in self.sessions:
+            await sess.aclose()
+
+
+class StubRealtimeSession(llm.RealtimeSession):
+    def __init__(self, model: StubRealtimeModel) -> None:
+        super().__init__(model)
+        self._model = model
+        self._chat_ctx = llm.ChatContext.empty()
+        self._tools = llm.ToolContext.empty()
+        self._instructions = ""
+        self._turn_task: Optional[asyncio.Task] = None
+        self._reply_read = asyncio.Event()  # set once the pipeline has read the latest reply
+        self._closed = False
+        self.opened = time.perf_counter()
+        # {"turn", "user_end", "first_chunk", "last_chunk"} (perf_counter seconds); turn 0 is the greeting
+        self.turns: List[Dict[str, Any]] = []
+        self.done = asyncio.Event()
+
+    # -----------------------------
+    # Session state (kept locally; nothing is sent anywhere)
+    # -----------------------------
+
+    @property
+    def chat_ctx(self) -> llm.ChatContext:
+        return self._chat_ctx.copy()
+
+    @property
+    def tools(self) -> llm.ToolContext:
+        return self._tools.copy()
+
+    async def update_instructions(self, instructions: str) -> None:
+        self._instructions = instructions
+
+    async def update_chat_ctx(self, chat_ctx: llm.ChatContext) -> None:
+        self._chat_ctx = chat_ctx.copy()
+
+    async def update_tools(self, tools: List[llm.Tool]) -> None:
+        self._tools = llm.ToolContext(tools)
+
+    def update_options(self, *, tool_choice: NotGivenOr[Any] = NOT_GIVEN) -> None:
+        pass
+
+    def push_audio(self, frame: rtc.AudioFrame) -> None:
+        pass  # caller audio is scripted, not recognised
+
+    def push_video(self, frame: rtc.VideoFrame) -> None:
+        pass
+
+    def commit_audio(self) -> None:
+        pass
+
+    def clear_audio(self) -> None:
+        pass
+
+    def interrupt(self) -> None:
+        pass
+
+    def truncate(self, *, message_id: str, modalities: List[str], audio_end_ms: int,
+                 audio_transcript: NotGivenOr[str] = NOT_GIVEN) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        self._closed = True
+        if self._turn_task is not None:
+            self._turn_task.cancel()
+        self.done.set()
+
+    # -----------------------------
+    # Scripted generations
+    # -----------------------------
+
+    def generate_reply(self, *, instructions: NotGivenOr[str] = NOT_GIVEN, tool_choice: NotGivenOr[Any] = NOT_GIVEN,
+                       tools: NotGivenOr[List[llm.Tool]] = NOT_GIVEN) -> "asyncio.Future[llm.GenerationCreatedEvent]":
+        """The opening line; the scripted caller turns follow once it has been read."""
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        record = {"turn": 0, "user_end": time.perf_counter()}
+        self.turns.append(record)
+        fut.set_result(self._generation(self._model.script.get("greeting") or "Hello.", record, user_initiated=True))
+        return fut
+
+    def _generation(self, text: str, record: Dict[str, Any], user_initiated: bool) -> llm.GenerationCreatedEvent:
+        words = text.split()
+        finished = asyncio.Event()
+
+        async def text_stream() -> AsyncIterator[str]:
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(self._model.chunk_delay)
+                else:
+                    record["first_chunk"] = time.perf_counter()
+                yield word if i == 0 else " " + word
+            record["last_chunk"] = time.perf_counter()
+            finished.set()
+
+        async def audio_stream() -> AsyncIterator[rtc.AudioFrame]:
+            if not self._model.audio:
+                return
+            samples = SAMPLE_RATE * _FRAME_MS // 1000
+            for _ in range(int(len(words) * _SECONDS_PER_WORD * 1000 / _FRAME_MS)):
+                yield rtc.AudioFrame(bytes(samples * 2), SAMPLE_RATE, 1, samples)
+
+        async def message_stream() -> AsyncIterator[llm.MessageGeneration]:
+            modalities: asyncio.Future = asyncio.get_running_loop().create_future()
+            modalities.set_result(["audio", "text"] if self._model.audio else ["text"])
+            yield llm.MessageGeneration(
+                message_id=f"stub_{uuid.uuid4().hex[:12]}",
+                text_stream=text_stream(),
+                audio_stream=audio_stream(),
+                modalities=modalities,
+            )
+
+        async def function_stream() -> AsyncIterator[llm.FunctionCall]:
+            return
+            yield  # pragma: no cover - makes this an (empty) async generator
+
+        self._reply_read = finished
+        if self._turn_task is None and not self._closed:
+            self._turn_task = asyncio.create_task(self._play_turns())
+        return llm.GenerationCreatedEvent(
+            message_stream=message_stream(),
+            function_stream=function_stream(),
+            user_initiated=user_initiated,
+            response_id=f"resp_{uuid.uuid4().hex[:12]}",
+        )
+
+    async def _play_turns(self) -> None:
+        try:
+            for n, turn in enumerate(self._model.script.get("turns") or [], start=1):
+                await self._reply_read.wait()
+                await asyncio.sleep(self._model.user_gap)
+                self.emit("input_speech_started", llm.InputSpeechStartedEvent())
+                self.emit("input_speech_stopped", llm.InputSpeechStoppedEvent(user_transcription_enabled=True))
+                record = {"turn": n, "user_end": time.perf_counter()}
+                self.turns.append(record)
+                self.emit(
+                    "input_audio_transcription_completed",
+                    llm.InputTranscriptionCompleted(item_id=f"item_{uuid.uuid4().hex[:12]}", transcript=turn["user"], is_final=True),
+                )
+                await asyncio.sleep(self._model.latency)
+                self.emit("generation_created", self._generation(turn["agent"], record, user_initiated=False))
+            await self._reply_read.wait()
+        finally:
+            self.done.set()
@@ -0,0 +1,323 @@
+"""Bounded, tracked pool of agents serving browser room calls.
+
+Each browser room gets at most one agent. Repeated starts for a room reuse the
+agent already there, and the pool refuses new rooms once ``cap`` agents are
+busy. Agents are reaped when their process exits or when the room shows no
+activity for ``idle_timeout`` seconds: no token requests or heartbeats and, when
+an ``occupied(room)`` callable is given, nobody but the agent in the room.
+
+To cut the start-up latency of the next room, the pool can keep ``warm``
+*parked* agents: processes that have already imported LiveKit, the plugins and
+the prompt modules and just wait for a handoff file naming their room
+(``agent.py park <handoff>``).
+
+With a shared ``DialStateBackend`` the pool also takes a ``room:<name>`` lease,
+so two web workers never both start an agent for the same room, and one of
+``cap`` ``room-slot:<i>`` leases per agent, so ``cap`` holds for every worker
+sharing that backend rather than per worker.
+
+An optional ``admit(busy)`` callable can veto new rooms (host admission
+control); it returns None to allow the start or the reason to refuse it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+HANDOFF_DIR = BASE_DIR / ".agent_pool"
+_REAP_INTERVAL = 5.0
+
+
+class PoolFull(RuntimeError):
+    """Raised when every agent slot is busy."""
+
+
+class RoomBusy(RuntimeError):
+    """Raised when another web worker already runs the agent for a room."""
+
+
+class _RoomAgent:
+    __slots__ = ("room", "handle", "campaign", "lead_index", "started", "last_active", "warm_start", "slot")
+
+    def __init__(self, room: str, handle: Any, campaign: Optional[str], lead_index: Optional[int], warm_start: bool,
+                 slot: Optional[int] = None):
+        self.room = room
+        self.handle = handle
+        self.campaign = campaign
+        self.lead_index = lead_index
+        self.started = self.last_active = time.time()
+        self.warm_start = warm_start
+        self.slot = slot
+
+
+class _ParkedAgent:
+    __slots__ = ("handle", "handoff", "parked_at")
+
+    def __init__(self, handle: Any, handoff: Path):
+        self.handle = handle
+        self.handoff = handoff
+        self.parked_at = time.time()
+
+
+def write_handoff(handoff: Path, payload: Dict[str, Any]) -> None:
+    """Atomically hand a parked agent its assignment (it polls for the file to appear)."""
+    tmp = handoff.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp, handoff)
+
+
+def _stop(handle: Any) -> None:
+    try:
+        handle.terminate()
+    except Exception:
+        try:
+            handle.kill()
+        except Exception:
+            pass
+
+
+class RoomAgentPool:
+    """Tracks room agents; ``spawn`` starts one directly, ``park`` starts a warm one waiting on a handoff file.
+
+    ``spawn(room, campaign, lead_index)`` and ``park(handoff)`` return Popen-like handles
+    (``poll``/``terminate``/``kill``); ``assignment(campaign, lead_index)`` is the extra
+    environment written into a parked agent's handoff. ``admit(busy)`` returns None or why a new
+    room may not start now. ``occupied(room)`` says whether a caller is still in the room
+    (None when it cannot tell); idle-looking rooms that are occupied are kept.
+    """
+
+    def __init__(
+        self,
+        spawn: Callable[[str, Optional[str], Optional[int]], Any],
+        cap: int = 4,
+        idle_timeout: float = 300.0,
+        warm: int = 0,
+        park: Optional[Callable[[Path], Any]] = None,
+        assignment: Optional[Callable[[Optional[str], Optional[int]], Dict[str, str]]] = None,
+        backend: Any = None,
+        owner: str = "",
+        admit: Optional[Callable[[int], Optional[str]]] = None,
+        occupied: Optional[Callable[[str], Optional[bool]]] = None,
+    ) -> None:
+        self.spawn = spawn
+        self.cap = max(1, cap)
+        self.idle_timeout = idle_timeout
+        self.warm = max(0, warm) if park is not None else 0
+        self.park = park
+        self.assignment = assignment
+        self.backend = backend
+        self.owner = owner
+        self.admit = admit
+        self.occupied = occupied
+        self.lease_ttl = max(3 * _REAP_INTERVAL, 15.0)
+        self._rooms: Dict[str, _RoomAgent] = {}
+        self._parked: List[_ParkedAgent] = []
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    # -----------------------------
+    # Rooms
+    # -----------------------------
+
+    def acquire(self, room: str, campaign: Optional[str] = None, lead_index: Optional[int] = None) -> Tuple[str, bool]:
+        """Make sure ``room`` has an agent. Returns (how, created) with how in existing|warm|spawned."""
+        self._ensure_reaper()
+        with self._lock:
+            # Idle rooms are only reaped by reap(), after checking they are really empty
+            self._reap_locked(idle=self.occupied is None)
+            agent = self._rooms.get(room)
+            if agent is not None:
+                agent.last_active = time.time()
+                return "existing", False
+            if len(self._rooms) >= self.cap:
+                raise PoolFull(f"All {self.cap} room agents are busy")
+            if self.admit is not None:
+                reason = self.admit(len(self._rooms))
+                if reason is not None:
+                    raise PoolFull(f"Host cannot take another call now ({reason})")
+            if self.backend is not None and not self.backend.acquire_lease(f"room:{room}", self.owner, self.lease_ttl):
+                raise RoomBusy(f"Room {room} is served by another worker")
+            slot = self._take_slot(room)
+            if slot is False:
+                self._release_lease(room)
+                raise PoolFull(f"All {self.cap} room agents are busy")
+            try:
+                handle, how = self._start_locked(room, campaign, lead_index)
+            except Exception:
+                self._release_lease(room, slot)
+                raise
+            self._rooms[room] = _RoomAgent(room, handle, campaign, lead_index, how == "warm", slot)
+        self._refill()
+        return how, True
+
+    def _start_locked(self, room: str, campaign: Optional[str], lead_index: Optional[int]) -> Tuple[Any, str]:
+        while self._parked:
+            parked = self._parked.pop(0)
+            if parked.handle.poll() is not None:
+                continue
+            payload = {"room": room, "env": self.assignment(campaign, lead_index) if self.assignment else {}}
+            write_handoff(parked.handoff, payload)
+            return parked.handle, "warm"
+        return self.spawn(room, campaign, lead_index), "spawned"
+
+    def touch(self, room: str) -> bool:
+        """Record activity for ``room`` (browser token request or heartbeat)."""
+        with self._lock:
+            agent = self._rooms.get(room)
+            if agent is None:
+                return False
+            agent.last_active = time.time()
+            return True
+
+    def release(self, room: str) -> bool:
+        with self._lock:
+            agent = self._rooms.pop(room, None)
+        if agent is None:
+            return False
+        _stop(agent.handle)
+        self._release_lease(room, agent.slot)
+        return True
+
+    def busy(self) -> int:
+        """Rooms that currently have an agent."""
+        with self._lock:
+            return len(self._rooms)
+
+    def _slot_holder(self, room: str) -> str:
+        return f"{self.owner}/{room}"
+
+    def _take_slot(self, room: str) -> Any:
+        """Index of a free shared ``room-slot`` lease, None without a backend, False when all are taken."""
+        if self.backend is None:
+            return None
+        for i in range(self.cap):
+            if self.backend.acquire_lease(f"room-slot:{i}", self._slot_holder(room), self.lease_ttl):
+                return i
+        return False
+
+    def _release_lease(self, room: str, slot: Optional[int] = None) -> None:
+        if self.backend is not None:
+            try:
+                self.backend.release_lease(f"room:{room}", self.owner)
+                if slot is not None:
+                    self.backend.release_lease(f"room-slot:{slot}", self._slot_holder(room))
+            except Exception:
+                pass
+
+    # -----------------------------
+    # Reaping and warm agents
+    # -----------------------------
+
+    def _reap_locked(self, idle: bool = True) -> List[_RoomAgent]:
+        now = time.time()
+        gone = []
+        for room, agent in list(self._rooms.items()):
+            exited = agent.handle.poll() is not None
+            if exited or (idle and now - agent.last_active > self.idle_timeout):
+                if not exited:
+                    _stop(agent.handle)
+                del self._rooms[room]
+                gone.append(agent)
+        self._parked = [p for p in self._parked if p.handle.poll() is None]
+        return gone
+
+    def _refresh_occupied(self) -> None:
+        """Count a caller still in an idle-looking room as activity (asked outside the lock)."""
+        if self.occupied is None:
+            return
+        now = time.time()
+        with self._lock:
+            idle = [room for room, a in self._rooms.items() if now - a.last_active > self.idle_timeout]
+        for room in idle:
+            try:
+                if self.occupied(room):
+                    self.touch(room)
+            except Exception:
+                pass
+
+    def reap(self) -> List[str]:
+        """Drop exited agents and stop idle ones; renew room and slot leases of the rest."""
+        self._refresh_occupied()
+        with self._lock:
+            gone = self._reap_locked()
+            live = [(a.room, a.slot) for a in self._rooms.values()]
+        for agent in gone:
+            self._release_lease(agent.room, agent.slot)
+        if self.backend is not None:
+            for room, slot in live:
+                try:
+                    self.backend.acquire_lease(f"room:{room}", self.owner, self.lease_ttl)
+                    if slot is not None:
+                        self.backend.acquire_lease(f"room-slot:{slot}", self._slot_holder(room), self.lease_ttl)
+                except Exception:
+                    pass
+        self._refill()
+        return [agent.room for agent in gone]
+
+    def _refill(self) -> None:
+        """Keep ``warm`` parked agents ready while there is spare capacity."""
+        if not self.warm or self.park is None:
+            return
+        with self._lock:
+            missing = min(self.warm - len(self._parked), self.cap - len(self._rooms) - len(self._parked))
+            for _ in range(max(0, missing)):
+                HANDOFF_DIR.mkdir(parents=True, exist_ok=True)
+                handoff = HANDOFF_DIR / f"{uuid.uuid4().hex}.json"
+                try:
+                    self._parked.append(_ParkedAgent(self.park(handoff), handoff))
+                except Exception:
+                    break
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="room-agent-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        while True:
+            time.sleep(_REAP_INTERVAL)
+            try:
+                self.reap()
+            except Exception:
+                pass
+
+    def start(self) -> None:
+        """Start the reaper and park the initial warm agents."""
+        self._ensure_reaper()
+        self._refill()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            agents = list(self._rooms.values())
+            parked = list(self._parked)
+            self._rooms.clear()
+            self._parked.clear()
+        for agent in agents:
+            _stop(agent.handle)
+            self._release_lease(agent.room, agent.slot)
+        for p in parked:
+            _stop(p.handle)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            rooms = [
+                {
+                    "room": a.room,
+                    "campaign": a.campaign,
+                    "lead_index": a.lead_index,
+                    "age_seconds": round(now - a.started, 1),
+                    "idle_seconds": round(now - a.last_active, 1),
+                    "warm_start": a.warm_start,
+                }
+                for a in self._rooms.values()
+            ]
+            parked = len(self._parked)
+        return {"cap": self.cap, "active": len(rooms), "warm": parked, "idle_timeout": self.idle_timeout, "rooms": rooms}
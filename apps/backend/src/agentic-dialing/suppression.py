@@ -0,0 +1,560 @@
+"""Do-not-call and recently-dialled suppression, checked before every dial.
+
+Numbers are normalised to integers (digits only, international ``00`` and
+leading zeros dropped, ``SUPPRESSION_COUNTRY_CODE`` prefixed to national
+numbers) so tens of millions fit in compact arrays:
+
+  - DNC lists (``.txt``/``.csv`` files in ``DNC_DIR``, default ``dnc/``, or
+    listed in ``DNC_PATHS``) are compiled once into ``.dnc.index``: a Bloom
+    filter (~10 bits per number at the default 1% false-positive rate)
+    followed by the sorted, de-duplicated numbers as int64. The file is
+    memory-mapped; a check probes a few Bloom bits and only
+    on a (rare) positive bisects the mapped array for the exact answer, so the
+    sorted array stays on disk / in the shared page cache. The index is rebuilt
+    when a source file changes. Opt-outs added at runtime go to
+    ``DNC_DIR/opt_outs.txt`` (always one of the index sources) and to a table
+    of the lead queue database that every worker mirrors, so they apply
+    everywhere at once, before the next rebuild.
+  - Recent dials (``SUPPRESSION_RECENT_SECS``) live in a table of the lead
+    queue database, so every web worker sees dials made by the others; each
+    worker mirrors it in a dict it refreshes incrementally. The window only
+    holds minutes of dials and needs expiry, which a Bloom filter cannot do.
+
+Building uses numpy when it is installed and a chunked pure-Python sort/merge
+otherwise (slower, same file).
+"""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import heapq
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import uuid
+from array import array
+from math import ceil, log
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy  # type: ignore
+except Exception:  # optional: pure-Python build without it
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+DNC_DIR = Path(os.getenv("DNC_DIR", str(BASE_DIR / "dnc")))
+INDEX_PATH = Path(os.getenv("SUPPRESSION_INDEX", str(BASE_DIR / ".dnc.index")))
+FALSE_POSITIVE_RATE = float(os.getenv("SUPPRESSION_FP_RATE", "0.01"))
+RECENT_WINDOW = float(os.getenv("SUPPRESSION_RECENT_SECS", "1800"))
+COUNTRY_CODE = re.sub(r"\D", "", os.getenv("SUPPRESSION_COUNTRY_CODE", ""))
+
+MAGIC = b"DNCIDX01"
+_ALIGN = 8
+_CHUNK = 1 << 20
+_M64 = (1 << 64) - 1
+_NON_DIGITS = re.compile(r"\D")
+
+DNC = "dnc"
+RECENT = "recent"
+
+
+def normalize_number(raw: Union[str, int, None]) -> Optional[int]:
+    """Integer form of a phone number, or None when it has too few digits to be one."""
+    digits = _NON_DIGITS.sub("", str(raw or ""))
+    if digits.startswith("00"):
+        digits = digits[2:]
+    digits = digits.lstrip("0")
+    if COUNTRY_CODE and len(digits) <= 10:
+        digits = COUNTRY_CODE + digits
+    if not 6 <= len(digits) <= 18:
+        return None
+    return int(digits)
+
+
+def opt_outs_path() -> Path:
+    return DNC_DIR / "opt_outs.txt"
+
+
+def dnc_sources() -> List[Path]:
+    """DNC list files: ``DNC_PATHS`` (files or directories, os.pathsep-separated), default ``DNC_DIR``.
+
+    The runtime opt-out file is always included, whatever ``DNC_PATHS`` lists.
+    """
+    raw = os.getenv("DNC_PATHS")
+    roots = [Path(p) for p in raw.split(os.pathsep) if p.strip()] if raw else [DNC_DIR]
+    files: List[Path] = []
+    for root in roots:
+        if root.is_dir():
+            files.extend(sorted(p for p in root.iterdir() if p.suffix.lower() in (".txt", ".csv") and p.is_file()))
+        elif root.is_file():
+            files.append(root)
+    opt_outs = opt_outs_path()
+    if opt_outs.is_file() and opt_outs.resolve() not in {p.resolve() for p in files}:
+        files.append(opt_outs)
+    return files
+
+
+def _signature(files: Iterable[Path]) -> List[List[object]]:
+    sig = []
+    for p in files:
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        sig.append([str(p.resolve()), st.st_mtime_ns, st.st_size])
+    return sig
+
+
+def iter_file_numbers(path: Path) -> Iterator[int]:
+    """Numbers of one list: the ``phone`` column of a CSV with a header, else the first number per line."""
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as fh:
+        reader = csv.reader(fh)
+        col = None
+        for i, row in enumerate(reader):
+            if not row:
+                continue
+            if i == 0:
+                lowered = [c.strip().lower() for c in row]
+                col = next((j for j, c in enumerate(lowered) if "phone" in c or c in ("number", "msisdn")), None)
+                if col is not None:
+                    continue
+            cells = [row[col]] if col is not None and col < len(row) else row
+            for cell in cells:
+                n = normalize_number(cell)
+                if n is not None:
+                    yield n
+                    break
+
+
+# -----------------------------
+# Bloom filter hashing (identical in the pure-Python and numpy paths)
+# -----------------------------
+def _mix(x: int) -> int:
+    # splitmix64 finaliser
+    x = (x + 0x9E3779B97F4A7C15) & _M64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _M64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _M64
+    return x ^ (x >> 31)
+
+
+def bloom_size(n: int, p: float = FALSE_POSITIVE_RATE) -> Tuple[int, int]:
+    """(bits, hash count) for ``n`` items at false-positive rate ``p``."""
+    n = max(n, 1)
+    bits = max(64, int(ceil(-n * log(p) / (log(2) ** 2))))
+    bits += -bits % 64
+    return bits, max(1, round(bits / n * log(2)))
+
+
+def _positions(number: int, bits: int, k: int) -> Iterator[int]:
+    h = _mix(number)
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    for i in range(k):
+        yield (h1 + i * h2) % bits
+
+
+def _bloom_py(numbers: Iterable[int], bits: int, k: int) -> bytearray:
+    bloom = bytearray(bits // 8)
+    for n in numbers:
+        for pos in _positions(n, bits, k):
+            bloom[pos >> 3] |= 1 << (pos & 7)
+    return bloom
+
+
+def _bloom_np(sorted_numbers, bits: int, k: int) -> bytearray:
+    np = numpy
+    bloom = np.zeros(bits // 8, dtype=np.uint8)
+    with np.errstate(over="ignore"):
+        for start in range(0, len(sorted_numbers), _CHUNK):
+            x = sorted_numbers[start:start + _CHUNK].astype(np.uint64)
+            x = x + np.uint64(0x9E3779B97F4A7C15)
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x = x ^ (x >> np.uint64(31))
+            h1, h2 = x & np.uint64(0xFFFFFFFF), (x >> np.uint64(32)) | np.uint64(1)
+            for i in range(k):
+                pos = (h1 + np.uint64(i) * h2) % np.uint64(bits)
+                np.bitwise_or.at(bloom, (pos >> np.uint64(3)).astype(np.int64),
+                                 (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8)))
+    return bytearray(bloom.tobytes())
+
+
+def _sorted_unique_py(numbers: Iterable[int]) -> array:
+    # Sorted runs of _CHUNK numbers merged lazily: only one run is ever a list of Python ints
+    runs: List[array] = []
+    chunk: List[int] = []
+    for n in numbers:
+        chunk.append(n)
+        if len(chunk) >= _CHUNK:
+            runs.append(array("q", sorted(chunk)))
+            chunk = []
+    if chunk:
+        runs.append(array("q", sorted(chunk)))
+    out = array("q")
+    last = None
+    for n in heapq.merge(*runs):
+        if n != last:
+            out.append(n)
+            last = n
+    return out
+
+
+def build_index(sources: Optional[List[Path]] = None, dest: Path = INDEX_PATH,
+                fp_rate: float = FALSE_POSITIVE_RATE) -> Path:
+    """Compile DNC list files into the memory-mappable index (written atomically)."""
+    sources = dnc_sources() if sources is None else sources
+    signature = _signature(sources)
+
+    def numbers() -> Iterator[int]:
+        for p in sources:
+            try:
+                yield from iter_file_numbers(p)
+            except OSError:
+                logger.exception("Failed to read DNC list %s", p)
+
+    if numpy is not None:
+        unique = numpy.unique(numpy.fromiter(numbers(), dtype=numpy.int64))
+        count = int(unique.size)
+        bits, k = bloom_size(count, fp_rate)
+        bloom = _bloom_np(unique, bits, k)
+        body = unique.astype(f"{'<' if sys.byteorder == 'little' else '>'}i8").tobytes()
+    else:
+        unique = _sorted_unique_py(numbers())
+        count = len(unique)
+        bits, k = bloom_size(count, fp_rate)
+        bloom = _bloom_py(unique, bits, k)
+        body = unique.tobytes()
+
+    header = json.dumps({
+        "count": count, "bits": bits, "k": k, "sources": signature, "byteorder": sys.byteorder,
+    }, separators=(",", ":")).encode("utf-8")
+    start = len(MAGIC) + 4 + len(header)
+    bloom_at = start + (-start % _ALIGN)
+    numbers_at = bloom_at + len(bloom)  # bloom length is a multiple of 8
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<I", len(header)))
+        fh.write(header)
+        fh.write(b"\0" * (bloom_at - fh.tell()))
+        fh.write(bloom)
+        assert fh.tell() == numbers_at
+        fh.write(body)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, dest)
+    return dest
+
+
+class DNCIndex:
+    """Read-only mapped view of ``.dnc.index``."""
+
+    def __init__(self, path: Path = INDEX_PATH) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a DNC index")
+        (hlen,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        header = json.loads(self._mm[len(MAGIC) + 4:len(MAGIC) + 4 + hlen])
+        if header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header.get('byteorder')}-endian host")
+        self.count: int = header["count"]
+        self.bits: int = header["bits"]
+        self.k: int = header["k"]
+        self.sources = header["sources"]
+        start = len(MAGIC) + 4 + hlen
+        bloom_at = start + (-start % _ALIGN)
+        mv = memoryview(self._mm)
+        self._bloom = mv[bloom_at:bloom_at + self.bits // 8]
+        numbers_at = bloom_at + self.bits // 8
+        self._numbers = mv[numbers_at:numbers_at + 8 * self.count].cast("q")
+
+    def might_contain(self, number: int) -> bool:
+        bloom = self._bloom
+        for pos in _positions(number, self.bits, self.k):
+            if not bloom[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, number: int) -> bool:
+        if not self.might_contain(number):
+            return False
+        numbers = self._numbers
+        i = bisect.bisect_left(numbers, number)
+        return i < self.count and numbers[i] == number
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+
+# -----------------------------
+# Shared recent-dial window
+# -----------------------------
+class RecentDials:
+    """Numbers dialled in the last ``window`` seconds, shared through a SQLite table."""
+
+    def __init__(self, db_path: str, window: float = RECENT_WINDOW) -> None:
+        self.db_path = db_path
+        self.window = window
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._seen: Dict[int, float] = {}
+        self._synced_to = 0.0
+        self._synced_at = 0.0
+        self._pruned_at = 0.0
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS recent_dials (number INTEGER PRIMARY KEY, dialled REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS recent_dials_at ON recent_dials (dialled)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, number: int, at: Optional[float] = None) -> None:
+        at = at or time.time()
+        with self._lock:
+            self._seen[number] = max(at, self._seen.get(number, 0.0))
+        self._conn().execute(
+            "INSERT INTO recent_dials (number, dialled) VALUES (?, ?) "
+            "ON CONFLICT(number) DO UPDATE SET dialled = MAX(dialled, excluded.dialled)",
+            (number, at),
+        )
+
+    def sync(self, min_interval: float = 1.0) -> None:
+        """Pull dials recorded by other workers since the last sync (at most every ``min_interval``)."""
+        now = time.time()
+        if now - self._synced_at < min_interval:
+            return
+        self._synced_at = now
+        since = max(self._synced_to, now - self.window) - 5.0  # slack for clock skew between writers
+        rows = self._conn().execute(
+            "SELECT number, dialled FROM recent_dials WHERE dialled > ?", (since,)
+        ).fetchall()
+        prune = now - self._pruned_at > 60
+        cutoff = now - self.window
+        with self._lock:
+            for number, dialled in rows:
+                if dialled > self._seen.get(number, 0.0):
+                    self._seen[number] = dialled
+                self._synced_to = max(self._synced_to, dialled)
+            if prune:
+                self._pruned_at = now
+                self._seen = {n: t for n, t in self._seen.items() if t >= cutoff}
+        if prune:
+            self._conn().execute("DELETE FROM recent_dials WHERE dialled < ?", (cutoff,))
+
+    def last_dialled(self, number: int) -> Optional[float]:
+        at = self._seen.get(number)
+        if at is None or time.time() - at >= self.window:
+            return None
+        return at
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+# -----------------------------
+# Shared runtime opt-outs
+# -----------------------------
+class OptOuts:
+    """Numbers opted out at runtime, shared through a SQLite table and mirrored in a set.
+
+    Numbers the DNC index already holds are dropped from the set (``forget_indexed``).
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._numbers: set = set()
+        self._synced_to = 0.0
+        self._synced_at = 0.0
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS opt_outs (number INTEGER PRIMARY KEY, added REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS opt_outs_added ON opt_outs (added)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, numbers: Iterable[int], share: bool = True) -> None:
+        numbers = list(numbers)
+        with self._lock:
+            self._numbers.update(numbers)
+        if share and numbers:
+            now = time.time()
+            self._conn().executemany(
+                "INSERT OR IGNORE INTO opt_outs (number, added) VALUES (?, ?)", [(n, now) for n in numbers]
+            )
+
+    def sync(self, min_interval: float = 1.0) -> None:
+        """Pull opt-outs added by other workers since the last sync (at most every ``min_interval``)."""
+        now = time.time()
+        if now - self._synced_at < min_interval:
+            return
+        self._synced_at = now
+        rows = self._conn().execute(
+            "SELECT number, added FROM opt_outs WHERE added > ?", (self._synced_to - 5.0,)  # slack for clock skew
+        ).fetchall()
+        with self._lock:
+            for number, added in rows:
+                self._numbers.add(number)
+                self._synced_to = max(self._synced_to, added)
+
+    def forget_indexed(self, index: "DNCIndex") -> None:
+        with self._lock:
+            self._numbers = {n for n in self._numbers if n not in index}
+
+    def __contains__(self, number: int) -> bool:
+        return number in self._numbers
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+
+# -----------------------------
+# Service
+# -----------------------------
+class Suppression:
+    """DNC + recent-dial checks; ``check`` returns why a number must not be dialled, or None."""
+
+    def __init__(self, db_path: str, index_path: Path = INDEX_PATH, window: float = RECENT_WINDOW) -> None:
+        self.index_path = index_path
+        self.index: Optional[DNCIndex] = None
+        self.recent = RecentDials(db_path, window)
+        self.opt_outs = OptOuts(db_path)
+        self._lock = threading.Lock()
+        self._building = False
+        self.checks = 0
+        self.suppressed = 0
+
+    def load(self, rebuild: bool = True) -> None:
+        """Map the existing index and read the opt-out file now; rebuild in the background when sources changed."""
+        try:
+            index = DNCIndex(self.index_path)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if index is not None:
+            self.index = index
+        path = opt_outs_path()
+        if path.is_file():
+            # Opt-outs apply from the first check, not only once a (re)build has indexed them
+            try:
+                self.opt_outs.add((n for n in iter_file_numbers(path) if index is None or n not in index), share=False)
+            except OSError:
+                logger.exception("Failed to read opt-outs from %s", path)
+        self.opt_outs.sync(0)
+        if rebuild and (index is None or index.sources != _signature(dnc_sources())):
+            self.rebuild_async()
+
+    def rebuild_async(self) -> None:
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._rebuild, name="dnc-index-build", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        try:
+            start = time.perf_counter()
+            sources = dnc_sources()
+            build_index(sources, self.index_path)
+            index = DNCIndex(self.index_path)
+            with self._lock:
+                self.index = index
+            self.opt_outs.forget_indexed(index)
+            logger.info("DNC index: %d numbers from %d lists in %.1fs", len(index), len(sources),
+                        time.perf_counter() - start)
+        except Exception:
+            logger.exception("Failed to build the DNC index")
+        finally:
+            with self._lock:
+                self._building = False
+
+    def check(self, phone: Union[str, int, None]) -> Optional[str]:
+        number = normalize_number(phone)
+        if number is None:
+            return None
+        self.checks += 1
+        reason = None
+        index = self.index
+        self.opt_outs.sync()
+        if number in self.opt_outs or (index is not None and number in index):
+            reason = DNC
+        else:
+            self.recent.sync()
+            if self.recent.last_dialled(number) is not None:
+                reason = RECENT
+        if reason:
+            self.suppressed += 1
+        return reason
+
+    def record_dial(self, phone: Union[str, int, None], at: Optional[float] = None) -> None:
+        number = normalize_number(phone)
+        if number is not None:
+            self.recent.record(number, at)
+
+    def recent_until(self, phone: Union[str, int, None]) -> Optional[float]:
+        """When ``phone`` leaves the recent-dial window, or None when it is not in it."""
+        number = normalize_number(phone)
+        at = self.recent.last_dialled(number) if number is not None else None
+        return at + self.recent.window if at is not None else None
+
+    def add_opt_out(self, phone: Union[str, int, None]) -> Optional[int]:
+        """Suppress ``phone`` now on every worker and append it to the opt-out file for the next index build."""
+        number = normalize_number(phone)
+        if number is None:
+            return None
+        self.opt_outs.add([number])
+        try:
+            DNC_DIR.mkdir(parents=True, exist_ok=True)
+            with open(opt_outs_path(), "a", encoding="utf-8") as fh:
+                fh.write(f"{number}\n")
+        except OSError:
+            logger.exception("Failed to persist opt-out %s", number)
+        return number
+
+    def stats(self) -> Dict[str, object]:
+        index = self.index
+        return {
+            "dnc_numbers": len(index) if index is not None else 0,
+            "dnc_index_bytes": index.nbytes if index is not None else 0,
+            "bloom_bits_per_number": round(index.bits / max(len(index), 1), 1) if index is not None else None,
+            "opt_outs_pending": len(self.opt_outs),
+            "recent_numbers": len(self.recent),
+            "recent_window_secs": self.recent.window,
+            "building": self._building,
+            "checks": self.checks,
+            "suppressed": self.suppressed,
+        }
+
+
+if __name__ == "__main__":
+    out = build_index([Path(a) for a in sys.argv[1:]] or None)
+    idx = DNCIndex(out)
+    print(f"{out}: {len(idx)} numbers, {idx.nbytes} bytes, k={idx.k}")
@@ -0,0 +1,58 @@
+"""SingleFlight coalesces identical backend fetches."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend_client import SingleFlight  # noqa: E402
+
+
+def _counting_fetch(delay: float = 0.0):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(delay)
+        return len(calls)
+
+    return fetch, calls
+
+
+def test_concurrent_calls_share_one_fetch():
+    flights = SingleFlight(fresh_for=5.0)
+    fetch, calls = _counting_fetch(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("campaigns", fetch))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+    assert results == [1] * 8
+    assert flights.stats()["shared"] == 7
+
+
+def test_back_to_back_calls_reuse_the_result():
+    flights = SingleFlight(fresh_for=5.0)
+    fetch, calls = _counting_fetch()
+    assert [flights.do("campaigns", fetch) for _ in range(5)] == [1] * 5
+    assert calls == [1]
+    assert flights.stats()["reused"] == 4
+
+
+def test_forget_during_a_fetch_discards_its_result():
+    flights = SingleFlight(fresh_for=5.0)
+    fetch, calls = _counting_fetch(delay=0.2)
+    first = threading.Thread(target=flights.do, args=("campaigns", fetch))
+    first.start()
+    time.sleep(0.05)
+    flights.forget("campaigns")  # a write landed while the old fetch was in flight
+    assert flights.do("campaigns", fetch) == 2
+    first.join()
+    assert flights.do("campaigns", fetch) == 2
+    assert len(calls) == 2
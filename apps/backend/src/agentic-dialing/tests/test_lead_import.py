@@ -0,0 +1,84 @@
+"""Parallel lead import yields exactly what the sequential parser does."""
+
+from __future__ import annotations
+
+import csv
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import lead_columns  # noqa: E402
+import lead_import  # noqa: E402
+from leads import LEAD_FIELDS  # noqa: E402
+
+HEADER = ["prospect_name", "company_name", "job_title", "phone", "email", "timezone", "notes", "resource_name"]
+NOTES = ["", "Asked for a callback\nafter 3pm", 'Said "not now", try Q3', "Gatekeeper, ask for\r\nthe CFO"]
+
+
+def _write_csv(path: Path, rows: int = 600) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(HEADER)
+        for i in range(rows):
+            w.writerow([
+                f" Prospect {i} ",
+                f'Acme "{i % 7}" Ltd' if i % 3 == 0 else f"Company {i % 11}",  # doubled quotes
+                "Head of\nSales" if i % 5 == 0 else "CTO",  # newline inside a lead field
+                f"+1555{i:07d}",
+                f"p{i}@example.com",
+                "America/New_York",
+                NOTES[i % len(NOTES)],
+                "Alex",
+            ])
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Chunks of a few hundred bytes, so range boundaries fall inside quoted, multi-line fields
+    monkeypatch.setattr(lead_import, "_READ_BLOCK", 64)
+    monkeypatch.setattr(lead_import, "CHUNK_BYTES", 512)
+    monkeypatch.setattr(lead_import, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(lead_import, "WORKERS", 2)
+
+
+def test_parallel_parse_matches_sequential(tmp_path, small_chunks):
+    path = tmp_path / "leads.csv"
+    _write_csv(path)
+    assert path.stat().st_size > 50 * lead_import.CHUNK_BYTES
+
+    expected = lead_columns._parse_sequential(path, LEAD_FIELDS)
+    assert expected[0] == 600
+    assert lead_import.parse_columns(path, LEAD_FIELDS) == expected
+
+
+def test_parallel_build_is_byte_identical(tmp_path, small_chunks, monkeypatch):
+    path = tmp_path / "leads.csv"
+    _write_csv(path)
+    parsed = []
+    parse = lead_import.parse_columns
+    monkeypatch.setattr(lead_import, "parse_columns", lambda *a, **kw: parsed.append(parse(*a, **kw)) or parsed[-1])
+    parallel = lead_columns.build_columns(path).read_bytes()
+    assert len(parsed) == 1  # built from the parallel parse, not the fallback
+    monkeypatch.setattr(lead_import, "WORKERS", 1)
+    assert lead_columns.build_columns(path).read_bytes() == parallel
+
+
+def test_bare_quote_falls_back_to_sequential(tmp_path, small_chunks, monkeypatch):
+    path = tmp_path / "leads.csv"
+    _write_csv(path)
+    with open(path, "a", encoding="utf-8", newline="") as fh:
+        # An unquoted field with a quote in it: quote parity no longer marks record boundaries
+        fh.write('Pat O"Brien,Irregular Inc,CEO,+15559999999,pat@example.com,UTC,,Alex\r\n')
+    with pytest.raises(lead_import.IrregularCSV):
+        lead_import.parse_columns(path, LEAD_FIELDS)
+
+    expected = lead_columns._parse_sequential(path, LEAD_FIELDS)
+    assert expected[0] == 601
+    built = lead_columns.build_columns(path).read_bytes()
+    monkeypatch.setattr(lead_import, "WORKERS", 1)
+    assert lead_columns.build_columns(path).read_bytes() == built
+    columns = lead_columns.open_columns(path, build=False)
+    assert columns[600].prospect_name == 'Pat O"Brien'
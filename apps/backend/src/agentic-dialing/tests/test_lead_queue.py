@@ -0,0 +1,89 @@
+"""The lead queue keeps a list's progress when its CSV is rewritten."""
+
+from __future__ import annotations
+
+import csv
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from lead_queue import LeadWorkQueue, csv_source, csv_version, lead_key  # noqa: E402
+
+
+def _write(path: Path, rows) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["prospect_name", "company_name", "phone"])
+        w.writerows(rows)
+    os.replace(tmp, path)
+
+
+def _ensure(queue: LeadWorkQueue, path: Path, rows) -> str:
+    source = csv_source(path)
+    leads = [{"prospect_name": n, "company_name": c, "phone": p} for n, c, p in rows]
+    queue.ensure_source(source, len(leads), csv_version(path), lambda: [lead_key(lead) for lead in leads])
+    return source
+
+
+def _dial(queue: LeadWorkQueue, source: str, index: int) -> None:
+    assert queue.claim_index(source, index, "w1")
+    assert queue.start(source, index, "w1")
+    assert queue.finish(source, index, "w1", "done")
+
+
+def _statuses(queue: LeadWorkQueue, source: str):
+    return dict(queue._conn().execute(
+        "SELECT lead_index, status FROM lead_queue WHERE source = ? ORDER BY lead_index", (source,)
+    ).fetchall())
+
+
+def test_rewritten_list_keeps_dialled_leads(tmp_path):
+    queue = LeadWorkQueue(str(tmp_path / "queue.sqlite3"))
+    path = tmp_path / "leads.csv"
+    rows = [("Ann", "Acme", "+1 555 0100"), ("Bob", "Beta", "+1 555 0101"), ("Cy", "Corp", "+1 555 0102")]
+    _write(path, rows)
+    source = _ensure(queue, path, rows)
+    _dial(queue, source, 1)
+    _dial(queue, source, 3)
+    assert queue.claim(source, "w2", limit=5) == [2]
+    queue.release("w2")
+
+    # Re-uploaded with an edit: a new lead on top, Bob's company fixed, Cy removed
+    rows = [("Dee", "Delta", "+1 555 0103"), ("Ann", "Acme", "+1 555 0100"), ("Bob", "Beta Ltd", "+1 555 0101")]
+    _write(path, rows)
+    assert _ensure(queue, path, rows) == source
+
+    assert _statuses(queue, source) == {1: "pending", 2: "done", 3: "pending"}
+    assert queue.claim(source, "w2", limit=5) == [1, 3]
+    assert queue.stats(source)["done"] == 1
+    # Nothing is left from the previous version of the file
+    assert queue._conn().execute("SELECT COUNT(*) FROM lead_queue").fetchone()[0] == 3
+
+
+def test_same_content_is_not_reconciled_again(tmp_path):
+    queue = LeadWorkQueue(str(tmp_path / "queue.sqlite3"))
+    path = tmp_path / "leads.csv"
+    rows = [("Ann", "Acme", "+1 555 0100")]
+    _write(path, rows)
+    source = _ensure(queue, path, rows)
+    _dial(queue, source, 1)
+    calls = []
+    queue.ensure_source(source, 1, csv_version(path), lambda: calls.append(1) or [None])
+    assert calls == []
+    assert _statuses(queue, source) == {1: "done"}
+
+
+def test_versioned_keys_from_before_are_adopted(tmp_path):
+    queue = LeadWorkQueue(str(tmp_path / "queue.sqlite3"))
+    path = tmp_path / "leads.csv"
+    rows = [("Ann", "Acme", "+1 555 0100"), ("Bob", "Beta", "+1 555 0101")]
+    _write(path, rows)
+    old = f"{csv_source(path)}@123-456"
+    queue.ensure_source(old, 2)
+    _dial(queue, old, 1)
+    source = _ensure(queue, path, rows)
+    assert _statuses(queue, source) == {1: "done", 2: "pending"}
+    assert queue._conn().execute("SELECT COUNT(*) FROM lead_queue WHERE source = ?", (old,)).fetchone()[0] == 0
@@ -0,0 +1,52 @@
+"""Lead sets keep reading the right rows when a member file is replaced."""
+
+from __future__ import annotations
+
+import csv
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import lead_sets  # noqa: E402
+
+
+def _write_members(path: Path, names) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        w = csv.writer(fh)
+        w.writerow(["prospect_name", "company_name", "phone"])
+        for name in names:
+            w.writerow([name, "Acme", "+15550100"])
+    os.replace(tmp, path)
+
+
+def test_replaced_member_is_read_back(tmp_path):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    _write_members(a, ["Ann", "Amy"])
+    _write_members(b, ["Bob"])
+    seq = lead_sets.LeadSetSequence("set", [str(a), str(b)])
+    assert [lead.prospect_name for lead in seq] == ["Ann", "Amy", "Bob"]
+
+    # Atomic replace with a different inode (and longer rows, so stale offsets would misread)
+    _write_members(a, ["Alexandra", "Anastasia", "Augustina"])
+    assert [lead.prospect_name for lead in seq] == ["Alexandra", "Anastasia", "Augustina", "Bob"]
+
+
+def test_slices_check_member_files_once(tmp_path, monkeypatch):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    _write_members(a, [f"A{i}" for i in range(20)])
+    _write_members(b, [f"B{i}" for i in range(20)])
+    seq = lead_sets.LeadSetSequence("set", [str(a), str(b)], weights=[1, 1], mode="weighted")
+    calls = []
+    real = lead_sets.get_row_index
+    monkeypatch.setattr(lead_sets, "get_row_index", lambda p: calls.append(p) or real(p))
+
+    page = seq[5:25]
+    assert [lead.prospect_name for lead in page][:4] == ["B2", "A3", "B3", "A4"]
+    assert len(calls) == 2  # one signature check per member for the whole page
+
+    calls.clear()
+    assert sum(1 for _ in seq) == 40
+    assert len(calls) == 2
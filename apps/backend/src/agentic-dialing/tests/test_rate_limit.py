@@ -0,0 +1,93 @@
+"""Dial rate buckets: bursts, waits in debt, refunds, and limits shared between workers."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import dial_state  # noqa: E402
+from rate_limit import DialRateLimiter, parse_limit  # noqa: E402
+
+# Slow refill (one token every 2s) so the time a test takes does not move the balance noticeably
+SLOW = {"global": "0.5/2"}
+
+
+def test_parse_limit():
+    assert parse_limit("2") == (2.0, 2.0)
+    assert parse_limit("0.5/3") == (0.5, 3.0)
+    assert parse_limit(0.2) == (0.2, 1.0)
+    with pytest.raises(ValueError):
+        parse_limit("0")
+
+
+def test_burst_then_throttled():
+    limiter = DialRateLimiter(SLOW)
+    assert limiter.try_acquire("+15550100001", None)[0] == 0
+    assert limiter.try_acquire("+15550100002", None)[0] == 0
+    wait, taken = limiter.try_acquire("+15550100003", None)
+    assert wait == pytest.approx(2.0, abs=0.05)
+    assert taken == []  # nothing is taken while throttled
+    assert limiter.global_bucket.tokens(time.time()) < 0.05
+
+
+def test_reservations_in_debt_wait_in_arrival_order():
+    limiter = DialRateLimiter({"global": "0.5/1"})
+    waits = [limiter.reserve(None, None)[0] for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] == pytest.approx(2.0, abs=0.05)
+    assert waits[2] == pytest.approx(4.0, abs=0.05)
+
+
+def test_longest_country_prefix_and_campaign_buckets_apply():
+    limiter = DialRateLimiter({"country": {"1": "1", "1242": "0.5"}, "campaign": {"demo": "1"}})
+    names = [b.name for b in limiter.buckets_for("+1 242 555 0100", "demo")]
+    assert names == ["country:1242", "campaign:demo"]
+    assert [b.name for b in limiter.buckets_for("+1 555 010 0100", "other")] == ["country:1"]
+
+
+def test_refund_after_a_failed_start():
+    limiter = DialRateLimiter({"global": "0.5/1"})
+
+    async def dial():
+        _, taken = await limiter.acquire("+15550100001", None, max_wait=1)
+        return taken
+
+    taken = asyncio.run(dial())
+    with pytest.raises(TimeoutError):
+        asyncio.run(dial())  # the next token is 2s away
+    # The call did not start: its token goes back and the next dial is not held up
+    limiter.cancel(taken)
+    assert asyncio.run(dial()) == taken
+    assert limiter.global_bucket.granted == 1
+
+
+def test_acquire_waits_for_its_reservation():
+    limiter = DialRateLimiter({"global": "20/1"})
+    assert asyncio.run(limiter.acquire(None, None))[0] == 0
+    waited, taken = asyncio.run(limiter.acquire(None, None, max_wait=1))
+    assert 0 < waited <= 0.06
+    assert len(taken) == 1
+    assert limiter.waiting == 0
+
+
+def test_limiters_share_buckets_through_the_state_backend(tmp_path):
+    url = f"sqlite:///{tmp_path / 'state.sqlite3'}"
+    first = DialRateLimiter({"global": "0.5/1"}, dial_state.create_backend(url))
+    second = DialRateLimiter({"global": "0.5/1"}, dial_state.create_backend(url))
+
+    wait, taken = first.try_acquire("+15550100001", None)
+    assert wait == 0
+    wait, nothing = second.try_acquire("+15550100002", None)
+    assert wait == pytest.approx(2.0, abs=0.05)
+    assert nothing == []
+
+    # A refund on one worker frees the token for the other
+    first.cancel(taken)
+    assert second.try_acquire("+15550100002", None)[0] == 0
+    assert first.try_acquire("+15550100003", None)[0] > 0
@@ -0,0 +1,123 @@
+"""DNC index builds, the shared recent-dial window and opt-outs, and number normalisation."""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import suppression  # noqa: E402
+
+LISTED = ["+1 (555) 010-0001", "15550100002", "+1 555 010 0003", "001 555 010 0004"]
+
+
+def _write_lists(tmp_path: Path):
+    csv_list = tmp_path / "dnc.csv"
+    csv_list.write_text("name,phone\n" + "".join(f"n{i},{p}\n" for i, p in enumerate(LISTED[:3])), encoding="utf-8")
+    txt_list = tmp_path / "dnc.txt"
+    # Duplicates across and within files collapse to one entry
+    txt_list.write_text(f"{LISTED[3]}\n{LISTED[0]}\n{LISTED[3]}\nnot a number\n", encoding="utf-8")
+    return [csv_list, txt_list]
+
+
+@pytest.mark.skipif(suppression.numpy is None, reason="numpy is needed to compare the two builds")
+def test_index_is_identical_with_and_without_numpy(tmp_path, monkeypatch):
+    sources = _write_lists(tmp_path)
+    # Small runs so the pure-Python build merges several sorted chunks
+    monkeypatch.setattr(suppression, "_CHUNK", 2)
+    with_numpy = suppression.build_index(sources, tmp_path / "np.idx")
+    monkeypatch.setattr(suppression, "numpy", None)
+    pure = suppression.build_index(sources, tmp_path / "py.idx")
+    assert with_numpy.read_bytes() == pure.read_bytes()
+
+    index = suppression.DNCIndex(pure)
+    assert len(index) == 4
+    for phone in LISTED:
+        assert suppression.normalize_number(phone) in index
+    assert 15550100005 not in index
+    assert not any(n in index for n in range(15550200000, 15550201000))
+
+
+def test_check_reports_indexed_numbers(tmp_path, monkeypatch):
+    monkeypatch.setattr(suppression, "DNC_DIR", tmp_path / "dnc")
+    index_path = suppression.build_index(_write_lists(tmp_path), tmp_path / "dnc.idx")
+    service = suppression.Suppression(str(tmp_path / "state.sqlite3"), index_path)
+    service.load(rebuild=False)
+    assert service.check("+1 555-010-0004") == suppression.DNC
+    assert service.check("+1 555-010-0009") is None
+
+
+def test_recent_dials_sync_incrementally_and_expire(tmp_path):
+    db = str(tmp_path / "state.sqlite3")
+    here = suppression.RecentDials(db, window=60)
+    other = suppression.RecentDials(db, window=60)
+    now = time.time()
+
+    other.record(15550100001, now - 10)
+    here.sync(0)
+    assert here.last_dialled(15550100001) == now - 10
+    # A later sync only pulls what was recorded since, and still sees new dials
+    other.record(15550100002, now)
+    here.sync(0)
+    assert here.last_dialled(15550100002) == now
+    assert len(here) == 2
+
+    # Dials older than the window are not suppressed and are pruned from memory and the table
+    other.record(15550100003, now - 120)
+    here._seen[15550100003] = now - 120
+    assert here.last_dialled(15550100003) is None
+    here._pruned_at = 0.0
+    here.sync(0)
+    assert 15550100003 not in here._seen
+    rows = sqlite3.connect(db).execute("SELECT number FROM recent_dials ORDER BY number").fetchall()
+    assert rows == [(15550100001,), (15550100002,)]
+
+
+def test_recent_until_follows_the_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(suppression, "DNC_DIR", tmp_path / "dnc")
+    service = suppression.Suppression(str(tmp_path / "state.sqlite3"), tmp_path / "missing.idx", window=60)
+    service.record_dial("+1 555 010 0001", at=time.time() - 30)
+    assert service.check("15550100001") == suppression.RECENT
+    assert 25 < service.recent_until("15550100001") - time.time() <= 30
+    assert service.recent_until("15550100002") is None
+
+
+def test_opt_outs_are_shared_between_instances(tmp_path, monkeypatch):
+    monkeypatch.setattr(suppression, "DNC_DIR", tmp_path / "dnc")
+    db = str(tmp_path / "state.sqlite3")
+    first = suppression.Suppression(db, tmp_path / "missing.idx")
+    second = suppression.Suppression(db, tmp_path / "missing.idx")
+    assert second.check("+1 555 010 0007") is None
+
+    assert first.add_opt_out("+1 555 010 0007") == 15550100007
+    assert first.check("+1 555 010 0007") == suppression.DNC
+    second.opt_outs.sync(0)
+    assert second.check("15550100007") == suppression.DNC
+    # Persisted for the next index build, and read by instances started later
+    assert suppression.opt_outs_path().read_text(encoding="utf-8") == "15550100007\n"
+    third = suppression.Suppression(str(tmp_path / "other.sqlite3"), tmp_path / "missing.idx")
+    third.load(rebuild=False)
+    assert third.check("+15550100007") == suppression.DNC
+
+
+def test_normalize_number_with_country_code(monkeypatch):
+    monkeypatch.setattr(suppression, "COUNTRY_CODE", "")
+    assert suppression.normalize_number("(555) 010-0001") == 5550100001
+    assert suppression.normalize_number("12345") is None
+    assert suppression.normalize_number("1" * 19) is None
+    assert suppression.normalize_number(None) is None
+
+    monkeypatch.setattr(suppression, "COUNTRY_CODE", "44")
+    # National (trunk 0), international and 00-prefixed forms agree
+    assert suppression.normalize_number("020 7946 0018") == 442079460018
+    assert suppression.normalize_number("+44 20 7946 0018") == 442079460018
+    assert suppression.normalize_number("0044 20 7946 0018") == 442079460018
+
+    monkeypatch.setattr(suppression, "COUNTRY_CODE", "1")
+    assert suppression.normalize_number("555-010-0001") == 15550100001
+    assert suppression.normalize_number("+1 555 010 0001") == 15550100001
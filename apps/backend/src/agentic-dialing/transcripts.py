@@ -0,0 +1,215 @@
+"""Transcript capture for agent calls, persisted off the realtime path.
+
+Session event handlers only ``put`` a segment into a bounded in-memory queue
+(never blocking; when the queue is full the segment is counted as dropped). A
+daemon thread drains it in batches, appends each batch to a per-call JSONL
+journal under ``.transcripts/`` and posts it to the backend. A slow or absent
+backend therefore costs nothing on the audio loop: unsent batches are kept
+(bounded) and retried with backoff, and the journal always has the full record.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+TRANSCRIPT_DIR = Path(os.getenv("TRANSCRIPT_DIR", str(BASE_DIR / ".transcripts")))
+QUEUE_SIZE = int(os.getenv("TRANSCRIPT_QUEUE_SIZE", "1024"))
+BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", "32"))
+FLUSH_INTERVAL = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", "2.0"))
+# Batches waiting for the backend beyond this are left to the journal only
+MAX_PENDING_BATCHES = int(os.getenv("TRANSCRIPT_MAX_PENDING", "50"))
+_MAX_BACKOFF = 60.0
+
+_CLOSE = object()
+
+
+def transcript_url() -> Optional[str]:
+    """Backend ingest URL; ``TRANSCRIPT_URL=off`` keeps transcripts in the local journal only."""
+    url = os.getenv("TRANSCRIPT_URL")
+    if url is None:
+        base = os.getenv("BACKEND_API_BASE", "http://localhost:4000/api/agentic").rstrip("/")
+        return f"{base}/transcripts"
+    return None if url.strip().lower() in ("", "0", "off") else url
+
+
+def _safe_name(call_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", call_id)[:120] or "call"
+
+
+class TranscriptWriter:
+    """Per-call segment queue with a background journal/backend writer."""
+
+    def __init__(self, call_id: str, lead: Optional[Dict[str, Any]] = None, url: Optional[str] = None,
+                 journal_dir: Path = TRANSCRIPT_DIR) -> None:
+        self.call_id = call_id
+        self.lead = dict(lead) if lead else {}
+        self.url = url
+        self.journal = journal_dir / f"{_safe_name(call_id)}.jsonl"
+        self.started = time.time()
+        self.dropped = 0
+        self.written = 0
+        self.posted = 0
+        self._seq = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._pending: List[List[Dict[str, Any]]] = []
+        self._retry_at = 0.0
+        self._backoff = 1.0
+        self._thread = threading.Thread(target=self._run, name=f"transcript-{call_id}", daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # Producer side (event handlers; must not block)
+    # -----------------------------
+    def add(self, speaker: str, text: str, is_final: bool = True, at: Optional[float] = None,
+            confidence: Optional[float] = None) -> None:
+        text = (text or "").strip()
+        if not text:
+            return
+        at = at or time.time()
+        self._seq += 1
+        segment = {
+            "seq": self._seq,
+            "speaker": speaker,
+            "text": text,
+            "is_final": is_final,
+            "ts": at,
+            "start": round(max(at - self.started, 0.0), 3),
+            "confidence": confidence,
+        }
+        try:
+            self._queue.put_nowait(segment)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush what is queued and stop the writer (waits at most ``timeout`` seconds)."""
+        try:
+            self._queue.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            self.dropped += 1
+        self._thread.join(timeout)
+        if self.dropped:
+            logger.warning("Transcript %s: %d segments dropped (queue full)", self.call_id, self.dropped)
+
+    # -----------------------------
+    # Writer thread
+    # -----------------------------
+    def _run(self) -> None:
+        client = httpx.Client(timeout=5.0) if self.url else None
+        try:
+            closing = False
+            while not closing:
+                batch, closing = self._next_batch()
+                if batch:
+                    self._write_journal(batch)
+                    if client is not None:
+                        self._pending.append(batch)
+                        del self._pending[:-MAX_PENDING_BATCHES]
+                if client is not None:
+                    self._post_pending(client, final=closing)
+        except Exception:
+            logger.exception("Transcript writer for %s stopped", self.call_id)
+        finally:
+            if client is not None:
+                client.close()
+
+    def _next_batch(self):
+        """Up to BATCH_SIZE segments, waiting at most FLUSH_INTERVAL; (batch, closing)."""
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _CLOSE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write_journal(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.journal.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal, "a", encoding="utf-8") as fh:
+                for segment in batch:
+                    fh.write(json.dumps({"call": self.call_id, **segment}, ensure_ascii=False) + "\n")
+            self.written += len(batch)
+        except OSError:
+            logger.exception("Failed to write transcript journal %s", self.journal)
+
+    def _post_pending(self, client: httpx.Client, final: bool = False) -> None:
+        if not self._pending or (time.monotonic() < self._retry_at and not final):
+            return
+        while self._pending:
+            batch = self._pending[0]
+            try:
+                r = client.post(self.url, json={"call_id": self.call_id, "lead": self.lead, "segments": batch})
+            except httpx.HTTPError as e:
+                self._defer(f"{type(e).__name__}: {e}")
+                return
+            if r.status_code in (404, 405, 501):
+                # No ingest route on this backend: keep to the journal for the rest of the call
+                logger.warning("Transcript ingest %s returned %s; journal only", self.url, r.status_code)
+                self.url = None
+                self._pending.clear()
+                return
+            if r.status_code >= 300:
+                self._defer(f"HTTP {r.status_code}")
+                return
+            self._pending.pop(0)
+            self.posted += len(batch)
+            self._backoff = 1.0
+        self._retry_at = 0.0
+
+    def _defer(self, reason: str) -> None:
+        logger.warning("Transcript post for %s failed (%s); retrying in %.0fs", self.call_id, reason, self._backoff)
+        self._retry_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, _MAX_BACKOFF)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "journal": str(self.journal),
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "posted": self.posted,
+            "pending_batches": len(self._pending),
+            "dropped": self.dropped,
+        }
+
+
+def attach(session: Any, writer: TranscriptWriter, interim: bool = False) -> None:
+    """Feed ``writer`` from an AgentSession's transcription and conversation events.
+
+    User speech comes from ``user_input_transcribed`` (final results, plus interim
+    ones when ``interim``); agent speech from ``conversation_item_added``.
+    """
+
+    def on_user(ev: Any) -> None:
+        if ev.is_final or interim:
+            writer.add("user", ev.transcript, is_final=bool(ev.is_final), at=getattr(ev, "created_at", None))
+
+    def on_item(ev: Any) -> None:
+        item = getattr(ev, "item", None)
+        if getattr(item, "role", None) != "assistant":
+            return
+        writer.add("agent", getattr(item, "text_content", None) or "", at=getattr(ev, "created_at", None))
+
+    session.on("user_input_transcribed", on_user)
+    session.on("conversation_item_added", on_item)
@@ -0,0 +1,228 @@
+"""Disk-backed cache for third-party browser scripts served by the web UI.
+
+Assets are fetched from public CDNs once (in the background at app startup, or
+ahead of time with ``python vendor_assets.py``) and stored under
+``VENDOR_CACHE_DIR`` alongside precompressed ``.gz``/``.br`` variants. Request
+handlers only ever read the in-memory copies loaded from that directory, so the
+hot path never makes an outbound request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fast_json import negotiate_encoding
+
+try:
+    import brotli  # type: ignore
+except Exception:  # optional: only gzip variants are produced without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+VENDOR_CACHE_DIR = Path(os.getenv("VENDOR_CACHE_DIR", str(BASE_DIR / ".vendor_cache"))).resolve()
+
+# Versioned URLs never change content, so clients may keep them for a year
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# key: (cache filename, CDN urls tried in order)
+VENDOR_ASSETS: Dict[str, Tuple[str, List[str]]] = {
+    "livekit-client-2.3.3": (
+        "livekit-client-2.3.3.umd.min.js",
+        [
+            "https://cdn.livekit.io/npm/livekit-client/2.3.3/livekit-client.umd.min.js",
+            "https://unpkg.com/livekit-client@2.3.3/dist/livekit-client.umd.min.js",
+            "https://cdn.jsdelivr.net/npm/livekit-client@2.3.3/dist/livekit-client.umd.min.js",
+        ],
+    ),
+    "livekit-client-esm-2.3.3": (
+        "livekit-client-2.3.3.esm.min.js",
+        [
+            "https://unpkg.com/livekit-client@2.3.3/dist/livekit-client.esm.min.js",
+            "https://cdn.jsdelivr.net/npm/livekit-client@2.3.3/dist/livekit-client.esm.min.js",
+            "https://unpkg.com/livekit-client/dist/livekit-client.esm.min.js",
+        ],
+    ),
+}
+
+
+class CachedAsset:
+    """In-memory copy of one asset and its precompressed variants."""
+
+    __slots__ = ("key", "media_type", "variants", "etag", "last_modified", "mtime")
+
+    def __init__(self, key: str, media_type: str, variants: Dict[str, bytes], digest: str, mtime: float) -> None:
+        self.key = key
+        self.media_type = media_type
+        # encoding ("identity" | "gzip" | "br") -> body
+        self.variants = variants
+        self.etag = f'"{digest[:32]}"'
+        self.mtime = int(mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+
+    def variant_etag(self, encoding: str) -> str:
+        if encoding == "identity":
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+_ASSETS: Dict[str, CachedAsset] = {}
+_WARM_TASK: Optional[asyncio.Task] = None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _variant_paths(path: Path) -> Dict[str, Path]:
+    return {
+        "gzip": path.with_name(path.name + ".gz"),
+        "br": path.with_name(path.name + ".br"),
+    }
+
+
+def _store_asset(path: Path, body: bytes) -> None:
+    """Write the raw asset and its compressed variants to disk."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(path, body)
+    _ensure_variants(path, body)
+
+
+def _ensure_variants(path: Path, body: bytes) -> None:
+    paths = _variant_paths(path)
+    if not paths["gzip"].exists():
+        _write_atomic(paths["gzip"], gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None and not paths["br"].exists():
+        _write_atomic(paths["br"], brotli.compress(body, quality=11))
+
+
+def load_asset(key: str) -> Optional[CachedAsset]:
+    """Load an asset from the disk cache into memory. Returns None when it is not cached yet."""
+    spec = VENDOR_ASSETS.get(key)
+    if not spec:
+        return None
+    path = VENDOR_CACHE_DIR / spec[0]
+    try:
+        body = path.read_bytes()
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    if not body:
+        return None
+    try:
+        _ensure_variants(path, body)
+    except OSError:
+        logger.warning("Could not write compressed variants for %s", path.name)
+    variants: Dict[str, bytes] = {"identity": body}
+    for encoding, vpath in _variant_paths(path).items():
+        try:
+            variants[encoding] = vpath.read_bytes()
+        except OSError:
+            pass
+    asset = CachedAsset(key, "application/javascript", variants, hashlib.sha256(body).hexdigest(), mtime)
+    _ASSETS[key] = asset
+    return asset
+
+
+def get_asset(key: str) -> Optional[CachedAsset]:
+    """Return the in-memory asset, falling back to the disk cache (never the network)."""
+    asset = _ASSETS.get(key)
+    if asset is None:
+        asset = load_asset(key)
+    return asset
+
+
+async def _fetch_from_cdns(urls: List[str]) -> Optional[bytes]:
+    import httpx
+
+    async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
+        for url in urls:
+            try:
+                r = await client.get(url)
+                if r.status_code == 200 and r.content:
+                    return r.content
+            except Exception:
+                continue
+    return None
+
+
+async def prewarm_assets() -> Dict[str, bool]:
+    """Ensure every vendor asset is on disk and loaded into memory. Returns key -> available."""
+    result: Dict[str, bool] = {}
+    for key, (filename, urls) in VENDOR_ASSETS.items():
+        if get_asset(key) is None:
+            body = await _fetch_from_cdns(urls)
+            if body:
+                try:
+                    await asyncio.to_thread(_store_asset, VENDOR_CACHE_DIR / filename, body)
+                except OSError:
+                    logger.exception("Failed to write vendor asset %s to %s", key, VENDOR_CACHE_DIR)
+                load_asset(key)
+            else:
+                logger.warning("Vendor asset %s could not be fetched from any CDN", key)
+        result[key] = key in _ASSETS
+    return result
+
+
+def ensure_warming() -> None:
+    """Start a background prewarm if one is not already running (must be called on the event loop)."""
+    global _WARM_TASK
+    if _WARM_TASK is None or _WARM_TASK.done():
+        _WARM_TASK = asyncio.get_running_loop().create_task(prewarm_assets())
+
+
+def choose_encoding(asset: CachedAsset, accept_encoding: str) -> str:
+    available = [enc for enc in ("br", "gzip") if enc in asset.variants]
+    return negotiate_encoding(accept_encoding, available) or "identity"
+
+
+def is_not_modified(asset: CachedAsset, if_none_match: str, if_modified_since: str) -> bool:
+    """Evaluate conditional request headers (If-None-Match takes precedence)."""
+    if if_none_match:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return any(asset.variant_etag(enc) in tags for enc in asset.variants)
+    if if_modified_since:
+        try:
+            return int(parsedate_to_datetime(if_modified_since).timestamp()) >= asset.mtime
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def asset_response(asset: CachedAsset, headers) -> "Response":
+    """Build a 200/304 response for the asset honouring Accept-Encoding and validators."""
+    from fastapi.responses import Response
+
+    encoding = choose_encoding(asset, headers.get("accept-encoding", ""))
+    out = {
+        "Cache-Control": CACHE_CONTROL,
+        "ETag": asset.variant_etag(encoding),
+        "Last-Modified": asset.last_modified,
+        "Vary": "Accept-Encoding",
+    }
+    if is_not_modified(asset, headers.get("if-none-match", ""), headers.get("if-modified-since", "")):
+        return Response(status_code=304, headers=out)
+    if encoding != "identity":
+        out["Content-Encoding"] = encoding
+    return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=out)
+
+
+if __name__ == "__main__":
+    # Prewarm the cache ahead of time (e.g. during image build) so the app never hits a CDN
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    status = asyncio.run(prewarm_assets())
+    for name, ok in status.items():
+        print(f"{name}: {'cached' if ok else 'MISSING'} ({VENDOR_CACHE_DIR})")
+    raise SystemExit(0 if all(status.values()) else 1)